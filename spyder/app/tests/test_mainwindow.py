@@ -4952,13 +4952,14 @@ def test_goto_find(main_window, qtbot, tmpdir):
     assert len(results) == 5
     assert len(findinfiles.result_browser.files) == 1
 
-    file_item = list(findinfiles.result_browser.files.values())[0]
-    assert file_item.childCount() == 5
+    results_model = findinfiles.result_browser.results_model
+    file_index = list(findinfiles.result_browser.files.values())[0]
+    assert results_model.rowCount(file_index) == 5
 
     for i in range(5):
-        item = file_item.child(i)
-        findinfiles.result_browser.setCurrentItem(item)
-        findinfiles.result_browser.activated(item)
+        index = results_model.index(i, 0, file_index)
+        findinfiles.result_browser.setCurrentIndex(index)
+        findinfiles.result_browser.activated_index(index)
         cursor = code_editor.textCursor()
         position = (cursor.selectionStart(), cursor.selectionEnd())
         assert position == match_positions[i]
@@ -215,6 +215,7 @@
               'indent_guides': False,
               'code_folding': True,
               'show_code_folding_warning': True,
+              'large_file_mode': True,
               'scroll_past_end': False,
               'toolbox_panel': True,
               'close_parentheses': True,
@@ -329,6 +330,9 @@
               'case_sensitive': False,
               'exclude_case_sensitive': False,
               'max_results': 1000,
+              'parallel_search': False,
+              'whole_file_search': True,
+              'use_project_index': False,
               }),
             ('breakpoints',
              {
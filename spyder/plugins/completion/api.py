@@ -862,6 +862,12 @@ class SpyderCompletionProvider(QObject, CompletionConfigurationObserver):
     # a long time for some requests.
     SLOW = False
 
+    # Maximum time (in ms) to wait for the completions of this provider
+    # once the ones of the other providers were shown. Completions that
+    # arrive later are discarded. None means using the time set in the
+    # completion preferences for slow providers, and no limit for the rest.
+    LATENCY_BUDGET_MS = None
+
     # Define configuration options for the provider.
     # List of tuples with the first item being the option name and the second
     # one its default value.
@@ -35,10 +35,10 @@ def setup_page(self):
         self.providers_group.setLayout(providers_layout)
 
         completions_wait_for_ms = self.create_spinbox(
-            _("Time to wait for all providers to return (ms):"), None,
+            _("Time to wait for slow providers to return (ms):"), None,
             'completions_wait_for_ms', min_=0, max_=10000, step=10,
-            tip=_("Beyond this timeout the first available provider "
-                  "will be returned"))
+            tip=_("Completions of slow providers (e.g. the Language "
+                  "Server) that arrive later are not shown"))
         completion_hint_box = newcb(
             _("Show completion details"),
             'completions_hint',
@@ -13,6 +13,7 @@
 
 # Local imports
 from spyder.api.widgets.main_container import PluginMainContainer
+from spyder.plugins.completion.widgets.stats import CompletionStatsDialog
 from spyder.plugins.completion.widgets.status import CompletionStatus
 
 
@@ -23,6 +24,7 @@ def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.statusbar_widgets = {}
         self.provider_statusbars = {}
+        self.stats_dialog = None
 
     def setup(self, options=None):
         self.completion_status = CompletionStatus(parent=self)
@@ -38,6 +40,14 @@ def show_widget(self, Widget):
                 widget.sig_restart_spyder.connect(self.sig_restart_requested)
             widget.exec_()
 
+    def show_stats_dialog(self, stats):
+        """Show the statistics of the completion providers."""
+        if self.stats_dialog is None:
+            self.stats_dialog = CompletionStatsDialog(self, stats)
+        self.stats_dialog.refresh()
+        self.stats_dialog.show()
+        self.stats_dialog.raise_()
+
     def register_statusbar_widgets(self, statusbar_classes, provider_name):
         current_ids = []
         for StatusBar in statusbar_classes:
@@ -35,6 +35,7 @@
                                            COMPLETION_ENTRYPOINT)
 from spyder.plugins.completion.confpage import CompletionConfigPage
 from spyder.plugins.completion.container import CompletionContainer
+from spyder.plugins.completion.stats import CompletionStats
 
 
 logger = logging.getLogger(__name__)
@@ -188,7 +189,9 @@ class CompletionPlugin(SpyderPluginV2):
         CompletionRequestTypes.DOCUMENT_COMPLETION
     }
 
-    AGGREGATE_RESPONSES = {
+    # Aggregated responses that are sent as soon as the fast providers
+    # reply, and sent again when the slow ones do.
+    STREAM_RESPONSES = {
         CompletionRequestTypes.DOCUMENT_COMPLETION
     }
 
@@ -221,9 +224,16 @@ def __init__(self, parent, configuration=None):
         # Completion provider speed: slow or fast
         self.provider_speed = {}
 
-        # Timeout limit for a response to be received
+        # Maximum time to wait for the streamed responses of each provider
+        self.provider_latency_budget = {}
+
+        # Maximum time to wait for the streamed responses of slow providers
+        # that don't declare a latency budget
         self.wait_for_ms = self.get_conf('completions_wait_for_ms')
 
+        # Latency and throughput statistics of the providers
+        self.stats = CompletionStats()
+
         # Save application menus to create if/when MainMenu is available.
         self.application_menus_to_create = []
 
@@ -273,6 +283,8 @@ def get_icon(self):
 
     def on_initialize(self):
         self.sig_interpreter_changed.connect(self.update_completion_status)
+        self.completion_status.sig_show_stats_requested.connect(
+            self.show_stats)
 
         if self.main:
             self.main.sig_pythonpath_changed.connect(
@@ -530,6 +542,11 @@ def update_completion_status(self):
 
         self.completion_status.update_status(new_value, tool_tip)
 
+    @Slot()
+    def show_stats(self):
+        """Show the latency and throughput statistics of the providers."""
+        self.get_container().show_stats_dialog(self.stats)
+
     # -------- Completion provider initialization redefinition wrappers -------
     def gather_providers_and_configtabs(self):
         """
@@ -794,6 +811,8 @@ def update_request_priorities(self, Provider: SpyderCompletionProvider,
         for request in COMPLETION_REQUESTS:
             request_priorities = source_priorities.get(request, {})
             self.provider_speed[provider_name] = Provider.SLOW
+            self.provider_latency_budget[provider_name] = (
+                Provider.LATENCY_BUDGET_MS)
             request_priorities[provider_name] = provider_priority - 1
             source_priorities[request] = request_priorities
 
@@ -1017,21 +1036,27 @@ def send_request(self, language: str, req_type: str, req: dict):
             'req_type': req_type,
             'response_instance': weakref.ref(req['response_instance']),
             'sources': {},
-            'timed_out': False,
+            'expired_sources': set(),
+            'sent_sources': set(),
         }
 
-        # Check if there are two or more slow completion providers
-        # in order to start the timeout counter.
         providers = self.available_providers_for_language(language.lower())
-        slow_provider_count = sum([self.provider_speed[p] for p in providers])
-
-        # Start the timer on this request
-        if req_type in self.AGGREGATE_RESPONSES and slow_provider_count > 2:
-            if self.wait_for_ms > 0:
-                QTimer.singleShot(self.wait_for_ms,
-                                  lambda: self.receive_timeout(req_id))
-            else:
-                self.requests[req_id]['timed_out'] = True
+        self.stats.request_sent(req_id, req_type, providers)
+
+        if req_type in self.STREAM_RESPONSES:
+            # Older requests from the same instance won't be sent anymore
+            self.discard_superseded_requests(req_id)
+
+            # Stop waiting for each provider after its latency budget
+            for provider_name in providers:
+                budget = self.provider_latency_budget.get(provider_name)
+                if budget is None and self.provider_speed[provider_name]:
+                    budget = self.wait_for_ms
+                if budget is not None:
+                    QTimer.singleShot(
+                        budget,
+                        functools.partial(self.receive_budget_timeout,
+                                          req_id, provider_name))
 
         # Send request to all running completion providers
         for provider_name in providers:
@@ -1163,28 +1188,51 @@ def receive_response(
         logger.debug("Completion plugin: Request {0} Got response "
                      "from {1}".format(req_id, completion_source))
 
-        if req_id not in self.requests:
-            return
-
         with QMutexLocker(self.collection_mutex):
-            request_responses = self.requests[req_id]
+            request_responses = self.requests.get(req_id)
+            dropped = (request_responses is None or
+                       completion_source in
+                       request_responses['expired_sources'])
+            self.stats.response_received(
+                req_id, completion_source, resp, dropped=dropped)
+            if dropped:
+                return
+
             request_responses['sources'][completion_source] = resp
             self.match_and_reply(req_id)
 
-    @Slot(int)
-    def receive_timeout(self, req_id: int):
-        """Collect all provider completions and reply on timeout."""
-        # On timeout, collect all completions and return to the user
+    def receive_budget_timeout(self, req_id: int, completion_source: str):
+        """Stop waiting for a provider once its latency budget is spent."""
         if req_id not in self.requests:
             return
 
-        logger.debug("Completion plugin: Request {} timed out".format(req_id))
-
         with QMutexLocker(self.collection_mutex):
             request_responses = self.requests[req_id]
-            request_responses['timed_out'] = True
+            if completion_source in request_responses['sources']:
+                return
+            logger.debug("Completion plugin: Request {0} exceeded the "
+                         "latency budget of {1}".format(
+                             req_id, completion_source))
+            request_responses['expired_sources'].add(completion_source)
             self.match_and_reply(req_id)
 
+    def discard_superseded_requests(self, req_id: int):
+        """
+        Remove the requests of the same type and instance as req_id that
+        were made before it, since their responses won't be sent.
+        """
+        with QMutexLocker(self.collection_mutex):
+            request = self.requests[req_id]
+            response_instance = request['response_instance']()
+            for key, item in list(self.requests.items()):
+                if (key < req_id and
+                        item['req_type'] == request['req_type'] and
+                        item['response_instance']() is response_instance):
+                    logger.debug(
+                        "Completion plugin: Request {} superseded".format(key))
+                    del self.requests[key]
+                    self.stats.request_discarded(key)
+
     def match_and_reply(self, req_id: int):
         """
         Decide how to send the responses corresponding to req_id to
@@ -1201,21 +1249,22 @@ def match_and_reply(self, req_id: int):
         sorted_providers = self.sort_providers_for_request(
             available_providers, req_type)
 
-        if req_type in self.AGGREGATE_RESPONSES:
-            # Wait only for the available providers for the given request
-            timed_out = request_responses['timed_out']
-            all_returned = all(source in request_responses['sources']
-                               for source in sorted_providers)
-            if not timed_out:
-                # Before the timeout
-                if all_returned:
-                    self.skip_and_reply(req_id)
-            else:
-                # After the timeout
-                any_nonempty = any(request_responses['sources'].get(source)
-                                   for source in sorted_providers)
-                if all_returned or any_nonempty:
-                    self.skip_and_reply(req_id)
+        if req_type in self.STREAM_RESPONSES:
+            sources = request_responses['sources']
+            pending = [source for source in sorted_providers
+                       if source not in sources and
+                       source not in request_responses['expired_sources']]
+            if not pending:
+                self.skip_and_reply(req_id)
+            elif all(self.provider_speed[source] for source in pending):
+                # Only slow providers are missing, so send what is
+                # available if it changed since the last reply.
+                nonempty_sources = {source for source in sources
+                                    if sources[source].get('params')}
+                if nonempty_sources != request_responses['sent_sources']:
+                    request_responses['sent_sources'] = nonempty_sources
+                    self.stats.request_replied(req_id, final=False)
+                    self.gather_and_reply(request_responses, partial=True)
         else:
             # Any empty response will be discarded and the completion
             # loop will wait for the next non-empty response.
@@ -1249,15 +1298,19 @@ def skip_and_reply(self, req_id: int):
 
         logger.debug("Completion plugin: Request {} removed".format(req_id))
         del self.requests[req_id]
+        self.stats.request_replied(req_id, sent=do_send)
 
         # Send only recent responses
         if do_send:
             self.gather_and_reply(request_responses)
 
-    def gather_and_reply(self, request_responses: dict):
+    def gather_and_reply(self, request_responses: dict, partial=False):
         """
         Gather request responses from all providers and send them to the
         CodeEditor instance that requested them.
+
+        If `partial` is True, some providers haven't replied yet and a new
+        response will follow when they do.
         """
         req_type = request_responses['req_type']
         req_id_responses = request_responses['sources']
@@ -1268,6 +1321,8 @@ def gather_and_reply(self, request_responses: dict):
             responses = self.gather_completions(req_id_responses)
         else:
             responses = self.gather_responses(req_type, req_id_responses)
+        if partial:
+            responses['partial'] = True
 
         try:
             if response_instance:
@@ -1296,7 +1351,10 @@ def gather_completions(self, req_id_responses: dict):
                     continue
                 dedupe_set.add(dedupe_key)
 
-                response['sortText'] = (priority, response['sortText'])
+                # Copy the response to not alter the one received, which
+                # can be gathered again for streamed requests.
+                response = dict(
+                    response, sortText=(priority, response['sortText']))
                 responses.append(response)
                 merge_stats[source] += 1
 
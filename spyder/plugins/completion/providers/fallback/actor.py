@@ -20,14 +20,13 @@
 from qtpy.QtCore import QObject, QThread, QMutex, QMutexLocker, Signal, Slot
 
 # Other imports
-from pygments.lexers import get_lexer_by_name
 from diff_match_patch import diff_match_patch
 
 # Local imports
 from spyder.plugins.completion.api import CompletionItemKind
 from spyder.plugins.completion.api import CompletionRequestTypes
 from spyder.plugins.completion.providers.fallback.utils import (
-    get_keywords, get_words, is_prefix_valid)
+    get_language_keywords, is_prefix_valid, WordIndex)
 
 
 FALLBACK_COMPLETION = "Fallback"
@@ -54,52 +53,44 @@ def __init__(self, parent):
         self.thread.started.connect(self.started)
         self.sig_mailbox.connect(self.handle_msg)
 
-    def tokenize(self, text, offset, language, current_word):
+    def tokenize(self, index, offset, language, current_word):
         """
-        Return all tokens in `text` and all keywords associated by
-        Pygments to `language`.
+        Return all tokens in the `index` of a file and all keywords
+        associated by Pygments to `language`.
         """
-        valid = is_prefix_valid(text, offset, language)
+        valid = is_prefix_valid(index.text, offset, language,
+                                utf16_diff=index.utf16_diff)
         if not valid:
             return []
 
         # Get language keywords provided by Pygments
-        try:
-            lexer = get_lexer_by_name(language)
-            keywords = get_keywords(lexer)
-        except Exception:
-            keywords = []
+        keywords = get_language_keywords(language)
         keyword_set = set(keywords)
-        keywords = [{'kind': CompletionItemKind.KEYWORD,
-                     'insertText': keyword,
-                     'label': keyword,
-                     'sortText': keyword,
-                     'filterText': keyword,
-                     'documentation': '',
-                     'provider': FALLBACK_COMPLETION}
-                    for keyword in keywords]
 
         # Get file tokens
-        tokens = get_words(text, offset, language)
-        tokens = [{'kind': CompletionItemKind.TEXT,
-                   'insertText': token,
-                   'label': token,
-                   'sortText': token,
-                   'filterText': token,
-                   'documentation': '',
-                   'provider': FALLBACK_COMPLETION}
-                  for token in tokens]
-        for token in tokens:
-            if token['insertText'] not in keyword_set:
-                keywords.append(token)
+        tokens = sorted(index.get_words(offset) - keyword_set)
 
-        # Filter matching results
+        # Filter matching results before building their completion items
         if current_word is not None:
             current_word = current_word.lower()
-            keywords = [k for k in keywords
-                        if current_word in k['insertText'].lower()]
+            keywords = [k for k in keywords if current_word in k.lower()]
+            tokens = [t for t in tokens if current_word in t.lower()]
 
-        return keywords
+        items = [self._make_item(keyword, CompletionItemKind.KEYWORD)
+                 for keyword in keywords]
+        items += [self._make_item(token, CompletionItemKind.TEXT)
+                  for token in tokens]
+        return items
+
+    def _make_item(self, text, kind):
+        """Make the completion item of a keyword or token."""
+        return {'kind': kind,
+                'insertText': text,
+                'label': text,
+                'sortText': text,
+                'filterText': text,
+                'documentation': '',
+                'provider': FALLBACK_COMPLETION}
 
     def stop(self):
         """Stop actor."""
@@ -124,23 +115,31 @@ def handle_msg(self, message):
         logger.debug(u'Perform request {0} with id {1}'.format(msg_type, _id))
         if msg_type == CompletionRequestTypes.DOCUMENT_DID_OPEN:
             self.file_tokens[file] = {
-                'text': msg['text'],
+                'index': WordIndex(msg['text'], msg['language']),
                 'offset': msg['offset'],
                 'language': msg['language'],
             }
         elif msg_type == CompletionRequestTypes.DOCUMENT_DID_CHANGE:
             if file not in self.file_tokens:
                 self.file_tokens[file] = {
-                    'text': '',
+                    'index': WordIndex('', msg['language']),
                     'offset': msg['offset'],
                     'language': msg['language'],
                 }
-            diff = msg['diff']
-            text = self.file_tokens[file]
-            text['offset'] = msg['offset']
-            text, _ = self.diff_patch.patch_apply(
-                diff, text['text'])
-            self.file_tokens[file]['text'] = text
+            text_info = self.file_tokens[file]
+            text_info['offset'] = msg['offset']
+            index = text_info['index']
+            if 'changes' in msg:
+                index.apply_changes(msg['changes'])
+            elif 'text' in msg:
+                # The full text is preferred to the diff, which isn't
+                # relative to the current text after incremental changes.
+                # Only the lines that changed are indexed again anyway.
+                index.set_text(msg['text'])
+            else:
+                diff = msg['diff']
+                text, _ = self.diff_patch.patch_apply(diff, index.text)
+                index.set_text(text)
         elif msg_type == CompletionRequestTypes.DOCUMENT_DID_CLOSE:
             self.file_tokens.pop(file, {})
         elif msg_type == CompletionRequestTypes.DOCUMENT_COMPLETION:
@@ -148,7 +147,7 @@ def handle_msg(self, message):
             if file in self.file_tokens:
                 text_info = self.file_tokens[file]
                 tokens = self.tokenize(
-                    text_info['text'],
+                    text_info['index'],
                     text_info['offset'],
                     text_info['language'],
                     msg['current_word'])
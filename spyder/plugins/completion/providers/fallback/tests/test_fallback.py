@@ -10,7 +10,8 @@
 import pytest
 from diff_match_patch import diff_match_patch
 from spyder.plugins.completion.api import CompletionRequestTypes
-from spyder.plugins.completion.providers.fallback.utils import get_words
+from spyder.plugins.completion.providers.fallback.utils import (
+    get_words, is_prefix_valid, WordIndex)
 
 
 DATA_PATH = osp.join(osp.dirname(osp.abspath(__file__)), "data")
@@ -90,6 +91,49 @@ def test_get_words():
     assert set(tokens) == {'foo', 'baz', 'car456'}
 
 
+def test_word_index():
+    """Test that WordIndex keeps its words in sync with its text."""
+    def change(start, end, text):
+        return {'range': {'start': {'line': start[0], 'character': start[1]},
+                          'end': {'line': end[0], 'character': end[1]}},
+                'text': text}
+
+    index = WordIndex(TEST_FILE, 'python')
+    assert index.get_words() == set(get_words(TEST_FILE))
+
+    index.apply_changes(
+        [change((3, 0), (3, 0), 'def func(args):\n    pass\n')])
+    assert index.text == TEST_FILE + 'def func(args):\n    pass\n'
+    assert index.get_words() == set(get_words(index.text))
+
+    # Split and join words
+    index.apply_changes([change((3, 7), (3, 7), ' \N{GRINNING FACE} '),
+                         change((1, 16), (2, 0), '')])
+    assert index.get_words() == set(get_words(index.text))
+    assert index.utf16_diff == 1
+    assert 'testa' in index.get_words()
+
+    index.set_text(TEST_FILE_UPDATE)
+    assert index.text == TEST_FILE_UPDATE
+    assert index.get_words() == set(get_words(TEST_FILE_UPDATE))
+    assert index.utf16_diff == 0
+
+    # Words are only excluded if they don't appear somewhere else
+    index.set_text('foo bar\nfoo baz')
+    assert index.get_words(exclude_offset=1) == {'foo', 'bar', 'baz'}
+    assert index.get_words(exclude_offset=15) == {'foo', 'bar'}
+
+
+@pytest.mark.parametrize('offset,valid', [
+    (0, False), (2, True), (4, True), (9, True), (14, True), (18, False),
+    (19, True), (22, False), (24, False)])
+def test_is_prefix_valid(offset, valid):
+    """Test that the prefix at offset is checked in its own line."""
+    text = 'foo bar\n  baz(qux, 12)\n'
+    assert is_prefix_valid(text, offset, 'python') == valid
+    assert is_prefix_valid(text, offset, 'python', utf16_diff=0) == valid
+
+
 @pytest.mark.parametrize('file_fixture', language_list, indirect=True)
 def test_tokenize(qtbot_module, fallback_fixture, file_fixture):
     filename, expected_tokens, contents = file_fixture
@@ -169,3 +213,41 @@ def test_token_update(qtbot_module, fallback_fixture):
     updated_tokens = blocker.args[0]
     updated_tokens = {token['insertText'] for token in updated_tokens}
     assert 'args' in updated_tokens
+
+
+def test_token_update_full_text(qtbot_module, fallback_fixture):
+    """Test that the full text of an update is preferred to its diff."""
+    fallback, completions, diff_match = fallback_fixture
+    open_request = {
+        'file': 'full.py',
+        'text': TEST_FILE,
+        'offset': len(TEST_FILE),
+    }
+    fallback.send_request(
+        'python', CompletionRequestTypes.DOCUMENT_DID_OPEN, open_request)
+
+    # The diff is relative to an outdated text
+    update_request = {
+        'file': 'full.py',
+        'text': TEST_FILE_UPDATE,
+        'diff': diff_match.patch_make('', TEST_FILE_UPDATE),
+        'offset': len(TEST_FILE_UPDATE),
+    }
+    fallback.send_request(
+        'python', CompletionRequestTypes.DOCUMENT_DID_CHANGE, update_request)
+
+    tokens_request = {
+        'file': 'full.py',
+        'current_word': ''
+    }
+    with qtbot_module.waitSignal(completions.sig_recv_tokens,
+                                 timeout=3000) as blocker:
+        fallback.send_request(
+            'python',
+            CompletionRequestTypes.DOCUMENT_COMPLETION,
+            tokens_request
+        )
+    assert fallback.fallback_actor.file_tokens['full.py']['index'].text == (
+        TEST_FILE_UPDATE)
+    tokens = {token['insertText'] for token in blocker.args[0]}
+    assert 'args' in tokens
@@ -9,6 +9,7 @@
 """
 
 # Standard imports
+from collections import Counter
 import importlib
 import os
 import os.path as osp
@@ -22,6 +23,7 @@
 # Local imports
 from spyder.utils.misc import memoize
 from spyder.utils.qstringhelpers import qstring_length
+from spyder.utils.sourcecode import position_to_offset
 from spyder.utils.syntaxhighlighters import (
     custom_extension_lexer_mapping
 )
@@ -98,6 +100,17 @@ def get_keywords(lexer):
     return keywords
 
 
+@memoize
+def get_language_keywords(language):
+    """Get the keywords associated by Pygments to `language`."""
+    try:
+        lexer = get_lexer_by_name(language)
+        keywords = get_keywords(lexer)
+    except Exception:
+        keywords = []
+    return list(dict.fromkeys(keywords))
+
+
 def get_words(text, exclude_offset=None, language=''):
     """
     Extract all words from a source code file to be used in code completion.
@@ -116,12 +129,18 @@ def get_words(text, exclude_offset=None, language=''):
     return tokens
 
 
-def is_prefix_valid(text, offset, language):
-    """Check if current offset prefix is valid."""
+def is_prefix_valid(text, offset, language, utf16_diff=None):
+    """
+    Check if current offset prefix is valid.
+
+    `utf16_diff` is the difference between the length of `text` in UTF-16
+    code units and its length, if it's already known.
+    """
     # Account for length differences in text when using characters
     # such as emojis in the editor.
     # Fixes spyder-ide/spyder#11862
-    utf16_diff = qstring_length(text) - len(text)
+    if utf16_diff is None:
+        utf16_diff = qstring_length(text) - len(text)
 
     new_offset = offset - utf16_diff - 1
     if new_offset >= len(text) or new_offset < 0:
@@ -130,22 +149,135 @@ def is_prefix_valid(text, offset, language):
     current_pos_text = text[new_offset]
 
     empty_start = empty_regex.match(current_pos_text) is not None
-    max_end = -1
     regex = LANGUAGE_REGEX.get(language.lower(), all_regex)
     prefix = ''
 
-    for match in regex.finditer(text):
+    # Words don't span several lines, so only the words from the line of
+    # `offset` onwards need to be checked.
+    line_start = text.rfind('\n', 0, offset) + 1
+    words_after = False
+    for match in regex.finditer(text, line_start):
         start, end = match.span()
-        max_end = max(end, max_end)
-        if offset >= start and offset <= end:
+        if start > offset:
+            words_after = True
+            break
+        if end >= offset:
+            words_after = True
             prefix = match.group()
-    if offset > max_end:
+    if not words_after:
         if letter_regex.match(current_pos_text):
             prefix = current_pos_text
     valid = prefix != '' or (prefix == '' and empty_start)
     return valid
 
 
+class WordIndex(object):
+    """
+    Words of a document and their number of occurrences.
+
+    The index is updated only in the lines affected by each change, so its
+    cost doesn't depend on the size of the document.
+    """
+
+    def __init__(self, text='', language=''):
+        self.language = language
+        self.regex = LANGUAGE_REGEX.get(language.lower(), all_regex)
+        self.text = ''
+        self.utf16_diff = 0
+        self.words = Counter()
+        self._replace(0, 0, text)
+
+    def _replace(self, start, end, new_text):
+        """Replace the text between `start` and `end` by `new_text`."""
+        text = self.text
+
+        # Words don't span several lines, so the words of the lines
+        # touched by the change are the only ones that can change.
+        line_start = text.rfind('\n', 0, start) + 1
+        line_end = text.find('\n', end)
+        if line_end == -1:
+            line_end = len(text)
+        old_lines = text[line_start:line_end]
+        new_lines = text[line_start:start] + new_text + text[end:line_end]
+
+        self.words.subtract(self.regex.findall(old_lines))
+        self.words.update(self.regex.findall(new_lines))
+        self.utf16_diff += (
+            qstring_length(new_lines) - len(new_lines) -
+            qstring_length(old_lines) + len(old_lines))
+        self.text = text[:line_start] + new_lines + text[line_end:]
+
+    def apply_changes(self, changes):
+        """
+        Apply a list of LSP content change events, in order.
+
+        Changes without a range replace the whole text.
+        """
+        for change in changes:
+            text_range = change.get('range')
+            if text_range is None:
+                self.set_text(change['text'])
+                continue
+            start_position = text_range['start']
+            start = position_to_offset(self.text, start_position)
+            line_start = self.text.rfind('\n', 0, start) + 1
+            end = position_to_offset(self.text, text_range['end'],
+                                     offset=line_start,
+                                     line=start_position['line'])
+            self._replace(start, end, change['text'])
+
+    def set_text(self, text):
+        """Set the whole text, updating the words only where it changed."""
+        old_text = self.text
+        if text == old_text:
+            return
+
+        # Find the common prefix and suffix of the old and new texts
+        max_length = min(len(old_text), len(text))
+        low, high = 0, max_length
+        while low < high:
+            middle = (low + high + 1) // 2
+            if old_text[:middle] == text[:middle]:
+                low = middle
+            else:
+                high = middle - 1
+        prefix = low
+
+        low, high = 0, max_length - prefix
+        while low < high:
+            middle = (low + high + 1) // 2
+            if old_text[len(old_text) - middle:] == text[len(text) - middle:]:
+                low = middle
+            else:
+                high = middle - 1
+        suffix = low
+
+        self._replace(prefix, len(old_text) - suffix,
+                      text[prefix:len(text) - suffix])
+
+    def get_words(self, exclude_offset=None):
+        """
+        Get the words of the document.
+
+        The word at `exclude_offset` is not included, unless it appears
+        somewhere else in the document.
+        """
+        words = {word for word, count in self.words.items() if count > 0}
+        if exclude_offset is not None:
+            text = self.text
+            line_start = text.rfind('\n', 0, exclude_offset) + 1
+            line_end = text.find('\n', exclude_offset)
+            if line_end == -1:
+                line_end = len(text)
+            for match in self.regex.finditer(text, line_start, line_end):
+                start, end = match.span()
+                if start > exclude_offset:
+                    break
+                if end >= exclude_offset and self.words[match.group()] == 1:
+                    words.discard(match.group())
+        return words
+
+
 @memoize
 def get_parent_until(path):
     """
@@ -18,6 +18,7 @@
     send_request, handles)
 from spyder.plugins.completion.api import (
     CompletionRequestTypes, CompletionItemKind)
+from spyder.utils.sourcecode import apply_text_changes
 
 
 # Kite can return e.g. "int | str", so we make the default hint VALUE.
@@ -88,10 +89,18 @@ def document_did_open(self, params):
 
     @send_request(method=CompletionRequestTypes.DOCUMENT_DID_CHANGE)
     def document_did_change(self, params):
+        if 'changes' in params:
+            # Kite needs the full text, so incremental changes are applied
+            # to the last one sent.
+            with QMutexLocker(self.mutex):
+                text = self.opened_files.get(params['file'], '')
+            text = apply_text_changes(text, params['changes'])
+        else:
+            text = params['text']
         request = {
             'source': 'spyder',
             'filename': osp.realpath(params['file']),
-            'text': params['text'],
+            'text': text,
             'action': 'edit',
             'selections': [{
                 'start': params['selection_start'],
@@ -100,7 +109,7 @@ def document_did_change(self, params):
             }],
         }
         with QMutexLocker(self.mutex):
-            self.opened_files[params['file']] = params['text']
+            self.opened_files[params['file']] = text
         return request
 
     @send_request(method=CompletionRequestTypes.DOCUMENT_CURSOR_EVENT)
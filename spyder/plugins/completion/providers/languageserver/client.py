@@ -12,16 +12,19 @@
 """
 
 # Standard library imports
+from collections import OrderedDict
+import json
 import logging
 import os
 import os.path as osp
 import pathlib
 import signal
 import sys
+import threading
 import time
 
 # Third-party imports
-from qtpy.QtCore import QObject, QProcess, QSocketNotifier, Signal, Slot
+from qtpy.QtCore import QObject, QProcess, QTimer, Signal, Slot
 import zmq
 import psutil
 
@@ -50,6 +53,21 @@
 SERVER_READY = 'server_ready'
 LOCALHOST = '127.0.0.1'
 
+# Time (in ms) the receiver thread waits for messages before checking if it
+# needs to stop.
+RECEIVE_POLL_TIMEOUT = 100
+
+# Maximum time (in seconds) spent dispatching received messages on every
+# iteration of the event loop, to keep the interface responsive.
+DISPATCH_TIME_BUDGET = 0.01
+
+# Responses to these requests are coalesced per document when several of them
+# are waiting to be dispatched, because only the last one is relevant.
+COALESCED_REQUESTS = {
+    CompletionRequestTypes.DOCUMENT_COMPLETION,
+    CompletionRequestTypes.DOCUMENT_SYMBOL
+}
+
 # Language server communication verbosity at server logs.
 TRACE = 'messages'
 if DEV:
@@ -73,6 +91,10 @@ class LSPClient(QObject, LSPMethodProviderMixIn, SpyderConfigurationAccessor):
     #  server went down
     sig_went_down = Signal(str)
 
+    #: Signal emitted by the receiver thread when there are new messages
+    #  waiting to be dispatched.
+    sig_messages_received = Signal()
+
     def __init__(self, parent,
                  server_settings={},
                  folder=getcwd_or_home(),
@@ -86,7 +108,6 @@ def __init__(self, parent,
         self.transport = None
         self.server = None
         self.stdio_pid = None
-        self.notifier = None
         self.language = language
 
         self.initialized = False
@@ -135,6 +156,20 @@ def __init__(self, parent,
         # Save requests name and id. This is only necessary for testing.
         self._requests = []
 
+        # Messages are received and decoded in a separate thread, and then
+        # dispatched in the main one.
+        self._receiver = None
+        self._receiving = threading.Event()
+        self._pending_lock = threading.Lock()
+        self._pending_messages = OrderedDict()
+        self._dispatch_scheduled = False
+        self._message_count = 0
+
+        # Document of the requests whose responses can be coalesced, by id.
+        # This is accessed from both threads.
+        self._coalesced_requests = {}
+        self.sig_messages_received.connect(self.dispatch_messages)
+
     def _get_log_filename(self, kind):
         """
         Get filename to redirect server or transport logs to in
@@ -365,10 +400,13 @@ def start(self):
         self.start_server()
         self.start_transport()
 
-        # Create notifier
-        fid = self.zmq_in_socket.getsockopt(zmq.FD)
-        self.notifier = QSocketNotifier(fid, QSocketNotifier.Read, self)
-        self.notifier.activated.connect(self.on_msg_received)
+        # Start receiving messages
+        self._receiving.set()
+        self._receiver = threading.Thread(
+            target=self.on_msg_received,
+            name='LSPReceiver-{}'.format(self.language),
+            daemon=True)
+        self._receiver.start()
 
         # This is necessary for tests to pass locally!
         logger.debug('LSP {} client started!'.format(self.language))
@@ -376,10 +414,13 @@ def start(self):
     def stop(self):
         """Stop transport and server."""
         logger.info('Stopping {} client...'.format(self.language))
-        if self.notifier is not None:
-            self.notifier.activated.disconnect(self.on_msg_received)
-            self.notifier.setEnabled(False)
-            self.notifier = None
+        if self._receiver is not None:
+            self._receiving.clear()
+            self._receiver.join(2 * RECEIVE_POLL_TIMEOUT / 1000)
+            self._receiver = None
+        with self._pending_lock:
+            self._pending_messages.clear()
+        self._coalesced_requests.clear()
 
         # waitForFinished(): Wait some time for process to exit. This fixes an
         # error message by Qt (“QProcess: Destroyed while process (…) is still
@@ -461,18 +502,24 @@ def send(self, method, params, kind):
         _id = self.request_seq
         if kind == MessageKind.REQUEST:
             msg = {
+                'jsonrpc': '2.0',
                 'id': self.request_seq,
                 'method': method,
                 'params': params
             }
             self.req_status[self.request_seq] = method
+            if method in COALESCED_REQUESTS:
+                uri = params.get('textDocument', {}).get('uri')
+                self._coalesced_requests[self.request_seq] = (method, uri)
         elif kind == MessageKind.RESPONSE:
             msg = {
+                'jsonrpc': '2.0',
                 'id': self.request_seq,
                 'result': params
             }
         elif kind == MessageKind.NOTIFICATION:
             msg = {
+                'jsonrpc': '2.0',
                 'method': method,
                 'params': params
             }
@@ -483,6 +530,10 @@ def send(self, method, params, kind):
         if running_under_pytest():
             self._requests.append((_id, method))
 
+        # Messages are sent to the transport as JSON, ready to be relayed to
+        # the server.
+        msg = json.dumps(msg).encode('utf-8')
+
         # Try sending a message. If the send queue is full, keep trying for a
         # a second before giving up.
         timeout = 1
@@ -490,7 +541,7 @@ def send(self, method, params, kind):
         timeout_time = start_time + timeout
         while True:
             try:
-                self.zmq_out_socket.send_pyobj(msg, flags=zmq.NOBLOCK)
+                self.zmq_out_socket.send(msg, flags=zmq.NOBLOCK)
                 self.request_seq += 1
                 return int(_id)
             except zmq.error.Again:
@@ -502,68 +553,163 @@ def send(self, method, params, kind):
                     logger.warning("The send queue is full! Retrying...")
                 time.sleep(.1)
 
-    @Slot()
     def on_msg_received(self):
-        """Process received messages."""
-        self.notifier.setEnabled(False)
-        while True:
+        """
+        Receive and decode messages.
+
+        This runs in the receiver thread until the client is stopped.
+        Decoded messages are queued for `dispatch_messages`, coalescing the
+        ones that make previous messages for the same document irrelevant.
+        """
+        while self._receiving.is_set():
             try:
-                # events = self.zmq_in_socket.poll(1500)
-                resp = self.zmq_in_socket.recv_pyobj(flags=zmq.NOBLOCK)
+                if not self.zmq_in_socket.poll(RECEIVE_POLL_TIMEOUT):
+                    continue
+
+                messages = []
+                while True:
+                    try:
+                        messages.append(
+                            self.zmq_in_socket.recv(flags=zmq.NOBLOCK))
+                    except zmq.error.Again:
+                        break
+            except zmq.ZMQError:
+                # The socket was closed
+                return
 
+            for i, resp in enumerate(messages):
+                # Messages are relayed by the transport as they're sent by
+                # the server.
                 try:
-                    method = resp['method']
-                    logger.debug(
-                        '{} response: {}'.format(self.language, method))
-                except KeyError:
-                    pass
-
-                if 'error' in resp:
-                    logger.debug('{} Response error: {}'
-                                 .format(self.language, repr(resp['error'])))
-                    if self.language == 'python':
-                        # Show PyLS errors in our error report dialog only in
-                        # debug or development modes
-                        if get_debug_level() > 0 or DEV:
-                            message = resp['error'].get('message', '')
-                            traceback = (resp['error'].get('data', {}).
-                                         get('traceback'))
-                            if traceback is not None:
-                                traceback = ''.join(traceback)
-                                traceback = traceback + '\n' + message
-                                self.sig_server_error.emit(traceback)
-                        req_id = resp['id']
-                        if req_id in self.req_reply:
-                            self.req_reply[req_id](None, {'params': []})
-                elif 'method' in resp:
-                    if resp['method'][0] != '$':
-                        if 'id' in resp:
-                            self.request_seq = int(resp['id'])
-                        if resp['method'] in self.handler_registry:
-                            handler_name = (
-                                self.handler_registry[resp['method']])
-                            handler = getattr(self, handler_name)
-                            handler(resp['params'])
-                elif 'result' in resp:
-                    if resp['result'] is not None:
-                        req_id = resp['id']
-                        if req_id in self.req_status:
-                            req_type = self.req_status[req_id]
-                            if req_type in self.handler_registry:
-                                handler_name = self.handler_registry[req_type]
-                                handler = getattr(self, handler_name)
-                                handler(resp['result'], req_id)
-                                self.req_status.pop(req_id)
-                                if req_id in self.req_reply:
-                                    self.req_reply.pop(req_id)
+                    messages[i] = json.loads(resp)
+                except ValueError:
+                    logger.error('{} invalid message: {!r}'.format(
+                        self.language, resp))
+                    messages[i] = None
+
+            with self._pending_lock:
+                for resp in messages:
+                    if isinstance(resp, dict):
+                        self._queue_message(resp)
+                notify = (bool(self._pending_messages) and
+                          not self._dispatch_scheduled)
+                if notify:
+                    self._dispatch_scheduled = True
+
+            if notify:
+                self.sig_messages_received.emit()
+
+    def _queue_message(self, resp):
+        """
+        Add a message to the pending ones.
+
+        Pending diagnostics are replaced by new ones for the same document.
+        Pending responses to requests in COALESCED_REQUESTS are replaced by
+        newer responses of the same kind for the same document. Those are
+        still dispatched, but with a null result, so that their handlers can
+        clean up after them.
+
+        Notes
+        -----
+        This must be called with `_pending_lock` held.
+        """
+        pending = self._pending_messages
+        key = None
+        if (resp.get('method') ==
+                CompletionRequestTypes.DOCUMENT_PUBLISH_DIAGNOSTICS):
+            key = (resp['method'], resp.get('params', {}).get('uri'))
+            pending.pop(key, None)
+        elif 'id' in resp and 'method' not in resp:
+            request = self._coalesced_requests.pop(resp['id'], None)
+            if request is not None and 'result' in resp:
+                key = request
+                previous = pending.pop(key, None)
+                if previous is not None:
+                    previous['result'] = None
+                    previous['superseded'] = True
+                    self._message_count += 1
+                    pending[self._message_count] = previous
+
+        if key is None:
+            self._message_count += 1
+            key = self._message_count
+        pending[key] = resp
+
+    @Slot()
+    def dispatch_messages(self):
+        """
+        Dispatch received messages to their handlers.
+
+        To not block the interface, this stops after DISPATCH_TIME_BUDGET
+        and resumes in the next iteration of the event loop.
+        """
+        deadline = time.perf_counter() + DISPATCH_TIME_BUDGET
+        while True:
+            with self._pending_lock:
+                if not self._pending_messages:
+                    self._dispatch_scheduled = False
+                    return
+                __, resp = self._pending_messages.popitem(last=False)
+
+            try:
+                self._process_message(resp)
             except RuntimeError:
                 # This is triggered when a codeeditor instance has been
                 # removed before the response can be processed.
                 pass
-            except zmq.ZMQError:
-                self.notifier.setEnabled(True)
+
+            if time.perf_counter() > deadline:
+                QTimer.singleShot(0, self.dispatch_messages)
                 return
 
+    def _process_message(self, resp):
+        """Process a received message."""
+        try:
+            method = resp['method']
+            logger.debug(
+                '{} response: {}'.format(self.language, method))
+        except KeyError:
+            pass
+
+        if 'error' in resp:
+            logger.debug('{} Response error: {}'
+                         .format(self.language, repr(resp['error'])))
+            if self.language == 'python':
+                # Show PyLS errors in our error report dialog only in
+                # debug or development modes
+                if get_debug_level() > 0 or DEV:
+                    message = resp['error'].get('message', '')
+                    traceback = (resp['error'].get('data', {}).
+                                 get('traceback'))
+                    if traceback is not None:
+                        traceback = ''.join(traceback)
+                        traceback = traceback + '\n' + message
+                        self.sig_server_error.emit(traceback)
+                req_id = resp['id']
+                if req_id in self.req_reply:
+                    self.req_reply[req_id](None, {'params': []})
+        elif 'method' in resp:
+            if resp['method'][0] != '$':
+                if 'id' in resp:
+                    self.request_seq = int(resp['id'])
+                if resp['method'] in self.handler_registry:
+                    handler_name = (
+                        self.handler_registry[resp['method']])
+                    handler = getattr(self, handler_name)
+                    handler(resp['params'])
+        elif 'result' in resp:
+            if resp['result'] is not None or resp.get('superseded'):
+                req_id = resp['id']
+                if req_id in self.req_status:
+                    req_type = self.req_status[req_id]
+                    if req_type in self.handler_registry:
+                        handler_name = self.handler_registry[req_type]
+                        handler = getattr(self, handler_name)
+                        handler(resp['result'], req_id)
+                        self.req_status.pop(req_id)
+                        if req_id in self.req_reply:
+                            self.req_reply.pop(req_id)
+
     def perform_request(self, method, params):
         if method in self.sender_registry:
             handler_name = self.sender_registry[method]
@@ -46,14 +46,17 @@ def process_document_diagnostics(self, response, *args):
 
     @send_notification(method=CompletionRequestTypes.DOCUMENT_DID_CHANGE)
     def document_changed(self, params):
+        if 'changes' in params:
+            # Incremental changes, sent if the server supports them
+            content_changes = params['changes']
+        else:
+            content_changes = [{'text': params['text']}]
         params = {
             'textDocument': {
                 'uri': path_as_uri(params['file']),
                 'version': params['version']
             },
-            'contentChanges': [{
-                'text': params['text']
-            }]
+            'contentChanges': content_changes
         }
         return params
 
@@ -135,6 +135,44 @@ def test_get_completions(lsp_client_and_completion, qtbot):
     assert 'os' in [x['label'] for x in completions]
 
 
+@pytest.mark.order(3)
+def test_coalesce_messages(lsp_client_and_completion, qtbot):
+    """Test that messages for the same document are coalesced."""
+    client, completion = lsp_client_and_completion
+    responses = []
+    uri = 'file:///coalesced.py'
+
+    def callback(method, params):
+        responses.append((method, params['params']))
+
+    # Requests waiting for a response
+    for req_id in [-3, -2, -1]:
+        client.req_status[req_id] = CompletionRequestTypes.DOCUMENT_COMPLETION
+        client.req_reply[req_id] = callback
+        client._coalesced_requests[req_id] = (
+            CompletionRequestTypes.DOCUMENT_COMPLETION, uri)
+
+    # Queue a burst of messages
+    with client._pending_lock:
+        for i in range(3):
+            client._queue_message({
+                'method': CompletionRequestTypes.DOCUMENT_PUBLISH_DIAGNOSTICS,
+                'params': {'uri': uri, 'diagnostics': [i]}})
+        for req_id in [-3, -2, -1]:
+            client._queue_message({
+                'id': req_id, 'result': [{'label': str(req_id)}]})
+        assert len(client._pending_messages) == 4
+        client._dispatch_scheduled = True
+
+    # Check that old responses are dispatched without a result
+    client.dispatch_messages()
+    assert [params for __, params in responses[:2]] == [None, None]
+    assert [item['label'] for item in responses[2][1]] == ['-1']
+    assert not client._pending_messages
+    assert not client._dispatch_scheduled
+    assert all(req_id not in client.req_status for req_id in [-3, -2, -1])
+
+
 @pytest.mark.order(3)
 def test_go_to_definition(lsp_client_and_completion, qtbot):
     client, completion = lsp_client_and_completion
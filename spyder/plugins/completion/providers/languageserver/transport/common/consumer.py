@@ -12,11 +12,14 @@
 
 This module handles and processes incoming messages sent by an LSP server,
 then it relays the information to the actual Spyder LSP client via ZMQ.
+
+Messages are relayed as raw JSON bytes, so they're only decoded once, by the
+client.
 """
 
 
+import codecs
 import os
-import json
 import socket
 import logging
 from threading import Thread, Lock
@@ -67,10 +70,12 @@ def read_posix(self):
         return self.encode_body(body, headers)
 
     def encode_body(self, body, headers):
+        """Get the message `body` encoded in UTF-8, as the client expects."""
         encoding = 'utf8'
         if b'Content-Type' in headers:
             encoding = headers[b'Content-Type'].split(b'=')[-1].decode('utf8')
-        body = body.decode(encoding)
+        if codecs.lookup(encoding).name != 'utf-8':
+            body = body.decode(encoding).encode('utf-8')
         return body
 
     def expect_windows(self):
@@ -107,16 +112,9 @@ def run(self):
                     break
             try:
                 body = self.read_incoming()
-                err = False
-                try:
-                    body = json.loads(body)
-                except (ValueError, TypeError) as e:
-                    err = True
-                    logger.error(e)
-                if not err:
-                    logger.debug(body)
-                    self.zmq_sock.send_pyobj(body)
-                    logger.debug('Message sent')
+                logger.debug(body)
+                self.zmq_sock.send(body)
+                logger.debug('Message sent')
             except socket.error as e:
                 logger.error(e)
         logger.debug('Thread stopped.')
@@ -15,6 +15,9 @@
 incoming requests from the actual Spyder LSP client ZMQ queue and to
 encapsulate them into valid JSONRPC messages before sending them to the
 LSP server, using the specific transport mode.
+
+Requests are received as JSON bytes, ready to be sent to the server, so they
+don't need to be decoded here.
 """
 
 # Standard library imports
@@ -61,44 +64,22 @@ def finalize_initialization(self):
         self.zmq_out_socket.connect("tcp://{0}:{1}".format(
             LOCALHOST, self.zmq_out_port))
         logger.info('Sending server_ready...')
-        self.zmq_out_socket.send_pyobj({'id': 0, 'method': 'server_ready',
-                                        'params': {'pid': pid}})
+        server_ready = {'jsonrpc': '2.0', 'id': 0, 'method': 'server_ready',
+                        'params': {'pid': pid}}
+        self.zmq_out_socket.send(json.dumps(server_ready).encode('utf-8'))
 
     def listen(self):
         events = self.zmq_in_socket.poll(TIMEOUT)
-        # requests = []
         while events > 0:
-            client_request = self.zmq_in_socket.recv_pyobj()
+            client_request = self.zmq_in_socket.recv()
             logger.debug("Client Event: {0}".format(client_request))
-            server_request = self.__compose_request(client_request)
-            self.__send_request(server_request)
-            # self.zmq_socket.send_pyobj({'a': 'b'})
+            self.__send_request(client_request)
             events -= 1
 
-    def __compose_request(self, request):
-        request['jsonrpc'] = '2.0'
-        return request
-
-    def __send_request(self, request):
-        json_req = json.dumps(request)
-        content = bytes(json_req.encode('utf-8'))
-        content_length = len(content)
-
-        if 'method' in request:
-            if 'id' in request:
-                logger.debug(
-                    'Sending request of type: {0}'.format(request['method']))
-            else:
-                logger.debug(
-                    'Sending notification of type: {0}'.format(
-                        request['method']))
-        else:
-            logger.debug('Sending reply to server')
-        logger.debug(json_req)
-
+    def __send_request(self, content):
         content_length = self.CONTENT_LENGTH.format(
-            content_length).encode('utf-8')
-        self.transport_send(bytes(content_length), content)
+            len(content)).encode('utf-8')
+        self.transport_send(content_length, content)
 
     def transport_send(self, content_length, body):
         """Subclasses should override this method"""
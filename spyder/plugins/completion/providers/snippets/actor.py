@@ -42,6 +42,7 @@ def __init__(self, parent):
         self.daemon = True
         self.mutex = QMutex()
         self.language_snippets = {}
+        self.language_items = {}
         self.thread = QThread(None)
         self.moveToThread(self.thread)
 
@@ -74,8 +75,50 @@ def update_snippets(self, snippets):
             lang_trie = Trie()
             for trigger in lang_snippets:
                 trigger_descriptions = lang_snippets[trigger]
-                lang_trie[trigger] = (trigger, trigger_descriptions)
+                lang_trie[trigger] = self._make_items(
+                    trigger, trigger_descriptions)
             self.language_snippets[language] = lang_trie
+            self.language_items[language] = {}
+
+    @staticmethod
+    def _make_items(trigger, descriptions):
+        """Create the completion items of the snippets of `trigger`."""
+        items = []
+        for description in descriptions:
+            description_snippet = descriptions[description]
+            items.append({
+                'kind': CompletionItemKind.SNIPPET,
+                'insertText': description_snippet['text'],
+                'label': f'{trigger} ({description})',
+                'sortText': f'zzz{trigger}',
+                'filterText': trigger,
+                'documentation': '',
+                'provider': SNIPPETS_COMPLETION,
+                'remove_trigger': description_snippet['remove_trigger']
+            })
+        return items
+
+    def get_snippets(self, language, prefix):
+        """
+        Get the completion items of the snippets of `language` whose
+        trigger starts with `prefix`.
+
+        Items are cached per prefix until snippets are updated, so repeated
+        queries only cost a dictionary lookup.
+        """
+        if language not in self.language_snippets:
+            return []
+
+        prefix_items = self.language_items[language]
+        items = prefix_items.get(prefix)
+        if items is None:
+            items = []
+            for trigger_items in self.language_snippets[language].values(
+                    prefix):
+                items += trigger_items
+            if items:
+                prefix_items[prefix] = items
+        return items
 
     @Slot(dict)
     def handle_msg(self, message):
@@ -88,31 +131,8 @@ def handle_msg(self, message):
             current_word = msg['current_word']
             snippets = []
 
-            if current_word is None:
-                snippets = {'params': snippets}
-                self.sig_snippets_response.emit(_id, snippets)
-                return
-
-            if language in self.language_snippets:
-                language_snippets = self.language_snippets[language]
-                if language_snippets[current_word]:
-                    for node in language_snippets[current_word]:
-                        trigger, info = node.value
-                        for description in info:
-                            description_snippet = info[description]
-                            text = description_snippet['text']
-                            remove_trigger = description_snippet[
-                                'remove_trigger']
-                            snippets.append({
-                                'kind': CompletionItemKind.SNIPPET,
-                                'insertText': text,
-                                'label': f'{trigger} ({description})',
-                                'sortText': f'zzz{trigger}',
-                                'filterText': trigger,
-                                'documentation': '',
-                                'provider': SNIPPETS_COMPLETION,
-                                'remove_trigger': remove_trigger
-                            })
+            if current_word is not None:
+                snippets = list(self.get_snippets(language, current_word))
 
             snippets = {'params': snippets}
             self.sig_snippets_response.emit(_id, snippets)
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+# (see spyder/__init__.py for details)
+
+"""Tests for the snippets prefix tree."""
+
+# Third-party imports
+import pytest
+
+# Local imports
+from spyder.plugins.completion.providers.snippets.actor import SnippetsActor
+from spyder.plugins.completion.providers.snippets.trie import Trie
+
+
+def test_trie():
+    trie = Trie()
+    for word in ['for', 'format', 'from', 'f', 'while']:
+        trie[word] = word.upper()
+    trie['for'] = 'FOR!'
+
+    assert len(trie) == 5
+    assert 'for' in trie
+    assert 'fo' not in trie
+    assert 'forms' not in trie
+    assert trie['format'] == 'FORMAT'
+    with pytest.raises(KeyError):
+        trie['fo']
+
+    # Shortest sequences come first
+    assert trie.values('fo') == ['FOR!', 'FORMAT']
+    assert trie.values('f')[:2] == ['F', 'FOR!']
+    assert sorted(trie.values('f')) == ['F', 'FOR!', 'FORMAT', 'FROM']
+    assert trie.values('x') == []
+    assert sorted(trie) == ['f', 'for', 'format', 'from', 'while']
+
+
+def test_snippets_cache():
+    """Test that completion items are computed once per prefix."""
+    actor = SnippetsActor(None)
+    actor.update_snippets({'python': {
+        'for': {'loop': {'text': 'for $1:', 'remove_trigger': False}},
+        'from': {'import': {'text': 'from $1 import $2',
+                            'remove_trigger': True}},
+    }})
+
+    items = actor.get_snippets('python', 'f')
+    assert sorted(item['label'] for item in items) == [
+        'for (loop)', 'from (import)']
+    assert actor.get_snippets('python', 'f') is items
+    assert actor.get_snippets('python', 'fr')[0]['insertText'] == (
+        'from $1 import $2')
+    assert actor.get_snippets('python', 'x') == []
+    assert actor.get_snippets('julia', 'f') == []
+
+    # Updating the snippets discards cached items
+    actor.update_snippets({'python': {}})
+    assert actor.get_snippets('python', 'f') == []
+
+
+if __name__ == "__main__":
+    pytest.main()
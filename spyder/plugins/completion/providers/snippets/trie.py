@@ -6,89 +6,87 @@
 
 """General purpose prefix tree, also known as a trie."""
 
+# Standard library imports
+from collections import deque
 
-class TrieNode:
-    def __init__(self, key=None, value=None):
-        self.children = {}
-        self.key = key
-        self.value = value
 
-    def __setitem__(self, sequence, value):
-        elem = sequence[0]
-        if self.key is None:
-            self.key = elem
+class Trie:
+    """
+    Prefix tree that maps sequences to values.
 
-        if len(self.key) > 0:
-            sequence = sequence[1:]
+    Nodes are stored in flat lists and referred to by their index, with the
+    root at index 0, so that insertions and lookups are iterative and only
+    take time proportional to the length of the sequence.
+    """
 
-        if sequence:
-            elem = sequence[0]
-            node = self.children.get(elem, None)
+    def __init__(self):
+        # Node index -> {element: child node index}
+        self._children = [{}]
+        # Node index -> (sequence, value) or None if no value ends there
+        self._entries = [None]
+        self._size = 0
+
+    def _find_node(self, sequence):
+        """Get the index of the node of `sequence` or None if missing."""
+        node = 0
+        for elem in sequence:
+            node = self._children[node].get(elem)
             if node is None:
-                node = TrieNode()
-                self.children[elem] = node
-            node[sequence] = value
-        else:
-            self.value = value
-
-    def __getitem__(self, sequence):
-        node = None
-        if sequence[0] == self.key:
-            sequence = sequence[1:]
-            if sequence:
-                if sequence[0] in self.children:
-                    next_children = self.children[sequence[0]]
-                    node = next_children[sequence]
-            else:
-                node = self
+                return None
         return node
 
-    def __iter__(self):
-        queue = [self]
-        while queue != []:
-            node = queue.pop(0)
-            queue += list(node.children.values())
-            if node.value is not None:
-                yield node
+    def __setitem__(self, sequence, value):
+        node = 0
+        for elem in sequence:
+            children = self._children[node]
+            child = children.get(elem)
+            if child is None:
+                child = len(self._children)
+                children[elem] = child
+                self._children.append({})
+                self._entries.append(None)
+            node = child
+
+        if self._entries[node] is None:
+            self._size += 1
+        self._entries[node] = (sequence, value)
+
+    def __getitem__(self, sequence):
+        node = self._find_node(sequence)
+        if node is None or self._entries[node] is None:
+            raise KeyError(sequence)
+        return self._entries[node][1]
 
     def __contains__(self, sequence):
-        if len(sequence) + len(self.key) == 0:
-            return True
-
-        elem = sequence[0]
-        if elem == self.key:
-            sequence = sequence[1:]
-            if not sequence:
-                if self.value is not None:
-                    return True
-                else:
-                    return False
-            elem = sequence[0]
-
-        found = elem in self.children
-        if found:
-            next_children = self.children[elem]
-            found = sequence in next_children
-        return found
-
-
-class Trie(TrieNode):
-    def __init__(self):
-        super().__init__('')
-        self.sequences = []
+        node = self._find_node(sequence)
+        return node is not None and self._entries[node] is not None
 
-    def __getitem__(self, sequence):
-        if sequence:
-            elem = sequence[0]
-            if elem in self.children:
-                node = self.children[elem]
-                return node[sequence]
-        else:
-            return self
-        return None
+    def __len__(self):
+        return self._size
 
-    def __setitem__(self, sequence, value):
-        if sequence:
-            super().__setitem__(sequence, value)
-        else:
-            self.value = value
+    def __iter__(self):
+        for sequence, __ in self.items():
+            yield sequence
+
+    def items(self, prefix=''):
+        """
+        Get the (sequence, value) pairs of the sequences that start with
+        `prefix`, shortest sequences first.
+        """
+        node = self._find_node(prefix)
+        if node is None:
+            return []
+
+        items = []
+        queue = deque([node])
+        while queue:
+            node = queue.popleft()
+            entry = self._entries[node]
+            if entry is not None:
+                items.append(entry)
+            queue.extend(self._children[node].values())
+        return items
+
+    def values(self, prefix=''):
+        """Get the values of the sequences that start with `prefix`."""
+        return [value for __, value in self.items(prefix)]
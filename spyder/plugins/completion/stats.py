@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+# (see spyder/__init__.py for details)
+
+"""
+Latency and throughput statistics of the completion providers.
+"""
+
+# Standard library imports
+from collections import OrderedDict, deque
+import json
+import time
+
+
+# Number of samples kept to compute percentiles, per request type and
+# provider
+MAX_SAMPLES = 1000
+
+# Number of finished requests kept to detect responses that arrive after
+# their request was replied to
+MAX_REQUESTS = 1000
+
+
+def percentile(samples, percent):
+    """
+    Get the `percent` percentile of `samples`, using the nearest rank
+    method.
+
+    Parameters
+    ----------
+    samples: list
+        Sorted samples.
+    percent: float
+        Percentile to compute, between 0 and 100.
+
+    Returns
+    -------
+    float or None
+        The percentile or None if there are no samples.
+    """
+    if not samples:
+        return None
+    rank = max(int(round(percent / 100 * len(samples))), 1)
+    return samples[rank - 1]
+
+
+class ProviderStats(object):
+    """Statistics of the responses of a provider to a request type."""
+
+    def __init__(self):
+        self.requests = 0
+        self.responses = 0
+        self.timeouts = 0
+        self.dropped = 0
+        self.latencies = deque(maxlen=MAX_SAMPLES)
+        self.queue_times = deque(maxlen=MAX_SAMPLES)
+        self.payload_sizes = deque(maxlen=MAX_SAMPLES)
+
+    @staticmethod
+    def summarize(samples):
+        """Get the percentiles of a list of samples."""
+        samples = sorted(samples)
+        return {
+            'p50': percentile(samples, 50),
+            'p90': percentile(samples, 90),
+            'p99': percentile(samples, 99),
+            'max': samples[-1] if samples else None,
+        }
+
+    def to_dict(self):
+        """Get the statistics as a dictionary."""
+        return {
+            'requests': self.requests,
+            'responses': self.responses,
+            'timeouts': self.timeouts,
+            'dropped': self.dropped,
+            'latency_ms': self.summarize(self.latencies),
+            'queue_ms': self.summarize(self.queue_times),
+            'payload_size': self.summarize(self.payload_sizes),
+        }
+
+
+class CompletionStats(object):
+    """
+    Record latency and throughput statistics of the completion providers,
+    per request type.
+
+    The following is recorded for each provider:
+
+    * Latency: Time between a request being sent and its response being
+      received.
+    * Queue time: Time between a response being received and it being
+      sent to the editor, while waiting for the responses of the other
+      providers.
+    * Timeouts: Requests replied to before the provider responded.
+    * Dropped responses: Responses that were received but never sent to
+      the editor, e.g. because they arrived too late or a newer request
+      superseded them.
+    * Payload size: Number of items in a response (or 1 for responses that
+      are not lists).
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._stats = {}
+
+        # Requests recently sent, by id
+        self._requests = OrderedDict()
+
+    def _get_stats(self, req_type, provider):
+        provider_stats = self._stats.setdefault(req_type, {})
+        if provider not in provider_stats:
+            provider_stats[provider] = ProviderStats()
+        return provider_stats[provider]
+
+    def request_sent(self, req_id, req_type, providers):
+        """Record that request `req_id` was sent to `providers`."""
+        for provider in providers:
+            self._get_stats(req_type, provider).requests += 1
+
+        self._requests[req_id] = {
+            'req_type': req_type,
+            'sent': self._clock(),
+            'providers': set(providers),
+            'received': {},
+            'replied': set(),
+            'finished': False,
+        }
+        while len(self._requests) > MAX_REQUESTS:
+            self._requests.popitem(last=False)
+
+    def response_received(self, req_id, provider, response, dropped=False):
+        """
+        Record the response of `provider` to request `req_id`.
+
+        If `dropped` is True, the response won't be sent to the editor.
+        """
+        request = self._requests.get(req_id)
+        if request is None:
+            return
+
+        stats = self._get_stats(request['req_type'], provider)
+        now = self._clock()
+        params = response.get('params') if isinstance(response, dict) else None
+        stats.responses += 1
+        stats.latencies.append((now - request['sent']) * 1000)
+        stats.payload_sizes.append(
+            len(params) if isinstance(params, list) else int(bool(params)))
+
+        if dropped or request['finished']:
+            stats.dropped += 1
+        else:
+            request['received'][provider] = now
+
+    def request_replied(self, req_id, sent=True, final=True):
+        """
+        Record that the responses to request `req_id` were sent to the
+        editor, or discarded if `sent` is False.
+
+        If `final` is False, more responses can be sent for it later.
+        """
+        request = self._requests.get(req_id)
+        if request is None or request['finished']:
+            return
+
+        req_type = request['req_type']
+        now = self._clock()
+        for provider, received in request['received'].items():
+            if provider in request['replied']:
+                continue
+            stats = self._get_stats(req_type, provider)
+            if sent:
+                stats.queue_times.append((now - received) * 1000)
+            else:
+                stats.dropped += 1
+            request['replied'].add(provider)
+
+        if final:
+            request['finished'] = True
+            if sent:
+                for provider in request['providers']:
+                    if provider not in request['received']:
+                        self._get_stats(req_type, provider).timeouts += 1
+
+    def request_discarded(self, req_id):
+        """Record that request `req_id` won't be replied to."""
+        self.request_replied(req_id, sent=False)
+
+    def get_stats(self):
+        """
+        Get the statistics of each request type and provider.
+
+        Returns
+        -------
+        dict
+            Mapping of request types to mappings of provider names to
+            their statistics. Times are in milliseconds.
+        """
+        return {
+            req_type: {
+                provider: stats.to_dict()
+                for provider, stats in sorted(provider_stats.items())
+            }
+            for req_type, provider_stats in sorted(self._stats.items())
+        }
+
+    def to_json(self):
+        """Get the statistics as a JSON string."""
+        return json.dumps(self.get_stats(), indent=2)
+
+    def reset(self):
+        """Discard all the statistics recorded so far."""
+        self._stats = {}
+        self._requests = OrderedDict()
@@ -7,6 +7,9 @@
 
 """CompletionPlugin tests."""
 
+# Standard library imports
+from unittest.mock import Mock
+
 # Third party imports
 import pytest
 from qtpy.QtCore import QObject, Signal, Slot
@@ -43,6 +46,45 @@ def completion_receiver(completion_plugin_all_started):
     return completion_plugin, receiver
 
 
+@pytest.fixture
+def streaming_completion(completion_plugin_all, mocker):
+    """
+    Completion plugin with a fast and a slow fake provider, and a receiver
+    that collects the completion responses.
+    """
+    completion = completion_plugin_all
+    mocker.patch.object(completion, 'available_providers_for_language',
+                        return_value=['fast', 'slow'])
+    mocker.patch.dict(completion.providers, {
+        'fast': {'instance': Mock(), 'status': completion.RUNNING},
+        'slow': {'instance': Mock(), 'status': completion.RUNNING}})
+    mocker.patch.dict(completion.provider_speed, {'fast': False, 'slow': True})
+    mocker.patch.dict(completion.provider_latency_budget,
+                      {'fast': None, 'slow': None})
+    mocker.patch.dict(completion.source_priority, {
+        CompletionRequestTypes.DOCUMENT_COMPLETION: {'fast': 1, 'slow': 0}})
+
+    receiver = DummyCompletionReceiver(None)
+    responses = []
+    receiver.sig_response.connect(lambda method, params: responses.append(
+        (params.get('partial', False),
+         [item['label'] for item in params['params']])))
+
+    def send_request():
+        completion.send_request(
+            'python', CompletionRequestTypes.DOCUMENT_COMPLETION,
+            {'response_instance': receiver})
+        return completion.req_id - 1
+
+    return completion, send_request, responses
+
+
+def completion_items(*labels):
+    """Make the completion response of a provider."""
+    return {'params': [{'label': label, 'insertText': label,
+                        'sortText': label} for label in labels]}
+
+
 def test_configuration_merge(completion_plugin_all):
     first_defaults = dict(FakeProvider.CONF_DEFAULTS)
     first_version = FakeProvider.CONF_VERSION
@@ -251,3 +293,66 @@ def test_plugin_first_response_request(qtbot_module, completion_receiver):
 
     _, response = blocker.args
     assert len(response['params']) > 0
+
+
+def test_streamed_completions(streaming_completion):
+    """
+    Test that completions of fast providers are sent right away and sent
+    again with the ones of slow providers when they arrive.
+    """
+    completion, send_request, responses = streaming_completion
+    req_id = send_request()
+
+    completion.receive_response('fast', req_id, completion_items('spam'))
+    assert responses == [(True, ['spam'])]
+
+    completion.receive_response(
+        'slow', req_id, completion_items('eggs', 'spam'))
+    assert responses == [(True, ['spam']), (False, ['eggs', 'spam'])]
+    assert req_id not in completion.requests
+
+
+def test_streamed_completions_budget(streaming_completion, qtbot):
+    """
+    Test that slow providers are not waited for beyond their latency
+    budget, and that superseded requests are discarded.
+    """
+    completion, send_request, responses = streaming_completion
+    completion.provider_latency_budget['slow'] = 100
+
+    old_req_id = send_request()
+    req_id = send_request()
+    assert old_req_id not in completion.requests
+
+    completion.receive_response('fast', req_id, completion_items())
+    assert responses == []
+
+    qtbot.waitUntil(lambda: len(responses) == 1)
+    assert responses == [(False, [])]
+    completion.receive_response('slow', req_id, completion_items('eggs'))
+    assert len(responses) == 1
+
+    # Check the statistics of the providers
+    stats = completion.stats.get_stats()[
+        CompletionRequestTypes.DOCUMENT_COMPLETION]
+    assert stats['slow']['timeouts'] >= 1
+    assert stats['slow']['dropped'] >= 1
+
+
+def test_streamed_completions_default_budget(streaming_completion, qtbot):
+    """
+    Test that slow providers without a latency budget are waited for the
+    time set in the preferences, after which a final reply is sent.
+    """
+    completion, send_request, responses = streaming_completion
+    completion.wait_for_ms = 100
+    req_id = send_request()
+
+    completion.receive_response('fast', req_id, completion_items('spam'))
+    assert responses == [(True, ['spam'])]
+
+    qtbot.waitUntil(lambda: len(responses) == 2)
+    assert responses == [(True, ['spam']), (False, ['spam'])]
+    assert req_id not in completion.requests
+    completion.receive_response('slow', req_id, completion_items('eggs'))
+    assert len(responses) == 2
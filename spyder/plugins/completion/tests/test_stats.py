@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Copyright © Spyder Project Contributors
+#
+# Licensed under the terms of the MIT License
+# ----------------------------------------------------------------------------
+
+"""Tests for the completion providers statistics."""
+
+# Standard library imports
+import json
+
+# Third party imports
+import pytest
+
+# Local imports
+from spyder.plugins.completion.stats import CompletionStats, percentile
+
+
+class FakeClock(object):
+    """Clock that only advances when told to, in milliseconds."""
+
+    def __init__(self):
+        self.now = 0
+
+    def advance(self, milliseconds):
+        self.now += milliseconds / 1000
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def stats():
+    clock = FakeClock()
+    return CompletionStats(clock=clock), clock
+
+
+def test_percentile():
+    samples = list(range(1, 101))
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 99) == 99
+    assert percentile([3], 90) == 3
+    assert percentile([], 50) is None
+
+
+def test_stats_replied(stats):
+    """Test latencies, queue times, payloads and timeouts."""
+    stats, clock = stats
+    stats.request_sent(0, 'completion', ['fast', 'slow', 'never'])
+
+    clock.advance(10)
+    stats.response_received(0, 'fast', {'params': [1, 2, 3]})
+    stats.request_replied(0, final=False)
+    clock.advance(90)
+    stats.response_received(0, 'slow', {'params': None})
+    clock.advance(5)
+    stats.request_replied(0)
+
+    # Responses after the final reply are dropped
+    stats.response_received(0, 'never', {'params': [1]})
+
+    result = stats.get_stats()['completion']
+    assert result['fast']['latency_ms']['p50'] == pytest.approx(10)
+    assert result['fast']['queue_ms']['p50'] == pytest.approx(0)
+    assert result['fast']['payload_size']['max'] == 3
+    assert result['slow']['latency_ms']['p50'] == pytest.approx(100)
+    assert result['slow']['queue_ms']['p50'] == pytest.approx(5)
+    assert result['slow']['payload_size']['max'] == 0
+    assert [result[provider]['timeouts']
+            for provider in ('fast', 'slow', 'never')] == [0, 0, 1]
+    assert [result[provider]['dropped']
+            for provider in ('fast', 'slow', 'never')] == [0, 0, 1]
+    assert result['never']['requests'] == 1
+
+
+def test_stats_discarded(stats):
+    """Test that responses of discarded requests are counted as dropped."""
+    stats, clock = stats
+    stats.request_sent(0, 'completion', ['fast', 'slow'])
+    stats.response_received(0, 'fast', {'params': []})
+    stats.response_received(0, 'slow', {'params': []}, dropped=True)
+    stats.request_discarded(0)
+
+    result = stats.get_stats()['completion']
+    assert result['fast']['dropped'] == 1
+    assert result['slow']['dropped'] == 1
+    assert result['fast']['timeouts'] == 0
+    assert result['fast']['queue_ms']['p50'] is None
+
+    assert json.loads(stats.to_json()) == stats.get_stats()
+    stats.reset()
+    assert stats.get_stats() == {}
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder/__init__.py for details)
+
+"""Completion providers statistics dialog."""
+
+# Standard imports
+import os.path as osp
+
+# Third party imports
+from qtpy.compat import getsavefilename
+from qtpy.QtWidgets import (QApplication, QDialog, QDialogButtonBox,
+                            QHBoxLayout, QLabel, QPushButton, QTreeWidget,
+                            QTreeWidgetItem, QVBoxLayout)
+
+# Local imports
+from spyder.api.translations import get_translation
+from spyder.config.base import get_home_dir
+from spyder.utils.icon_manager import ima
+
+
+# Localization
+_ = get_translation('spyder')
+
+
+class CompletionStatsDialog(QDialog):
+    """Dialog to show the latency and throughput of completion providers."""
+
+    def __init__(self, parent, stats):
+        QDialog.__init__(self, parent)
+        self.stats = stats
+
+        # Widgets
+        self.treewidget = QTreeWidget(self)
+        self.treewidget.setHeaderLabels([
+            _("Request / provider"), _("Requests"), _("Responses"),
+            _("Timeouts"), _("Dropped"), _("Latency p50 (ms)"),
+            _("Latency p90 (ms)"), _("Latency p99 (ms)"),
+            _("Queue p50 (ms)"), _("Queue p90 (ms)"),
+            _("Payload p50"), _("Payload max")])
+        label = QLabel(_("Latency is the time providers take to respond. "
+                         "Queue time is the time their responses wait for "
+                         "the ones of other providers."))
+        label.setWordWrap(True)
+        refresh_button = QPushButton(_("Refresh"))
+        reset_button = QPushButton(_("Reset"))
+        copy_button = QPushButton(_("Copy as JSON"))
+        save_button = QPushButton(_("Save as JSON..."))
+        bbox = QDialogButtonBox(QDialogButtonBox.Ok)
+
+        # Widget setup
+        self.setWindowTitle(_("Completion statistics"))
+        self.setWindowIcon(ima.icon('completions'))
+        self.setModal(False)
+
+        # Layout
+        hlayout = QHBoxLayout()
+        hlayout.addWidget(refresh_button)
+        hlayout.addWidget(reset_button)
+        hlayout.addWidget(copy_button)
+        hlayout.addWidget(save_button)
+        hlayout.addStretch()
+        hlayout.addWidget(bbox)
+
+        vlayout = QVBoxLayout()
+        vlayout.addWidget(self.treewidget)
+        vlayout.addWidget(label)
+        vlayout.addLayout(hlayout)
+
+        self.setLayout(vlayout)
+        self.resize(960, 480)
+
+        # Signals
+        refresh_button.clicked.connect(self.refresh)
+        reset_button.clicked.connect(self.reset)
+        copy_button.clicked.connect(self.copy_to_clipboard)
+        save_button.clicked.connect(self.save_json)
+        bbox.accepted.connect(self.accept)
+
+    @staticmethod
+    def _format(value):
+        if value is None:
+            return '-'
+        if isinstance(value, float):
+            return '{:.1f}'.format(value)
+        return str(value)
+
+    def refresh(self):
+        """Show the current statistics."""
+        self.treewidget.clear()
+        for req_type, provider_stats in self.stats.get_stats().items():
+            req_item = QTreeWidgetItem([req_type])
+            font = req_item.font(0)
+            font.setBold(True)
+            req_item.setFont(0, font)
+            self.treewidget.addTopLevelItem(req_item)
+
+            for provider, stats in provider_stats.items():
+                latency = stats['latency_ms']
+                queue = stats['queue_ms']
+                payload = stats['payload_size']
+                values = [
+                    stats['requests'], stats['responses'], stats['timeouts'],
+                    stats['dropped'], latency['p50'], latency['p90'],
+                    latency['p99'], queue['p50'], queue['p90'],
+                    payload['p50'], payload['max']]
+                req_item.addChild(QTreeWidgetItem(
+                    [provider] + [self._format(value) for value in values]))
+
+        self.treewidget.expandAll()
+        for column in range(self.treewidget.columnCount()):
+            self.treewidget.resizeColumnToContents(column)
+
+    def reset(self):
+        """Discard the statistics recorded so far."""
+        self.stats.reset()
+        self.refresh()
+
+    def copy_to_clipboard(self):
+        """Copy the statistics to the clipboard as JSON."""
+        QApplication.clipboard().setText(self.stats.to_json())
+
+    def save_json(self):
+        """Save the statistics to a JSON file."""
+        filename, _selfilter = getsavefilename(
+            self, _("Save completion statistics"),
+            osp.join(get_home_dir(), 'completion_stats.json'),
+            _("JSON files") + " (*.json)")
+        if filename:
+            with open(filename, 'w') as f:
+                f.write(self.stats.to_json())
@@ -33,6 +33,11 @@ class CompletionStatus(StatusBarWidget):
     Signal to open the main interpreter preferences.
     """
 
+    sig_show_stats_requested = Signal()
+    """
+    Signal to show the latency and throughput statistics of the providers.
+    """
+
     def __init__(self, parent, icon=None):
         """Status bar widget for displaying the current completions status."""
         self._tool_tip = ''
@@ -63,7 +68,12 @@ def show_menu(self):
             text=text,
             triggered=self.open_interpreter_preferences,
         )
-        add_actions(menu, [change_action])
+        stats_action = create_action(
+            self,
+            text=_("Show completion statistics..."),
+            triggered=self.show_stats,
+        )
+        add_actions(menu, [change_action, stats_action])
         rect = self.contentsRect()
         os_height = 7 if os.name == 'nt' else 12
         pos = self.mapToGlobal(
@@ -74,5 +84,9 @@ def open_interpreter_preferences(self):
         """Request to open the main interpreter preferences."""
         self.sig_open_preferences_requested.emit()
 
+    def show_stats(self):
+        """Request to show the statistics of the completion providers."""
+        self.sig_show_stats_requested.emit()
+
     def get_icon(self):
         return self.create_icon('completions')
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Copyright © Spyder Project Contributors
+#
+# Licensed under the terms of the MIT License
+# ----------------------------------------------------------------------------
+
+"""Tests for the completion statistics dialog."""
+
+# Standard library imports
+import json
+
+# Third party imports
+import pytest
+from qtpy.QtWidgets import QApplication
+
+# Local imports
+from spyder.plugins.completion.stats import CompletionStats
+from spyder.plugins.completion.widgets import stats as stats_module
+from spyder.plugins.completion.widgets.stats import CompletionStatsDialog
+
+
+def test_completion_stats_dialog(qtbot, tmpdir, mocker):
+    """Test that the dialog shows, copies, saves and resets statistics."""
+    stats = CompletionStats()
+    stats.request_sent(0, 'textDocument/completion', ['fallback', 'lsp'])
+    stats.response_received(0, 'fallback', {'params': ['spam']})
+    stats.request_replied(0)
+
+    dialog = CompletionStatsDialog(None, stats)
+    qtbot.addWidget(dialog)
+    dialog.refresh()
+
+    tree = dialog.treewidget
+    assert tree.topLevelItemCount() == 1
+    request_item = tree.topLevelItem(0)
+    assert request_item.text(0) == 'textDocument/completion'
+    assert [request_item.child(i).text(0)
+            for i in range(request_item.childCount())] == ['fallback', 'lsp']
+    assert request_item.child(1).text(3) == '1'
+    assert request_item.child(1).text(5) == '-'
+
+    dialog.copy_to_clipboard()
+    assert json.loads(QApplication.clipboard().text()) == stats.get_stats()
+
+    filename = str(tmpdir.join('stats.json'))
+    mocker.patch.object(stats_module, 'getsavefilename',
+                        return_value=(filename, ''))
+    dialog.save_json()
+    with open(filename) as f:
+        assert json.load(f) == stats.get_stats()
+
+    dialog.reset()
+    assert tree.topLevelItemCount() == 0
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -167,6 +167,7 @@ def toogle_breakpoint(
             else:
                 self._breakpoint_blocks[id(block)] = block
         block.setUserData(data)
+        self.editor.sig_block_flags_changed.emit([block])
         self.editor.sig_flags_changed.emit()
         self.breakpoints_changed()
 
@@ -197,6 +198,7 @@ def clear_breakpoints(self):
         # Inform the editor that the breakpoints are changed
         self.breakpoints_changed()
         # Inform the editor that the flags must be updated
+        self.editor.sig_block_flags_changed.emit(None)
         self.editor.sig_flags_changed.emit()
 
     def set_breakpoints(self, breakpoints):
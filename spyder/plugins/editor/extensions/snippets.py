@@ -134,18 +134,27 @@ def update_undo_stack(self):
         info = (ast_copy, self.starting_position, self.active_snippet)
         self.undo_stack.insert(0, info)
 
+    def _get_num_changed_chars(self):
+        """Get the number of characters changed in the last text update."""
+        num_chars = 0
+        for diffs in self.editor.patch:
+            for (op, data) in diffs.diffs:
+                if op in VALID_UPDATES:
+                    num_chars += len(data)
+
+        # Incremental changes sent instead of a patch
+        for change in self.editor.text_changes:
+            num_chars += change['rangeLength'] + len(change['text'])
+
+        return num_chars
+
     @lock
     @no_undo
     def _undo(self):
         if len(self.undo_stack) == 0:
             self.reset()
         if self.is_snippet_active:
-            num_pops = 0
-            patch = self.editor.patch
-            for diffs in patch:
-                for (op, data) in diffs.diffs:
-                    if op in VALID_UPDATES:
-                        num_pops += len(data)
+            num_pops = self._get_num_changed_chars()
             if len(self.undo_stack) > 0:
                 for _ in range(num_pops):
                     if len(self.undo_stack) == 0:
@@ -165,12 +174,7 @@ def _undo(self):
     @no_undo
     def _redo(self):
         if self.is_snippet_active:
-            num_pops = 0
-            patch = self.editor.patch
-            for diffs in patch:
-                for (op, data) in diffs.diffs:
-                    if op in VALID_UPDATES:
-                        num_pops += len(data)
+            num_pops = self._get_num_changed_chars()
             if len(self.redo_stack) > 0:
                 for _ in range(num_pops):
                     if len(self.redo_stack) == 0:
@@ -58,6 +58,12 @@ def __init__(self):
         # Dictionary with flag lists
         self._dict_flag_list = {}
 
+        # Flagged blocks, by block data. Used to check only the blocks that
+        # changed when updating flags.
+        self._flagged_blocks = {}
+        self._changed_blocks = []
+        self._update_all_blocks = True
+
     def on_install(self, editor):
         """Manages install setup of the pane."""
         super().on_install(editor)
@@ -82,6 +88,7 @@ def on_install(self, editor):
         editor.sig_alt_mouse_moved.connect(self.mouseMoveEvent)
         editor.sig_leave_out.connect(self.update)
         editor.sig_flags_changed.connect(self.delayed_update_flags)
+        editor.sig_block_flags_changed.connect(self.set_changed_blocks)
         editor.sig_theme_colors_changed.connect(self.update_flag_colors)
 
     @property
@@ -117,14 +124,63 @@ def delayed_update_flags(self):
 
         self._update_list_timer.start(REFRESH_RATE)
 
+    def set_changed_blocks(self, blocks):
+        """
+        Set blocks whose flags changed.
+
+        Parameters
+        ----------
+        blocks: list or None
+            List of blocks. If None, the flags of all blocks are updated.
+        """
+        if blocks is None:
+            self._update_all_blocks = True
+            self._changed_blocks = []
+        elif not self._update_all_blocks:
+            self._changed_blocks.extend(blocks)
+        self.delayed_update_flags()
+
+    def get_flag_type(self, data):
+        """Get the type of flag to show for a block with `data`."""
+        if data.code_analysis:
+            # Paint the errors and warnings
+            for _, _, severity, _ in data.code_analysis:
+                if severity == DiagnosticSeverity.ERROR:
+                    return 'error'
+            return 'warning'
+        elif data.todo:
+            return 'todo'
+        elif data.breakpoint:
+            return 'breakpoint'
+        return None
+
     def update_flags(self):
         """
         Update flags list.
 
-        This parses the entire file, which can take a lot of time for
-        large files. Save all the flags in lists for painting during
-        paint events.
+        Only the blocks that were already flagged or were set with
+        `set_changed_blocks` are checked, unless all of them need to be,
+        which can take a lot of time for large files. Save all the flags in
+        lists for painting during paint events.
         """
+        flagged_blocks = self._flagged_blocks
+        if self._update_all_blocks:
+            flagged_blocks.clear()
+            blocks = []
+            block = self.editor.document().firstBlock()
+            while block.isValid():
+                if block.userData():
+                    blocks.append(block)
+                block = block.next()
+        else:
+            blocks = self._changed_blocks
+        self._update_all_blocks = False
+        self._changed_blocks = []
+
+        for block in blocks:
+            if is_block_safe(block):
+                flagged_blocks[block.userData()] = block
+
         self._dict_flag_list = {
             'error': [],
             'warning': [],
@@ -132,31 +188,17 @@ def update_flags(self):
             'breakpoint': [],
         }
 
-        editor = self.editor
-        block = editor.document().firstBlock()
-        while block.isValid():
-            # Parse all lines in the file looking for something to flag.
-            data = block.userData()
-            if data:
-                if data.code_analysis:
-                    # Paint the errors and warnings
-                    for _, _, severity, _ in data.code_analysis:
-                        if severity == DiagnosticSeverity.ERROR:
-                            flag_type = 'error'
-                            break
-                    else:
-                        flag_type = 'warning'
-                elif data.todo:
-                    flag_type = 'todo'
-                elif data.breakpoint:
-                    flag_type = 'breakpoint'
-                else:
-                    flag_type = None
-
-                if flag_type is not None:
-                    self._dict_flag_list[flag_type].append(block)
-
-            block = block.next()
+        # Remove blocks that were deleted, whose data was replaced or that
+        # don't have flags anymore, and sort the rest by their position.
+        for data, block in list(flagged_blocks.items()):
+            flag_type = self.get_flag_type(data)
+            if (flag_type is not None and is_block_safe(block) and
+                    block.userData() is data):
+                self._dict_flag_list[flag_type].append(block)
+            else:
+                del flagged_blocks[data]
+        for flag_list in self._dict_flag_list.values():
+            flag_list.sort(key=lambda block: block.blockNumber())
 
         self.update()
 
@@ -149,6 +149,48 @@ def test_flag_painting(editor_bot, qtbot):
         editor.setTextCursor(cursor)
 
 
+def test_update_flags_incrementally(editor_bot):
+    """
+    Test that flags are updated by only checking the blocks that changed
+    after the first update.
+    """
+    editor = editor_bot
+    editor.filename = "file.py"
+    editor.breakpoints_manager = BreakpointsManager(editor)
+    sfa = editor.scrollflagarea
+    editor.set_text(long_code)
+    sfa.update_flags()
+
+    def flagged_lines():
+        # Check that we don't go through all blocks
+        assert not sfa._update_all_blocks
+        sfa.update_flags()
+        return {flag_type: [block.blockNumber() + 1 for block in blocks]
+                for flag_type, blocks in sfa._dict_flag_list.items()}
+
+    editor.process_todo([['TODO', 3], ['TODO', 8]])
+    editor.breakpoints_manager.toogle_breakpoint(line_number=2)
+    editor.breakpoints_manager.toogle_breakpoint(line_number=8)
+    assert flagged_lines() == {
+        'error': [], 'warning': [], 'todo': [3, 8], 'breakpoint': [2]}
+
+    editor.process_todo([['TODO', 5]])
+    editor.breakpoints_manager.toogle_breakpoint(line_number=2)
+    assert flagged_lines() == {
+        'error': [], 'warning': [], 'todo': [5], 'breakpoint': [8]}
+
+    editor._diagnostics = [
+        {'source': 'pyflakes',
+         'range': {'start': {'line': line, 'character': 0},
+                   'end': {'line': line, 'character': 1}},
+         'message': 'syntax error', 'severity': severity}
+        for line, severity in [(4, 1), (9, 2), (10, 1)]]
+    editor.set_errors()
+    editor.finish_code_analysis()
+    assert flagged_lines() == {
+        'error': [5, 11], 'warning': [10], 'todo': [], 'breakpoint': [8]}
+
+
 def test_range_indicator_visible_on_hover_only(editor_bot, qtbot):
     """Test that the slider range indicator is visible only when hovering
     over the scrollflag area when the editor vertical scrollbar is visible.
@@ -12,6 +12,7 @@
 # pylint: disable=R0201
 
 # Standard library imports
+import functools
 import logging
 import os
 import os.path as osp
@@ -45,17 +46,20 @@
 from spyder.widgets.findreplace import FindReplace
 from spyder.plugins.editor.confpage import EditorConfigPage
 from spyder.plugins.editor.utils.autosave import AutosaveForPlugin
+from spyder.plugins.editor.utils.findtasks import TaskIndex
 from spyder.plugins.editor.utils.switcher import EditorSwitcherManager
 from spyder.plugins.editor.widgets.codeeditor import CodeEditor
 from spyder.plugins.editor.widgets.editor import (EditorMainWindow,
                                                   EditorSplitter,
                                                   EditorStack,)
+from spyder.plugins.editor.widgets.editorstack_helpers import ThreadManager
 from spyder.plugins.editor.widgets.printer import (
     SpyderPrinter, SpyderPrintPreviewDialog)
 from spyder.plugins.editor.utils.bookmarks import (load_bookmarks,
                                                    save_bookmarks)
 from spyder.plugins.editor.widgets.status import (CursorPositionStatus,
                                                   EncodingStatus, EOLStatus,
+                                                  LargeFileStatus,
                                                   ReadWriteStatus, VCSStatus)
 from spyder.plugins.run.widgets import (ALWAYS_OPEN_FIRST_RUN_OPTION,
                                         get_run_configuration, RunConfigDialog,
@@ -183,6 +187,18 @@ class Editor(SpyderPluginWidget, SpyderConfigurationObserver):
         The codeeditor.
     """
 
+    sig_todo_results_in_files_ready = Signal(dict)
+    """
+    This signal is emitted when the tasks (TODO, FIXME, ...) requested with
+    request_todo_results_in_files are available.
+
+    Parameters
+    ----------
+    results: dict
+        Map between the names of the files that could be read and the list
+        of (task text, line number) tuples found in them.
+    """
+
     def __init__(self, parent, ignore_last_opened_files=False):
         SpyderPluginWidget.__init__(self, parent)
 
@@ -235,10 +251,12 @@ def __init__(self, parent, ignore_last_opened_files=False):
         self.encoding_status = EncodingStatus(self)
         self.eol_status = EOLStatus(self)
         self.readwrite_status = ReadWriteStatus(self)
+        self.large_file_status = LargeFileStatus(self)
 
         # TODO: temporal fix while editor uses new API
         statusbar = self.main.get_plugin(Plugins.StatusBar, error=False)
         if statusbar:
+            statusbar.add_status_widget(self.large_file_status)
             statusbar.add_status_widget(self.readwrite_status)
             statusbar.add_status_widget(self.eol_status)
             statusbar.add_status_widget(self.encoding_status)
@@ -278,6 +296,11 @@ def __init__(self, parent, ignore_last_opened_files=False):
         self.autosave.interval = self.get_option('autosave_interval') * 1000
         self.autosave.enabled = self.get_option('autosave_enabled')
 
+        # Tasks (TODO, FIXME, ...) of files that are not open, which are
+        # read in a thread pool
+        self.task_index = TaskIndex()
+        self.task_threadmanager = ThreadManager(self)
+
         # SimpleCodeEditor instance used to print file contents
         self._print_editor = self._create_print_editor()
         self._print_editor.hide()
@@ -520,6 +543,8 @@ def closing_plugin(self, cancelable=False):
             if not editorstack.save_if_changed(cancelable) and cancelable:
                 return False
             else:
+                self.autosave.writer.close()
+                self.task_threadmanager.close_all_threads()
                 for win in self.editorwindows[:]:
                     win.close()
                 return True
@@ -1359,6 +1384,7 @@ def register_editorstack(self, editorstack):
             editorstack.reset_statusbar.connect(self.readwrite_status.hide)
             editorstack.reset_statusbar.connect(self.encoding_status.hide)
             editorstack.reset_statusbar.connect(self.cursorpos_status.hide)
+            editorstack.reset_statusbar.connect(self.large_file_status.hide)
             editorstack.readonly_changed.connect(
                                         self.readwrite_status.update_readonly)
             editorstack.encoding_changed.connect(
@@ -1369,6 +1395,8 @@ def register_editorstack(self, editorstack):
                 self.current_editor_cursor_changed)
             editorstack.sig_refresh_eol_chars.connect(
                 self.eol_status.update_eol)
+            editorstack.sig_refresh_large_file.connect(
+                self.large_file_status.update_large_file)
             editorstack.current_file_changed.connect(
                 self.vcs_status.update_vcs)
             editorstack.file_saved.connect(
@@ -1386,6 +1414,7 @@ def register_editorstack(self, editorstack):
             ('set_linenumbers_enabled',             'line_numbers'),
             ('set_edgeline_enabled',                'edge_line'),
             ('set_indent_guides',                   'indent_guides'),
+            ('set_large_file_mode_enabled',         'large_file_mode'),
             ('set_code_folding_enabled',            'code_folding'),
             ('set_focus_to_editor',                 'focus_to_editor'),
             ('set_run_cell_copy',                   'run_cell_copy'),
@@ -1807,6 +1836,49 @@ def update_todo_actions(self):
         if state is not None:
             self.todo_list_action.setEnabled(state)
 
+    def request_todo_results_in_files(self, filenames):
+        """
+        Request the tasks (TODO, FIXME, ...) in a list of files.
+
+        The tasks of the files open in the editor are the ones found in
+        their current text, which can have unsaved changes. The rest are
+        taken from the task index in a thread pool, so that files are read
+        without blocking the interface and only if they changed on disk.
+
+        The results are emitted with sig_todo_results_in_files_ready. A
+        new request supersedes the previous one if it didn't finish yet.
+        """
+        open_results = self._get_open_todo_results()
+        self.task_threadmanager.add_thread(
+            self.task_index.get_tasks,
+            functools.partial(self._todo_results_in_files_ready, filenames),
+            [filename for filename in filenames
+             if filename not in open_results],
+            self)
+
+    def _get_open_todo_results(self):
+        """Get the tasks of the files open in the editor."""
+        open_results = {}
+        if self.get_option('todo_list'):
+            for finfo in self.editorstacks[0].data:
+                editor = finfo.editor
+                if (finfo.pending_load is None and
+                        editor.is_python_or_ipython() and
+                        'todo_finder' not in editor.large_file_features):
+                    open_results[finfo.filename] = finfo.todo_results
+        return open_results
+
+    def _todo_results_in_files_ready(self, filenames, index_results):
+        """Add the tasks of open files to the ones read from disk."""
+        open_results = self._get_open_todo_results()
+        results = {}
+        for filename in filenames:
+            if filename in open_results:
+                results[filename] = open_results[filename]
+            elif filename in index_results:
+                results[filename] = index_results[filename]
+        self.sig_todo_results_in_files_ready.emit(results)
+
     @Slot(set)
     def update_active_languages(self, languages):
         if self.main.get_plugin(Plugins.Completions, error=False):
@@ -2018,7 +2090,8 @@ def change_max_recent_files(self):
     @Slot(str, int, str, object)
     def load(self, filenames=None, goto=None, word='',
              editorwindow=None, processevents=True, start_column=None,
-             end_column=None, set_focus=True, add_where='end'):
+             end_column=None, set_focus=True, add_where='end',
+             lazy=False):
         """
         Load a text file
         editorwindow: load in this editorwindow (useful when clicking on
@@ -2030,6 +2103,8 @@ def load(self, filenames=None, goto=None, word='',
         the start position in this line and end_column the length
         (So that the end position is start_column + end_column)
         Alternatively, the first match of word is used as a position.
+        lazy: if True, files that don't get the focus are read when their
+        tab is activated for the first time.
         """
         cursor_history_state = self.__ignore_cursor_history
         self.__ignore_cursor_history = True
@@ -2157,13 +2232,19 @@ def _convert(fname):
                 # editor widget in all other editorstacks:
                 finfo = self.editorstacks[0].load(
                     filename, set_current=False, add_where=add_where,
-                    processevents=processevents)
+                    processevents=processevents, lazy=lazy and not focus)
                 finfo.path = self.main.get_spyder_pythonpath()
                 self._clone_file_everywhere(finfo)
                 current_editor = current_es.set_current_filename(filename,
                                                                  focus=focus)
-                current_editor.set_bookmarks(load_bookmarks(filename))
                 self.register_widget_shortcuts(current_editor)
+                if finfo.pending_load is not None:
+                    # The rest is done when the file's tab is activated
+                    if goto is not None:
+                        finfo.pending_load.line = goto[index]
+                    self.__add_recent_file(filename)
+                    continue
+                current_editor.set_bookmarks(load_bookmarks(filename))
                 current_es.analyze_script()
                 self.__add_recent_file(filename)
             if goto is not None:  # 'word' is assumed to be None as well
@@ -3283,13 +3364,15 @@ def setup_open_files(self, close_previous_files=True):
                     # the last focused file.
                     if index > 0:
                         self.load(filenames[index::-1], goto=clines[index::-1],
-                                  set_focus=False, add_where='start')
+                                  set_focus=False, add_where='start',
+                                  lazy=True)
                     # Then we load the files located to the right of the last
                     # focused file in the tabbar, while keeping the focus on
                     # the last focused file.
                     if index < (len(filenames) - 1):
                         self.load(filenames[index+1:], goto=clines[index:],
-                                  set_focus=False, add_where='end')
+                                  set_focus=False, add_where='end',
+                                  lazy=True)
                     # Finally we load any recovered files at the end of the tabbar,
                     # while keeping focus on the last focused file.
                     if self.autosave.recover_files_to_open:
@@ -3297,12 +3380,12 @@ def setup_open_files(self, close_previous_files=True):
                                   set_focus=False, add_where='end')
                 else:
                     if filenames:
-                        self.load(filenames, goto=clines)
+                        self.load(filenames, goto=clines, lazy=True)
                     if self.autosave.recover_files_to_open:
                         self.load(self.autosave.recover_files_to_open)
             else:
                 if filenames:
-                    self.load(filenames)
+                    self.load(filenames, lazy=True)
                 if self.autosave.recover_files_to_open:
                     self.load(self.autosave.recover_files_to_open)
 
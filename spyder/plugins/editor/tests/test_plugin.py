@@ -311,11 +311,15 @@ def test_open_and_close_lsp_requests(editor_plugin_open_files, mocker):
     editor, expected_filenames, expected_current_filename = (
         editor_factory(None, None))
 
-    # Assert that we called document_did_open once per file
+    # Assert that we only called document_did_open for the file in focus
+    # because the other ones are loaded when their tabs are activated
+    assert CodeEditor.document_did_open.call_count == 1
+    editorstack = editor.get_current_editorstack()
+    for index in range(editorstack.get_stack_count()):
+        editorstack.set_stack_index(index)
     assert CodeEditor.document_did_open.call_count == 5
 
     # Generate a vertical split
-    editorstack = editor.get_current_editorstack()
     editorstack.sig_split_vertically.emit()
 
     # Assert the current codeeditor has is_cloned as True
@@ -419,5 +423,32 @@ def test_save_with_os_eol_chars(editor_plugin, mocker, qtbot, tmpdir):
     assert get_eol_chars(text) == os.linesep
 
 
+def test_request_todo_results_in_files(editor_plugin, qtbot, tmpdir):
+    """
+    Check that the tasks of open files are taken from their editors and
+    the ones of other files are read in a thread.
+    """
+    closed_file = tmpdir.join('closed.py')
+    closed_file.write('# TODO: closed\n')
+    open_file = tmpdir.join('open.py')
+    open_file.write('x = 1\n')
+    missing_file = str(tmpdir.join('missing.py'))
+    editor_plugin.load(str(open_file))
+    editorstack = editor_plugin.get_current_editorstack()
+
+    # Add a task without saving the file
+    editor_plugin.get_current_editor().set_text('# FIXME: unsaved\n')
+    editorstack.is_analysis_done = False
+    with qtbot.waitSignal(editorstack.todo_results_changed):
+        editorstack.analyze_script()
+
+    with qtbot.waitSignal(
+            editor_plugin.sig_todo_results_in_files_ready) as blocker:
+        editor_plugin.request_todo_results_in_files(
+            [str(closed_file), str(open_file), missing_file])
+    assert blocker.args[0] == {str(closed_file): [('Closed', 1)],
+                               str(open_file): [('Unsaved', 1)]}
+
+
 if __name__ == "__main__":
     pytest.main(['-x', osp.basename(__file__), '-vv', '-rw'])
@@ -18,7 +18,12 @@
 
 File contents are compared using their hash. The variable `file_hashes`
 contains the hash of all files currently open in the editor and all autosave
-files.
+files. To avoid getting and hashing the text of files that did not change
+since the last autosave, the revision of their documents at that time is
+stored in `file_revisions`.
+
+Autosave files are written in a thread by `AutosaveWriter`, so that the
+editor is not blocked while writing large files.
 
 On startup, the contents of the autosave directory is checked and if autosave
 files are found, the user is asked whether to recover them;
@@ -27,20 +32,24 @@
 
 # Standard library imports
 import ast
+import functools
 import logging
 import os
 import os.path as osp
 import re
+import threading
 
 # Third party imports
-from qtpy.QtCore import QTimer
+from qtpy.QtCore import QObject, QTimer
 
 # Local imports
 from spyder.config.base import _, get_conf_path, running_under_pytest
 from spyder.plugins.editor.widgets.autosaveerror import AutosaveErrorDialog
 from spyder.plugins.editor.widgets.recover import RecoveryDialog
-from spyder.py3compat import PY2
+from spyder.py3compat import PY2, to_text_string
+from spyder.utils import encoding
 from spyder.utils.programs import is_spyder_process
+from spyder.utils.workers import WorkerManager
 
 
 logger = logging.getLogger(__name__)
@@ -55,6 +64,9 @@ class AutosaveForPlugin(object):
         file_hashes (dict): map between file names and hash of their contents.
             This is used for both files opened in the editor and their
             corresponding autosave files.
+        file_revisions (dict): map between names of opened files and the
+            revision of their document when they were last checked.
+        writer (AutosaveWriter): object writing the autosave files.
     """
 
     # Interval (in ms) between two autosaves
@@ -73,6 +85,8 @@ def __init__(self, editor):
         self.editor = editor
         self.name_mapping = {}
         self.file_hashes = {}
+        self.file_revisions = {}
+        self.writer = AutosaveWriter()
         self.timer = QTimer(self.editor)
         self.timer.setSingleShot(True)
         self.timer.timeout.connect(self.do_autosave)
@@ -214,13 +228,83 @@ def register_autosave_for_stack(self, autosave_for_stack):
         """
         Register an AutosaveForStack object.
 
-        This replaces the `name_mapping` and `file_hashes` attributes
-        in `autosave_for_stack` with references to the corresponding
-        attributes of `self`, so that all AutosaveForStack objects
-        share the same data.
+        This replaces the `name_mapping`, `file_hashes`, `file_revisions`
+        and `writer` attributes in `autosave_for_stack` with references to
+        the corresponding attributes of `self`, so that all AutosaveForStack
+        objects share the same data.
         """
         autosave_for_stack.name_mapping = self.name_mapping
         autosave_for_stack.file_hashes = self.file_hashes
+        autosave_for_stack.file_revisions = self.file_revisions
+        autosave_for_stack.writer = self.writer
+
+
+class AutosaveWriter(QObject):
+    """
+    Write autosave files in a thread.
+
+    Writes are done one at a time, in the order they are requested. If a
+    file is written again before a previous write is done, or the write is
+    cancelled, the previous write is skipped, so autosave files are never
+    overwritten with older contents.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._worker_manager = WorkerManager(max_threads=1)
+        self._lock = threading.RLock()
+        self._pending = {}
+        self._error_callbacks = {}
+
+    def write(self, text, filename, file_encoding, error_callback=None):
+        """
+        Write `text` to `filename` in a thread.
+
+        Args:
+            text (str): contents of the file.
+            filename (str): name of the autosave file.
+            file_encoding (str): encoding of the file.
+            error_callback (callable): function called with the exception
+                if writing the file raises an error.
+        """
+        token = object()
+        with self._lock:
+            self._pending[filename] = token
+        worker = self._worker_manager.create_python_worker(
+            self._write, text, filename, file_encoding, token)
+        self._error_callbacks[worker] = error_callback
+        worker.sig_finished.connect(self._write_finished)
+        worker.start()
+
+    def cancel(self, filename):
+        """
+        Cancel any pending write to `filename`.
+
+        When this returns, `filename` is not going to be written until it's
+        requested again, so it can be safely removed.
+        """
+        with self._lock:
+            self._pending.pop(filename, None)
+
+    def close(self):
+        """Wait for the write in progress, if any, and stop writing."""
+        with self._lock:
+            self._pending.clear()
+        self._worker_manager.terminate_all()
+
+    def _write(self, text, filename, file_encoding, token):
+        """Write a file, unless the write was cancelled or superseded."""
+        with self._lock:
+            if self._pending.get(filename) is not token:
+                return
+            del self._pending[filename]
+            encoding.write(text, filename, file_encoding)
+
+    def _write_finished(self, worker, output, error):
+        """Call the error callback of a write if it failed."""
+        error_callback = self._error_callbacks.pop(worker, None)
+        if error is not None and error_callback is not None:
+            error_callback(error)
 
 
 class AutosaveForStack(object):
@@ -236,6 +320,9 @@ class AutosaveForStack(object):
         file_hashes (dict): map between file names and hash of their contents.
             This is used for both files opened in the editor and their
             corresponding autosave files.
+        file_revisions (dict): map between names of opened files and the
+            revision of their document when they were last checked.
+        writer (AutosaveWriter): object writing the autosave files.
     """
 
     def __init__(self, editorstack):
@@ -248,6 +335,8 @@ def __init__(self, editorstack):
         self.stack = editorstack
         self.name_mapping = {}
         self.file_hashes = {}
+        self.file_revisions = {}
+        self.writer = AutosaveWriter()
 
     def create_unique_autosave_filename(self, filename, autosave_dir):
         """
@@ -307,6 +396,7 @@ def remove_autosave_file(self, filename):
         if filename not in self.name_mapping:
             return
         autosave_filename = self.name_mapping[filename]
+        self.writer.cancel(autosave_filename)
         try:
             os.remove(autosave_filename)
         except EnvironmentError as error:
@@ -360,20 +450,26 @@ def maybe_autosave(self, index):
         """
         Autosave a file if necessary.
 
-        If the file is newly created (and thus not named by the user), do
-        nothing.  If the current contents are the same as the autosave file
-        (if it exists) or the original file (if no autosave filee exists),
-        then do nothing. If the current contents are the same as the file on
-        disc, but the autosave file is different, then remove the autosave
-        file. In all other cases, autosave the file.
+        If the file is newly created (and thus not named by the user), it
+        was not read yet because it's loaded lazily, or its document did not
+        change since the last time it was checked, do nothing.  If the
+        current contents are the same as the autosave file (if it exists) or
+        the original file (if no autosave filee exists), then do nothing. If
+        the current contents are the same as the file on disc, but the
+        autosave file is different, then remove the autosave file. In all
+        other cases, autosave the file.
 
         Args:
             index (int): index into self.stack.data
         """
         finfo = self.stack.data[index]
-        if finfo.newly_created:
+        if finfo.newly_created or finfo.pending_load is not None:
             return
         orig_filename = finfo.filename
+        revision = finfo.editor.document().revision()
+        if self.file_revisions.get(orig_filename) == revision:
+            return
+        self.file_revisions[orig_filename] = revision
         try:
             orig_hash = self.file_hashes[orig_filename]
         except KeyError:
@@ -383,41 +479,70 @@ def maybe_autosave(self, index):
             # original file.
             logger.error('KeyError when retrieving hash of %s', orig_filename)
             orig_hash = None
-        new_hash = self.stack.compute_hash(finfo)
+        text = to_text_string(finfo.editor.get_text_with_eol())
+        new_hash = encoding.get_text_hash(text)
         if orig_filename in self.name_mapping:
             autosave_filename = self.name_mapping[orig_filename]
-            autosave_hash = self.file_hashes[autosave_filename]
+            autosave_hash = self.file_hashes.get(autosave_filename)
             if new_hash != autosave_hash:
                 if new_hash == orig_hash:
                     self.remove_autosave_file(orig_filename)
                 else:
-                    self.autosave(finfo)
+                    self.autosave(finfo, text)
         else:
             if new_hash != orig_hash:
-                self.autosave(finfo)
+                self.autosave(finfo, text)
 
-    def autosave(self, finfo):
+    def autosave(self, finfo, text=None):
         """
         Autosave a file.
 
         Save a copy in a file with name `self.get_autosave_filename()` and
-        update the cached hash of the autosave file. An error dialog notifies
-        the user of any errors raised when saving.
+        update the cached hash of the autosave file. The copy is written in
+        a thread; an error dialog notifies the user of any errors raised
+        when writing it.
 
         Args:
             fileinfo (FileInfo): file that is to be autosaved.
+            text (str): text of the file, if it was already retrieved from
+                its editor.
         """
-        autosave_filename = self.get_autosave_filename(finfo.filename)
-        logger.debug('Autosaving %s to %s', finfo.filename, autosave_filename)
-        try:
-            self.stack._write_to_file(finfo, autosave_filename)
-            autosave_hash = self.stack.compute_hash(finfo)
-            self.file_hashes[autosave_filename] = autosave_hash
-        except EnvironmentError as error:
-            action = (_('Error while autosaving {} to {}')
-                      .format(finfo.filename, autosave_filename))
-            msgbox = AutosaveErrorDialog(action, error)
-            msgbox.exec_if_enabled()
+        if finfo.pending_load is not None:
+            # The editor of a file loaded lazily is empty until it's read
+            return
+        if text is None:
+            text = to_text_string(finfo.editor.get_text_with_eol())
+        orig_filename = finfo.filename
+        autosave_filename = self.get_autosave_filename(orig_filename)
+        logger.debug('Autosaving %s to %s', orig_filename, autosave_filename)
+        self.file_hashes[autosave_filename] = encoding.get_text_hash(text)
+        self.writer.write(
+            text, autosave_filename, finfo.encoding,
+            functools.partial(self.handle_autosave_error, orig_filename,
+                              autosave_filename))
+
+    def handle_autosave_error(self, orig_filename, autosave_filename, error):
+        """
+        Handle an error raised when writing an autosave file.
+
+        The file is checked again in the next autosave, and an error dialog
+        notifies the user of the error.
+
+        Args:
+            orig_filename (str): name of the file that was autosaved.
+            autosave_filename (str): name of the autosave file.
+            error (Exception): error raised when writing the autosave file.
+        """
+        self.file_hashes.pop(autosave_filename, None)
+        self.file_revisions.pop(orig_filename, None)
+        if not isinstance(error, EnvironmentError):
+            logger.error('Error while autosaving %s to %s: %r',
+                         orig_filename, autosave_filename, error)
+            return
+        action = (_('Error while autosaving {} to {}')
+                  .format(orig_filename, autosave_filename))
+        msgbox = AutosaveErrorDialog(action, error)
+        msgbox.exec_if_enabled()
 
     def autosave_all(self):
         """Autosave all opened files where necessary."""
@@ -439,6 +564,7 @@ def file_renamed(self, old_name, new_name):
             logger.error('KeyError when handling rename %s -> %s',
                          old_name, new_name)
             old_hash = None
+        self.file_revisions.pop(old_name, None)
         self.remove_autosave_file(old_name)
         if old_hash is not None:
             del self.file_hashes[old_name]
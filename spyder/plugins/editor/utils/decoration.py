@@ -17,6 +17,7 @@
 """
 
 # Third party imports
+from intervaltree import IntervalTree
 from qtpy.QtCore import QObject, QTimer, Slot
 from qtpy.QtGui import QTextCharFormat
 
@@ -28,6 +29,14 @@
 # introduces a lot of sluggishness in the editor.
 UPDATE_TIMEOUT = 15  # milliseconds
 
+# Groups with less decorations than this are not indexed, because checking
+# all of them is faster than using an index.
+MIN_INDEXED_DECORATIONS = 50
+
+# Maximum number of document changes that are mapped back to the positions
+# an index was built with. After that the index is built again.
+MAX_MAPPED_CHANGES = 200
+
 
 def order_function(sel):
     end = sel.cursor.selectionEnd()
@@ -35,6 +44,42 @@ def order_function(sel):
     return sel.draw_order, -(end - start)
 
 
+def map_range_to_previous(start, end, changes):
+    """
+    Map the range of positions [start, end] in a document to the range that
+    could contain the same text before `changes` were made.
+
+    Parameters
+    ----------
+    start, end: int
+        Range of positions in the document.
+    changes: list
+        List of (position, chars_removed, chars_added) tuples, as reported by
+        the contentsChange signal of QTextDocument, in the order in which
+        they were made.
+
+    Returns
+    -------
+    tuple
+        Start and end of the range before the changes. The range can be
+        bigger than the exact one for text that was added or removed.
+    """
+    for position, removed, added in reversed(changes):
+        if start > position:
+            if start <= position + added:
+                start = position
+            else:
+                start = start - added + removed
+
+        if end >= position:
+            if end < position + added:
+                end = position + removed
+            else:
+                end = end - added + removed
+
+    return start, end
+
+
 class TextDecorationsManager(Manager, QObject):
     """
     Manages the collection of TextDecoration that have been set on the editor
@@ -43,7 +88,21 @@ class TextDecorationsManager(Manager, QObject):
     def __init__(self, editor):
         super(TextDecorationsManager, self).__init__(editor)
         QObject.__init__(self, None)
-        self._decorations = {"misc": []}
+
+        # Decorations in the misc group are kept in a dict to look them up
+        # fast. Its values are not used.
+        self._decorations = {"misc": {}}
+
+        # Interval tree of each group of decorations, by key, and the number
+        # of document changes made when it was built. Trees are built
+        # lazily, only for groups with many decorations.
+        self._index = {}
+
+        # Changes made to the document since the oldest tree was built, to
+        # map positions in the document to those of the trees.
+        self._document = None
+        self._changes = []
+        self._changes_offset = 0
 
         # Timer to not constantly update decorations.
         self.update_timer = QTimer(self)
@@ -65,23 +124,24 @@ def add(self, decorations):
             int: Amount of decorations added.
         """
         current_decorations = self._decorations["misc"]
+        if not isinstance(decorations, list):
+            decorations = [decorations]
+
         added = 0
-        if isinstance(decorations, list):
-            not_repeated = set(decorations) - set(current_decorations)
-            current_decorations.extend(list(not_repeated))
-            self._decorations["misc"] = current_decorations
-            added = len(not_repeated)
-        elif decorations not in current_decorations:
-            self._decorations["misc"].append(decorations)
-            added = 1
+        for decoration in decorations:
+            if decoration not in current_decorations:
+                current_decorations[decoration] = None
+                added += 1
 
         if added > 0:
+            self._index.pop("misc", None)
             self.update()
         return added
 
     def add_key(self, key, decorations):
         """Add decorations to key."""
         self._decorations[key] = decorations
+        self._index.pop(key, None)
         self.update()
 
     def remove(self, decoration):
@@ -95,16 +155,18 @@ def remove(self, decoration):
             several decorations
         """
         try:
-            self._decorations["misc"].remove(decoration)
+            del self._decorations["misc"][decoration]
+            self._index.pop("misc", None)
             self.update()
             return True
-        except ValueError:
+        except KeyError:
             return False
 
     def remove_key(self, key):
         """Remove key"""
         try:
             del self._decorations[key]
+            self._index.pop(key, None)
             self.update()
         except KeyError:
             pass
@@ -115,7 +177,8 @@ def get(self, key, default=None):
 
     def clear(self):
         """Removes all text decoration from the editor."""
-        self._decorations = {"misc": []}
+        self._decorations = {"misc": {}}
+        self._index = {}
         self.update()
 
     def update(self):
@@ -132,6 +195,9 @@ def update(self):
     def _update(self):
         """Update editor extra selections with added decorations.
 
+        Only decorations that intersect the visible portion of the editor
+        (plus a buffer around it) are passed to it.
+
         NOTE: Update TextDecorations to use editor font, using a different
         font family and point size could cause unwanted behaviors.
         """
@@ -141,40 +207,113 @@ def _update(self):
 
         try:
             font = editor.font()
+            document = editor.document()
+            self._set_document(document)
 
-            # Get the current visible block numbers
+            # Get the current visible range
             first, last = editor.get_buffer_block_numbers()
+            start = document.findBlockByNumber(first).position()
+            last_block = document.findBlockByNumber(last)
+            if last_block.isValid():
+                end = last_block.position() + last_block.length() - 1
+            else:
+                end = document.characterCount() - 1
 
             # Update visible decorations
             visible_decorations = []
-            for decoration in self._sorted_decorations():
-                need_update_sel = False
-                cursor = decoration.cursor
-                sel_start = cursor.selectionStart()
-                # This is required to update extra selections from the point
-                # an initial selection was made.
-                # Fixes spyder-ide/spyder#14282
-                if sel_start is not None:
-                    doc = cursor.document()
-                    block_nb_start = doc.findBlock(sel_start).blockNumber()
-                    need_update_sel = first <= block_nb_start <= last
-
-                block_nb = decoration.cursor.block().blockNumber()
-                if (first <= block_nb <= last or need_update_sel or
-                        decoration.kind == 'current_cell'):
-                    visible_decorations.append(decoration)
-                    try:
-                        decoration.format.setFont(
-                            font, QTextCharFormat.FontPropertiesSpecifiedOnly)
-                    except (TypeError, AttributeError):  # Qt < 5.3
-                        decoration.format.setFontFamily(font.family())
-                        decoration.format.setFontPointSize(font.pointSize())
-
+            for key in self._decorations:
+                if key == 'current_cell':
+                    visible_decorations.extend(self._decorations[key])
+                else:
+                    visible_decorations.extend(
+                        self._get_visible_decorations(key, start, end))
+
+            for decoration in visible_decorations:
+                try:
+                    decoration.format.setFont(
+                        font, QTextCharFormat.FontPropertiesSpecifiedOnly)
+                except (TypeError, AttributeError):  # Qt < 5.3
+                    decoration.format.setFontFamily(font.family())
+                    decoration.format.setFontPointSize(font.pointSize())
+
+            visible_decorations.sort(key=order_function)
             editor.setExtraSelections(visible_decorations)
         except RuntimeError:
             # This is needed to fix spyder-ide/spyder#9173.
             return
 
+        self._trim_changes()
+
+    def _set_document(self, document):
+        """Track the changes made to `document`."""
+        if document is self._document:
+            return
+
+        if self._document is not None:
+            try:
+                self._document.contentsChange.disconnect(
+                    self._on_contents_change)
+            except (TypeError, RuntimeError):
+                pass
+
+        self._document = document
+        self._index = {}
+        self._changes = []
+        self._changes_offset = 0
+        document.contentsChange.connect(self._on_contents_change)
+
+    @Slot(int, int, int)
+    def _on_contents_change(self, position, removed, added):
+        """Save a change made to the document if there are indexes."""
+        if self._index:
+            self._changes.append((position, removed, added))
+        else:
+            self._changes_offset += len(self._changes) + 1
+            self._changes = []
+
+    def _trim_changes(self):
+        """Remove changes that are not needed by any index."""
+        num_changes = self._changes_offset + len(self._changes)
+        oldest = min([built for __, built in self._index.values()],
+                     default=num_changes)
+        del self._changes[:oldest - self._changes_offset]
+        self._changes_offset = oldest
+
+    def _get_visible_decorations(self, key, start, end):
+        """
+        Get the decorations of `key` that intersect the range of positions
+        [start, end].
+        """
+        decorations = self._decorations[key]
+        if len(decorations) >= MIN_INDEXED_DECORATIONS:
+            num_changes = self._changes_offset + len(self._changes)
+            tree, built = self._index.get(key, (None, None))
+            if tree is None or num_changes - built > MAX_MAPPED_CHANGES:
+                tree = IntervalTree()
+                for decoration in decorations:
+                    cursor = decoration.cursor
+                    tree.addi(cursor.selectionStart(),
+                              cursor.selectionEnd() + 1,
+                              decoration)
+                built = num_changes
+                self._index[key] = (tree, built)
+
+            # Decorations were indexed with the positions they had when the
+            # tree was built, so we need to look for them there.
+            changes = self._changes[built - self._changes_offset:]
+            tree_start, tree_end = map_range_to_previous(start, end, changes)
+            decorations = [interval.data for interval in
+                           tree.overlap(tree_start, tree_end + 1)]
+
+        visible_decorations = []
+        for decoration in decorations:
+            cursor = decoration.cursor
+            if (cursor.selectionStart() <= end and
+                    cursor.selectionEnd() >= start):
+                visible_decorations.append(decoration)
+
+        return visible_decorations
+
     def __iter__(self):
         return iter(self._decorations)
 
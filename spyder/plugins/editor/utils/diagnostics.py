@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+# (see spyder/__init__.py for details)
+
+"""
+Store for the code analysis results of a file.
+"""
+
+
+class DiagnosticsStore:
+    """
+    Diagnostics reported by a linter for a file, indexed by the line where
+    they start.
+
+    Updating the store returns the lines whose diagnostics changed, so that
+    only the blocks in those lines need to be updated in the editor.
+    """
+
+    def __init__(self):
+        self._lines = {}
+
+    def __len__(self):
+        """Number of lines with diagnostics."""
+        return len(self._lines)
+
+    def __iter__(self):
+        """Iterate over the lines with diagnostics."""
+        return iter(self._lines)
+
+    def get(self, line):
+        """Get the diagnostics that start in `line`."""
+        return self._lines.get(line, [])
+
+    def clear(self):
+        """Remove all diagnostics."""
+        self._lines = {}
+
+    def update(self, diagnostics):
+        """
+        Replace the diagnostics in the store.
+
+        Parameters
+        ----------
+        diagnostics: list
+            Diagnostics as reported by the linter, in LSP format.
+
+        Returns
+        -------
+        set
+            Lines whose diagnostics were added, removed or changed.
+        """
+        lines = {}
+        for diagnostic in diagnostics:
+            line = diagnostic['range']['start']['line']
+            lines.setdefault(line, []).append(diagnostic)
+
+        old_lines = self._lines
+        changed = {line for line in old_lines if line not in lines}
+        changed.update(line for line, line_diagnostics in lines.items()
+                       if old_lines.get(line) != line_diagnostics)
+
+        self._lines = lines
+        return changed
@@ -21,13 +21,14 @@
 import os.path as osp
 
 # Third party imports
-from qtpy.QtCore import QTimer, Qt
+from qtpy.QtCore import QObject, QTimer, Qt
 from qtpy.QtGui import (QColor, QTextBlockUserData, QTextCursor, QTextBlock,
                         QTextDocument)
 
 # Local imports
 from spyder.py3compat import to_text_string
 from spyder.utils import encoding
+from spyder.utils.qstringhelpers import qstring_length
 
 
 def drift_color(base_color, factor=110):
@@ -753,6 +754,139 @@ def set_collapsed(block, val):
         block.setUserState(state)
 
 
+class TextChangesRecorder(QObject):
+    """
+    Record the text changes of a document as LSP content change events.
+
+    There's a single recorder per document (see `get_recorder`), shared by
+    all the editors that show it, so that each change is only reported once.
+    Changes are computed from the `contentsChange` signal of the document,
+    which makes their cost proportional to the size of the edit, not of the
+    document.
+    """
+
+    def __init__(self, document):
+        QObject.__init__(self, document)
+
+        # Length (in UTF-16 code units) of each line as of the last recorded
+        # change. It's used to know where removed text ended. None if not
+        # recording.
+        self._line_lengths = None
+
+        # Changes recorded since they were last taken
+        self._changes = []
+
+        document.contentsChange.connect(self._on_contents_change)
+
+    @classmethod
+    def get_recorder(cls, document):
+        """Get the recorder of `document`, creating it if needed."""
+        recorder = document.findChild(cls)
+        if recorder is None:
+            recorder = cls(document)
+        return recorder
+
+    def is_recording(self):
+        """Check if changes are being recorded."""
+        return self._line_lengths is not None
+
+    def start(self):
+        """Start recording changes from the current text of the document."""
+        line_lengths = []
+        block = self.parent().firstBlock()
+        while block.isValid():
+            line_lengths.append(block.length() - 1)
+            block = block.next()
+        self._line_lengths = line_lengths
+        self._changes = []
+
+    def stop(self):
+        """Stop recording changes."""
+        self._line_lengths = None
+        self._changes = []
+
+    def take_changes(self):
+        """
+        Take the changes recorded so far.
+
+        Returns
+        -------
+        list or None
+            List of LSP `TextDocumentContentChangeEvent` dicts, with `\\n` as
+            line separator, or None if changes are not being recorded.
+        """
+        if self._line_lengths is None:
+            return None
+        changes, self._changes = self._changes, []
+        return changes
+
+    def _on_contents_change(self, position, chars_removed, chars_added):
+        line_lengths = self._line_lengths
+        if line_lengths is None:
+            return
+
+        document = self.parent()
+        block = document.findBlock(position)
+        line = block.blockNumber()
+        character = position - block.position()
+
+        # Find where the removed text ended in the previous text. Qt can
+        # report changes that go past its end (e.g. when all the text is
+        # replaced), so they are clamped to it.
+        end_line = line
+        end_character = character + chars_removed
+        while (end_line < len(line_lengths) - 1 and
+                end_character > line_lengths[end_line]):
+            end_character -= line_lengths[end_line] + 1
+            end_line += 1
+        overflow = max(end_character - line_lengths[end_line], 0)
+        end_character -= overflow
+
+        end = min(position + chars_added, document.characterCount() - 1)
+        cursor = QTextCursor(document)
+        cursor.setPosition(position)
+        cursor.setPosition(end, QTextCursor.KeepAnchor)
+        text = to_text_string(cursor.selectedText()).replace(u'\u2029', '\n')
+
+        # Update the length of the changed lines
+        new_lengths = []
+        last_block = document.findBlock(end)
+        while block.isValid():
+            new_lengths.append(block.length() - 1)
+            if block == last_block:
+                break
+            block = block.next()
+        line_lengths[line:end_line + 1] = new_lengths
+
+        if len(line_lengths) != document.blockCount():
+            # This shouldn't happen, but if it does, changes can't be
+            # trusted anymore and the full text needs to be sent again.
+            self.stop()
+            return
+
+        change = {
+            'range': {
+                'start': {'line': line, 'character': character},
+                'end': {'line': end_line, 'character': end_character},
+            },
+            'rangeLength': chars_removed - overflow,
+            'text': text,
+        }
+
+        # Merge consecutive insertions in the same line (e.g. when typing)
+        if self._changes and line == end_line and end_character == character:
+            previous = self._changes[-1]
+            start = previous['range']['start']
+            previous_text = previous['text']
+            if (start['line'] == line and '\n' not in previous_text and
+                    start['character'] + qstring_length(previous_text) ==
+                    character):
+                previous['text'] = previous_text + text
+                return
+
+        self._changes.append(change)
+
+
 def get_file_language(filename, text=None):
     """Get file language from filename"""
     ext = osp.splitext(filename)[1]
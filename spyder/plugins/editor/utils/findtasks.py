@@ -8,10 +8,12 @@
 Source code analysis utilities.
 """
 
+import os
 import re
 
 # Local import
 from spyder.config.base import get_debug_level
+from spyder.utils import encoding
 
 DEBUG_EDITOR = get_debug_level() >= 3
 
@@ -21,13 +23,106 @@
 TASKS_PATTERN = r"(^|#)[ ]*(TODO|FIXME|XXX|HINT|TIP|@todo|" \
                 r"HACK|BUG|OPTIMIZE|!!!|\?\?\?)([^#]*)"
 
+# Keywords of TASKS_PATTERN, used to skip the text that has no tasks
+TASKS_KEYWORDS_RE = re.compile(r"TODO|FIXME|XXX|HINT|TIP|@todo|"
+                               r"HACK|BUG|OPTIMIZE|!!!|\?\?\?")
+
+
+def _find_block_tasks(block):
+    """
+    Find tasks in a block of lines separated by newlines.
+
+    Return the number of newlines in the block and a list of
+    (task text, line index in the block) tuples.
+    """
+    tasks = []
+    if TASKS_KEYWORDS_RE.search(block) is not None:
+        for line, text in enumerate(block.split('\n')):
+            for todo in re.findall(TASKS_PATTERN, text):
+                todo_text = (todo[-1].strip(' :').capitalize() if todo[-1]
+                             else todo[-2])
+                tasks.append((todo_text, line))
+    return block.count('\n'), tasks
+
 
 def find_tasks(source_code):
     """Find tasks in source code (TODO, FIXME, XXX, ...)."""
-    results = []
-    for line, text in enumerate(source_code.splitlines()):
-        for todo in re.findall(TASKS_PATTERN, text):
-            todo_text = (todo[-1].strip(' :').capitalize() if todo[-1]
-                         else todo[-2])
-            results.append((todo_text, line + 1))
-    return results
+    return TaskFinder().find_tasks(source_code)
+
+
+class TaskFinder(object):
+    """
+    Find tasks in successive versions of a source code.
+
+    The source code is split in blocks at empty lines and the tasks of each
+    block are cached, so only the blocks that changed since the previous
+    version are scanned again.
+    """
+
+    def __init__(self):
+        self._block_tasks = {}
+
+    def find_tasks(self, source_code):
+        """Find tasks in source code (TODO, FIXME, XXX, ...)."""
+        block_tasks = self._block_tasks
+        new_block_tasks = {}
+        results = []
+        line = 1
+        text = '\n'.join(source_code.splitlines())
+        for block in text.split('\n\n'):
+            try:
+                newlines, tasks = block_tasks[block]
+            except KeyError:
+                newlines, tasks = _find_block_tasks(block)
+            new_block_tasks[block] = (newlines, tasks)
+            results.extend((todo_text, line + block_line)
+                           for todo_text, block_line in tasks)
+            line += newlines + 2
+        self._block_tasks = new_block_tasks
+        return results
+
+
+class TaskIndex(object):
+    """
+    Index of the tasks in files on disk.
+
+    Files are only read and scanned again when their modification time or
+    size changes, so the tasks of all the files of a project can be
+    retrieved without opening them in the editor.
+    """
+
+    def __init__(self):
+        self._files = {}
+
+    def get_tasks(self, filenames):
+        """
+        Get the tasks in `filenames`.
+
+        Returns
+        -------
+        dict
+            Map between the names of the files that could be read and
+            the list of (task text, line number) tuples found in them.
+        """
+        results = {}
+        for filename in filenames:
+            try:
+                stat = os.stat(filename)
+            except OSError:
+                self._files.pop(filename, None)
+                continue
+            file_id = (stat.st_mtime_ns, stat.st_size)
+            try:
+                indexed_id, tasks = self._files[filename]
+            except KeyError:
+                indexed_id = tasks = None
+            if indexed_id != file_id:
+                try:
+                    text = encoding.read_text_file(filename)[0]
+                except (OSError, UnicodeError):
+                    self._files.pop(filename, None)
+                    continue
+                tasks = find_tasks(text)
+                self._files[filename] = (file_id, tasks)
+            results[filename] = tasks
+        return results
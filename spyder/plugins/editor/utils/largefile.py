@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+# (see spyder/__init__.py for details)
+
+"""
+Editor features that are disabled for large files.
+"""
+
+# ---- Constants
+MB = 1024 * 1024
+
+# Feature: (number of characters, number of lines) from which the feature
+# is disabled. The cheapest features to keep are the last ones to go.
+LARGE_FILE_THRESHOLDS = {
+    'folding': (MB, 20000),
+    'indent_guides': (MB, 20000),
+    'todo_finder': (2 * MB, 50000),
+    'completions': (5 * MB, 100000),
+    'highlighting': (10 * MB, 200000),
+}
+
+
+def get_large_file_features(text, thresholds=None):
+    """
+    Get the editor features to disable for `text`.
+
+    Parameters
+    ----------
+    text: str
+        Contents of the file.
+    thresholds: dict, optional
+        Thresholds to use instead of LARGE_FILE_THRESHOLDS.
+
+    Returns
+    -------
+    set
+        Names of the features whose size or line threshold is exceeded by
+        `text`. It's empty if the file is not large.
+    """
+    if thresholds is None:
+        thresholds = LARGE_FILE_THRESHOLDS
+
+    size = len(text)
+    min_size = min(size for size, __ in thresholds.values())
+    min_lines = min(lines for __, lines in thresholds.values())
+    if size < min_size and size + 1 < min_lines:
+        # Not even one character per line is enough to reach the line
+        # thresholds, so there's no need to count lines.
+        return set()
+
+    lines = text.count('\n') + 1
+    return {feature for feature, (max_size, max_lines) in thresholds.items()
+            if size >= max_size or lines >= max_lines}
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+# (see spyder/__init__.py for details)
+
+"""
+Find the occurrences of a word in a text.
+"""
+
+# Standard library imports
+import re
+
+# Local imports
+from spyder.utils.qstringhelpers import qstring_length
+
+
+# Maximum number of occurrences to find. Occurrences in the visible part of
+# the editor are always included, even if there are more than this.
+MAX_OCCURRENCES = 1000
+
+# Number of matches to process between checks for cancellation
+CHECK_STOPPED_INTERVAL = 1000
+
+
+def find_occurrences(text, word, visible_start, visible_end,
+                     max_occurrences=MAX_OCCURRENCES, stopped=None):
+    """
+    Find the occurrences of `word` as a whole word in `text`.
+
+    Parameters
+    ----------
+    text: str
+        Text to search in.
+    word: str
+        Word to search for.
+    visible_start, visible_end: int
+        Range of positions of the visible part of the text. Positions are
+        in UTF-16 code units, as in QTextDocument.
+    max_occurrences: int, optional
+        Maximum number of occurrences to return. If there are more, the
+        ones closest to the visible part are returned.
+    stopped: callable, optional
+        Function that returns True if the search needs to be interrupted.
+
+    Returns
+    -------
+    list or None
+        Sorted list of (start, end) positions of the occurrences, in UTF-16
+        code units, or None if the search was interrupted.
+    """
+    regexp = re.compile(r'(?<!\w){}(?!\w)'.format(re.escape(word)))
+    word_length = qstring_length(word)
+    has_unicode = len(text) != qstring_length(text)
+
+    before = []
+    visible = []
+    after = []
+    position = 0
+    position16 = 0
+    for n, match in enumerate(regexp.finditer(text)):
+        if (stopped is not None and n % CHECK_STOPPED_INTERVAL == 0 and
+                stopped()):
+            return None
+
+        start = match.start()
+        if has_unicode:
+            position16 += qstring_length(text[position:start])
+            position = start
+        else:
+            position16 = start
+
+        if position16 + word_length < visible_start:
+            before.append(position16)
+        elif position16 > visible_end:
+            after.append(position16)
+        else:
+            visible.append(position16)
+
+    # Take the occurrences closest to the visible part of the text
+    before.reverse()
+    num_before = num_after = 0
+    while num_before + num_after + len(visible) < max_occurrences:
+        if num_before < len(before):
+            if (num_after == len(after) or
+                    visible_start - before[num_before] <=
+                    after[num_after] - visible_end):
+                num_before += 1
+                continue
+        if num_after < len(after):
+            num_after += 1
+        else:
+            break
+
+    starts = before[:num_before][::-1] + visible + after[:num_after]
+    return [(start, start + word_length) for start in starts]
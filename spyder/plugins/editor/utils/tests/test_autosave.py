@@ -8,13 +8,17 @@
 # Standard library imports
 import ast
 import os.path as osp
+import threading
 
 # Third party imports
 import pytest
 
 # Local imports
 from spyder.plugins.editor.utils.autosave import (AutosaveForStack,
-                                                  AutosaveForPlugin)
+                                                  AutosaveForPlugin,
+                                                  AutosaveWriter)
+from spyder.utils import encoding
+from spyder.utils.encoding import get_text_hash
 
 
 def test_autosave_component_set_interval(mocker):
@@ -180,26 +184,118 @@ def test_autosave(mocker, have_hash):
     """Test that AutosaveForStack.maybe_autosave writes the contents to the
     autosave file and updates the file_hashes."""
     mock_editor = mocker.Mock()
+    mock_editor.get_text_with_eol.return_value = 'spam'
     mock_fileinfo = mocker.Mock(editor=mock_editor, filename='orig',
-                                newly_created=False)
+                                newly_created=False, encoding='utf-8',
+                                pending_load=None)
     mock_document = mocker.Mock()
     mock_fileinfo.editor.document.return_value = mock_document
     mock_stack = mocker.Mock(data=[mock_fileinfo])
     addon = AutosaveForStack(mock_stack)
+    addon.writer = mocker.Mock()
     addon.name_mapping = {'orig': 'autosave'}
     addon.file_hashes = {'autosave': 2}
     if have_hash:
         addon.file_hashes['orig'] = 1
-    mock_stack.compute_hash.return_value = 3
 
     addon.maybe_autosave(0)
 
-    mock_stack._write_to_file.assert_called_with(mock_fileinfo, 'autosave')
-    mock_stack.compute_hash.assert_called_with(mock_fileinfo)
+    args = addon.writer.write.call_args[0]
+    assert args[:3] == ('spam', 'autosave', 'utf-8')
     if have_hash:
-        assert addon.file_hashes == {'orig': 1, 'autosave': 3}
+        assert addon.file_hashes == {'orig': 1,
+                                     'autosave': get_text_hash('spam')}
     else:
-        assert addon.file_hashes == {'autosave': 3}
+        assert addon.file_hashes == {'autosave': get_text_hash('spam')}
+
+
+def test_autosave_skips_unchanged_revision(mocker):
+    """Test that AutosaveForStack.maybe_autosave does not get the text of
+    files whose document revision did not change since the last check."""
+    mock_editor = mocker.Mock()
+    mock_editor.get_text_with_eol.return_value = 'spam'
+    mock_editor.document.return_value.revision.return_value = 7
+    mock_fileinfo = mocker.Mock(editor=mock_editor, filename='orig',
+                                newly_created=False, pending_load=None)
+    addon = AutosaveForStack(mocker.Mock(data=[mock_fileinfo]))
+    addon.writer = mocker.Mock()
+    addon.file_hashes = {'orig': 1}
+
+    addon.maybe_autosave(0)
+    assert mock_editor.get_text_with_eol.call_count == 1
+    assert addon.writer.write.call_count == 1
+
+    addon.maybe_autosave(0)
+    assert mock_editor.get_text_with_eol.call_count == 1
+    assert addon.writer.write.call_count == 1
+
+    mock_editor.document.return_value.revision.return_value = 8
+    addon.maybe_autosave(0)
+    assert mock_editor.get_text_with_eol.call_count == 2
+
+
+@pytest.mark.parametrize('cancel', [False, True])
+def test_autosave_writer(qtbot, tmpdir, cancel):
+    """Test that AutosaveWriter writes the last text requested for a file
+    in a thread, unless the write is cancelled."""
+    writer = AutosaveWriter()
+    filename = str(tmpdir.join('autosave.py'))
+
+    def error_callback(error):
+        pytest.fail(str(error))
+
+    with writer._lock:
+        # Block the writes until all of them are requested
+        writer.write('spam', filename, 'utf-8', error_callback)
+        writer.write('ham', filename, 'utf-8', error_callback)
+    if cancel:
+        writer.cancel(filename)
+    qtbot.waitUntil(lambda: not writer._error_callbacks)
+
+    if cancel:
+        assert not osp.exists(filename)
+    else:
+        assert open(filename).read() == 'ham'
+    writer.close()
+
+
+def test_autosave_writer_write_in_progress(qtbot, tmpdir, mocker):
+    """Test that AutosaveWriter doesn't skip a write requested while a
+    previous write of the same file is in progress."""
+    writer = AutosaveWriter()
+    filename = str(tmpdir.join('autosave.py'))
+    started = threading.Event()
+    release = threading.Event()
+    write = encoding.write
+
+    def slow_write(text, *args):
+        started.set()
+        release.wait(5)
+        return write(text, *args)
+
+    mocker.patch.object(encoding, 'write', side_effect=slow_write)
+    writer.write('spam', filename, 'utf-8')
+    assert started.wait(5)
+    threading.Timer(0.1, release.set).start()
+    writer.write('ham', filename, 'utf-8')
+    qtbot.waitUntil(lambda: not writer._error_callbacks)
+
+    assert open(filename).read() == 'ham'
+    writer.close()
+
+
+def test_autosave_writer_error(qtbot, tmpdir):
+    """Test that AutosaveWriter calls the error callback of a write that
+    fails."""
+    writer = AutosaveWriter()
+    filename = str(tmpdir.join('missing_dir', 'autosave.py'))
+    errors = []
+
+    writer.write('spam', filename, 'utf-8', errors.append)
+    qtbot.waitUntil(lambda: len(errors) == 1)
+
+    assert isinstance(errors[0], EnvironmentError)
+    writer.close()
 
 
 @pytest.mark.parametrize('latin', [True, False])
@@ -289,14 +385,16 @@ def test_autosave_file_renamed(mocker, tmpdir, have_hash):
     mocker.patch('spyder.plugins.editor.utils.autosave.get_conf_path',
                  return_value=str(tmpdir))
     mock_editor = mocker.Mock()
+    mock_editor.get_text_with_eol.return_value = 'spam'
     mock_fileinfo = mocker.Mock(editor=mock_editor, filename='new_foo.py',
-                                newly_created=False)
+                                newly_created=False, encoding='utf-8',
+                                pending_load=None)
     mock_document = mocker.Mock()
     mock_fileinfo.editor.document.return_value = mock_document
     mock_stack = mocker.Mock(data=[mock_fileinfo])
     mock_stack.has_filename.return_value = 0
-    mock_stack.compute_hash.return_value = 3
     addon = AutosaveForStack(mock_stack)
+    addon.writer = mocker.Mock()
     old_autosavefile = str(tmpdir.join('old_foo.py'))
     new_autosavefile = str(tmpdir.join('new_foo.py'))
     addon.name_mapping = {'old_foo.py': old_autosavefile}
@@ -309,13 +407,15 @@ def test_autosave_file_renamed(mocker, tmpdir, have_hash):
     addon.file_renamed('old_foo.py', 'new_foo.py')
 
     mock_remove.assert_any_call(old_autosavefile)
-    mock_stack._write_to_file.assert_called_with(
-        mock_fileinfo, new_autosavefile)
+    args = addon.writer.write.call_args[0]
+    assert args[:3] == ('spam', new_autosavefile, 'utf-8')
     assert addon.name_mapping == {'new_foo.py': new_autosavefile}
+    new_hash = get_text_hash('spam')
     if have_hash:
-        assert addon.file_hashes == {'new_foo.py': 1, new_autosavefile: 3}
+        assert addon.file_hashes == {'new_foo.py': 1,
+                                     new_autosavefile: new_hash}
     else:
-        assert addon.file_hashes == {new_autosavefile: 3}
+        assert addon.file_hashes == {new_autosavefile: new_hash}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+#
+"""Tests for diagnostics.py"""
+
+# Third party imports
+import pytest
+
+# Local imports
+from spyder.plugins.editor.utils.diagnostics import DiagnosticsStore
+
+
+def diagnostic(line, message):
+    return {
+        'source': 'pyflakes',
+        'range': {'start': {'line': line, 'character': 0},
+                  'end': {'line': line, 'character': 1}},
+        'message': message,
+        'severity': 2
+    }
+
+
+def test_diagnostics_store():
+    """Test that the store reports the lines whose diagnostics changed."""
+    store = DiagnosticsStore()
+    assert store.update([diagnostic(1, 'a'), diagnostic(3, 'b'),
+                         diagnostic(3, 'c')]) == {1, 3}
+    assert store.get(3) == [diagnostic(3, 'b'), diagnostic(3, 'c')]
+    assert store.get(2) == []
+    assert len(store) == 2
+
+    # Nothing changed
+    assert store.update([diagnostic(3, 'b'), diagnostic(3, 'c'),
+                         diagnostic(1, 'a')]) == set()
+
+    # Changed, removed and added lines
+    assert store.update([diagnostic(3, 'b'), diagnostic(5, 'd'),
+                         diagnostic(7, 'e')]) == {1, 3, 5, 7}
+    assert sorted(store) == [3, 5, 7]
+
+    store.clear()
+    assert len(store) == 0
+
+
+if __name__ == '__main__':
+    pytest.main()
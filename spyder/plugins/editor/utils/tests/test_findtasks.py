@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+#
+"""Tests for findtasks.py"""
+
+# Standard library imports
+import os
+
+# Third party imports
+import pytest
+
+# Local imports
+from spyder.plugins.editor.utils import findtasks
+from spyder.plugins.editor.utils.findtasks import (find_tasks, TaskFinder,
+                                                   TaskIndex)
+
+
+TEXT = ('# TODO: first task\n'
+        'x = 1  # FIXME fix this\n'
+        '\n'
+        '\n'
+        '\n'
+        'def f():\n'
+        '    # XXX\n'
+        '    return 2\r\n'
+        '\r\n'
+        '# ???: last task\r')
+
+
+def test_find_tasks():
+    """Test that tasks are found in the right lines."""
+    assert find_tasks(TEXT) == [('First task', 1), ('Fix this', 2),
+                                ('XXX', 7), ('Last task', 10)]
+    assert find_tasks('') == []
+
+
+def test_task_finder_caches_blocks(mocker):
+    """Test that TaskFinder only scans the blocks that changed."""
+    finder = TaskFinder()
+    assert finder.find_tasks(TEXT) == find_tasks(TEXT)
+
+    new_text = 'import os\n\n' + TEXT.replace('return 2', 'return 3')
+    expected = find_tasks(new_text)
+    spy = mocker.spy(findtasks, '_find_block_tasks')
+    assert finder.find_tasks(new_text) == expected
+    assert sorted(call[0][0] for call in spy.call_args_list) == [
+        'def f():\n    # XXX\n    return 3', 'import os']
+
+
+def test_task_index(tmpdir, mocker):
+    """Test that TaskIndex only reads files again if they changed."""
+    spam = tmpdir.join('spam.py')
+    spam.write('# TODO: spam\n')
+    ham = tmpdir.join('ham.py')
+    ham.write('# FIXME: ham\n')
+    missing = str(tmpdir.join('missing.py'))
+    index = TaskIndex()
+
+    spy = mocker.spy(findtasks, 'find_tasks')
+    assert index.get_tasks([str(spam), str(ham), missing]) == {
+        str(spam): [('Spam', 1)], str(ham): [('Ham', 1)]}
+    assert spy.call_count == 2
+
+    ham.write('\n# FIXME: new ham\n')
+    stat = os.stat(str(ham))
+    os.utime(str(ham), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert index.get_tasks([str(spam), str(ham)]) == {
+        str(spam): [('Spam', 1)], str(ham): [('New ham', 2)]}
+    assert spy.call_count == 3
+
+
+if __name__ == "__main__":
+    pytest.main()
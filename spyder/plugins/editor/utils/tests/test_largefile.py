@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+#
+"""Tests for largefile.py"""
+
+# Third party imports
+import pytest
+
+# Local imports
+from spyder.plugins.editor.utils.largefile import get_large_file_features
+
+
+THRESHOLDS = {
+    'folding': (100, 10),
+    'highlighting': (1000, 100),
+}
+
+
+@pytest.mark.parametrize('text, features', [
+    ('', set()),
+    ('x' * 99, set()),
+    ('x' * 100, {'folding'}),
+    ('\n' * 9, {'folding'}),
+    ('x\n' * 8, set()),
+    ('x' * 1000, {'folding', 'highlighting'}),
+    ('\n' * 99, {'folding', 'highlighting'}),
+])
+def test_get_large_file_features(text, features):
+    """Test that features are disabled according to size and lines."""
+    assert get_large_file_features(text, THRESHOLDS) == features
+
+
+def test_default_thresholds():
+    """Test that regular files don't disable any feature."""
+    text = 'def foo(x):\n    return x\n' * 1000
+    assert get_large_file_features(text) == set()
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+#
+"""Tests for occurrences.py"""
+
+# Third party imports
+import pytest
+
+# Local imports
+from spyder.plugins.editor.utils.occurrences import find_occurrences
+
+
+def test_find_occurrences():
+    """Test that only whole words are found."""
+    text = "foo = foo_bar + foo\nbar(foo, afoo, foo.x)"
+    assert find_occurrences(text, 'foo', 0, len(text)) == [
+        (0, 3), (16, 19), (24, 27), (35, 38)]
+    assert find_occurrences(text, 'bar', 0, len(text)) == [(20, 23)]
+
+
+def test_find_occurrences_unicode():
+    """Test that positions are in UTF-16 code units."""
+    text = "😀 = foo\n# 😀😀\nfoo = 'é😀'"
+    assert find_occurrences(text, 'foo', 0, 30) == [(5, 8), (16, 19)]
+    assert find_occurrences(text, 'é', 0, 30) == [(23, 24)]
+
+
+def test_find_occurrences_max():
+    """
+    Test that the occurrences closest to the visible part of the text are
+    returned if there are too many, and that visible ones are always
+    returned.
+    """
+    text = "a\n" * 100
+    occurrences = find_occurrences(text, 'a', 100, 110, max_occurrences=10)
+    assert [start for start, __ in occurrences] == list(range(96, 116, 2))
+
+    occurrences = find_occurrences(text, 'a', 0, 20, max_occurrences=5)
+    assert [start for start, __ in occurrences] == list(range(0, 22, 2))
+
+    occurrences = find_occurrences(text, 'a', 180, 220, max_occurrences=30)
+    assert [start for start, __ in occurrences] == list(range(140, 200, 2))
+
+
+def test_find_occurrences_stopped():
+    """Test that the search can be interrupted."""
+    assert find_occurrences('a a a', 'a', 0, 5, stopped=lambda: True) is None
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+#
+"""Tests for TextChangesRecorder in editor.py"""
+
+# Standard library imports
+import random
+
+# Third party imports
+import pytest
+from qtpy.QtGui import QTextCursor, QTextDocument
+
+# Local imports
+from spyder.plugins.editor.utils.editor import TextChangesRecorder
+from spyder.utils.sourcecode import apply_text_changes
+
+
+def test_recorder_is_shared(qtbot):
+    """Test that there's a single recorder per document."""
+    document = QTextDocument()
+    recorder = TextChangesRecorder.get_recorder(document)
+    assert TextChangesRecorder.get_recorder(document) is recorder
+    assert not recorder.is_recording()
+    assert recorder.take_changes() is None
+
+
+def test_recorder_typing(qtbot):
+    """Test that consecutive insertions are merged."""
+    document = QTextDocument()
+    document.setPlainText('foo\nbar')
+
+    # Changes are only reported if the document has a layout
+    document.documentLayout()
+    recorder = TextChangesRecorder.get_recorder(document)
+    recorder.start()
+
+    cursor = QTextCursor(document)
+    cursor.movePosition(QTextCursor.End)
+    for char in ['😀', 'b', 'z']:
+        cursor.insertText(char)
+    cursor.deletePreviousChar()
+
+    assert recorder.take_changes() == [
+        {'range': {'start': {'line': 1, 'character': 3},
+                   'end': {'line': 1, 'character': 3}},
+         'rangeLength': 0,
+         'text': '😀bz'},
+        {'range': {'start': {'line': 1, 'character': 6},
+                   'end': {'line': 1, 'character': 7}},
+         'rangeLength': 1,
+         'text': ''},
+    ]
+    assert recorder.take_changes() == []
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_recorder_random_edits(qtbot, seed):
+    """Test that recorded changes reproduce the text of the document."""
+    rnd = random.Random(seed)
+    document = QTextDocument()
+    document.setPlainText('def foo(x):\n    return x  # ñ\n' * 10)
+    document.documentLayout()
+    recorder = TextChangesRecorder.get_recorder(document)
+    recorder.start()
+    text = document.toPlainText()
+
+    snippets = ['a', '\n', 'bc\nd', 'é', '\n\n', 'foo(\n    x)']
+    for __ in range(100):
+        cursor = QTextCursor(document)
+        cursor.setPosition(rnd.randrange(document.characterCount()))
+        if rnd.random() < 0.4:
+            cursor.setPosition(
+                min(cursor.position() + rnd.randrange(1, 30),
+                    document.characterCount() - 1),
+                QTextCursor.KeepAnchor)
+        cursor.insertText(rnd.choice(snippets))
+
+        if rnd.random() < 0.2:
+            text = apply_text_changes(text, recorder.take_changes())
+            assert text == document.toPlainText()
+
+    # Replacing all the text
+    document.setPlainText('new\ntext')
+    text = apply_text_changes(text, recorder.take_changes())
+    assert text == document.toPlainText()
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -26,6 +26,7 @@
 import sre_constants
 import sys
 import textwrap
+import threading
 from pkg_resources import parse_version
 
 # Third party imports
@@ -33,11 +34,11 @@
 from IPython.core.inputtransformer2 import TransformerManager
 from qtpy import QT_VERSION
 from qtpy.compat import to_qvariant
-from qtpy.QtCore import (QEvent, QEventLoop, QRegExp, Qt, QTimer, QThread,
-                         QUrl, Signal, Slot)
+from qtpy.QtCore import (QEvent, QEventLoop, Qt, QTimer, QThread, QUrl,
+                         Signal, Slot)
 from qtpy.QtGui import (QColor, QCursor, QFont, QKeySequence, QPaintEvent,
                         QPainter, QMouseEvent, QTextCursor, QDesktopServices,
-                        QKeyEvent, QTextDocument, QTextFormat, QTextOption,
+                        QKeyEvent, QTextFormat, QTextOption,
                         QTextCharFormat, QTextLayout)
 from qtpy.QtWidgets import (QApplication, QMenu, QMessageBox, QSplitter,
                             QScrollBar)
@@ -62,9 +63,11 @@
 from spyder.plugins.editor.panels import (
     ClassFunctionDropdown, EdgeLine, FoldingPanel, IndentationGuide,
     LineNumberArea, PanelsManager, ScrollFlagArea)
-from spyder.plugins.editor.utils.editor import (TextHelper, BlockUserData,
-                                                get_file_language)
+from spyder.plugins.editor.utils.editor import (
+    TextHelper, BlockUserData, TextChangesRecorder, get_file_language)
+from spyder.plugins.editor.utils.diagnostics import DiagnosticsStore
 from spyder.plugins.editor.utils.kill_ring import QtKillRing
+from spyder.plugins.editor.utils.occurrences import find_occurrences
 from spyder.plugins.editor.utils.languages import ALL_LANGUAGES, CELL_LANGUAGES
 from spyder.plugins.editor.panels.utils import (
     merge_folding, collect_folding_regions)
@@ -84,6 +87,7 @@
                                     mimedata2url, start_file)
 from spyder.utils.vcs import get_git_remotes, remote_to_url
 from spyder.utils.qstringhelpers import qstring_length
+from spyder.utils.workers import WorkerManager
 
 
 try:
@@ -202,6 +206,15 @@ class CodeEditor(TextEditBaseWidget):
     #: Signal emitted when the flags need to be updated in the scrollflagarea
     sig_flags_changed = Signal()
 
+    #: Signal emitted when the flags of some blocks changed
+    #
+    # Parameters
+    # ----------
+    # blocks: list or None
+    #     Blocks whose flags were set, or None if the flags of any block
+    #     could have changed.
+    sig_block_flags_changed = Signal(object)
+
     #: Signal emitted when the syntax color theme of the editor.
     sig_theme_colors_changed = Signal(dict)
 
@@ -388,6 +401,10 @@ def __init__(self, parent=None):
 
         self.highlighter_class = sh.TextSH
         self.highlighter = None
+
+        # Features that are disabled because the file is large. See
+        # spyder.plugins.editor.utils.largefile
+        self.large_file_features = set()
         ccs = 'Spyder'
         if ccs not in sh.COLOR_SCHEME_NAMES:
             ccs = sh.COLOR_SCHEME_NAMES[0]
@@ -418,7 +435,6 @@ def __init__(self, parent=None):
 
         # Indicate occurrences of the selected word
         self.cursorPositionChanged.connect(self.__cursor_position_changed)
-        self.__find_first_pos = None
 
         self.language = None
         self.supported_language = False
@@ -429,15 +445,6 @@ def __init__(self, parent=None):
         # Block user data
         self.blockCountChanged.connect(self.update_bookmarks)
 
-        # Highlight using Pygments highlighter timer
-        # ---------------------------------------------------------------------
-        # For files that use the PygmentsSH we parse the full file inside
-        # the highlighter in order to generate the correct coloring.
-        self.timer_syntax_highlight = QTimer(self)
-        self.timer_syntax_highlight.setSingleShot(True)
-        self.timer_syntax_highlight.timeout.connect(
-            self.run_pygments_highlighter)
-
         # Mark occurrences timer
         self.occurrence_highlighting = None
         self.occurrence_timer = QTimer(self)
@@ -446,6 +453,11 @@ def __init__(self, parent=None):
         self.occurrence_timer.timeout.connect(self.mark_occurrences)
         self.occurrences = []
 
+        # Occurrences are searched in a thread. The search in progress, if
+        # any, is saved to cancel it.
+        self._occurrences_worker_manager = WorkerManager()
+        self._occurrences_search = None
+
         # Update decorations
         self.update_decorations_timer = QTimer(self)
         self.update_decorations_timer.setSingleShot(True)
@@ -469,6 +481,9 @@ def __init__(self, parent=None):
         self.textChanged.connect(self.__text_has_changed)
         self.found_results = []
 
+        # Block data of the lines with todos
+        self._todo_data = []
+
         # Docstring
         self.writer_docstring = DocstringWriterExtension(self)
 
@@ -557,6 +572,9 @@ def __init__(self, parent=None):
         self.document_symbols_enabled = False
         self.formatting_characters = []
         self.completion_args = None
+        # Completions of the word being typed, to filter them as it grows
+        # instead of asking the providers again on each keystroke.
+        self._completion_session = None
         self.folding_supported = False
         self.is_cloned = False
         self.operation_in_progress = False
@@ -568,6 +586,11 @@ def __init__(self, parent=None):
         self.update_diagnostics_thread.finished.connect(
             self.finish_code_analysis)
         self._diagnostics = []
+        self._diagnostics_store = DiagnosticsStore()
+
+        # Block data and text of the lines where diagnostics were set
+        self._code_analysis_blocks = {}
+        self._code_analysis_changed_blocks = None
 
         # Editor Extensions
         self.editor_extensions = EditorExtensionsManager(self)
@@ -579,6 +602,7 @@ def __init__(self, parent=None):
         self.differ = diff_match_patch()
         self.previous_text = ''
         self.patch = []
+        self.text_changes = []
         self.leading_whitespaces = {}
 
         # re-use parent of completion_widget (usually the main window)
@@ -598,13 +622,22 @@ def __init__(self, parent=None):
     # ------------------------------------------------------------------------
     def process_server_requests(self):
         """Process server requests."""
+        pending_requests = self._pending_server_requests
+        self._pending_server_requests = []
+
+        # The didOpen notification needs to be sent before didChange because
+        # incremental changes are relative to the text sent with it.
+        for method, params, requires_response in pending_requests:
+            if method == CompletionRequestTypes.DOCUMENT_DID_OPEN:
+                self.emit_request(method, params, requires_response)
+
         # Check if document needs to be updated:
         if self._document_server_needs_update:
             self.document_did_change()
             self._document_server_needs_update = False
-        for method, params, requires_response in self._pending_server_requests:
-            self.emit_request(method, params, requires_response)
-        self._pending_server_requests = []
+        for method, params, requires_response in pending_requests:
+            if method != CompletionRequestTypes.DOCUMENT_DID_OPEN:
+                self.emit_request(method, params, requires_response)
 
     # --- Hover/Hints
     def _should_display_hover(self, point):
@@ -756,6 +789,8 @@ def closeEvent(self, event):
         self.update_folding_thread.wait()
         self.update_diagnostics_thread.quit()
         self.update_diagnostics_thread.wait()
+        self.stop_occurrences_search()
+        self._occurrences_worker_manager.terminate_all()
         TextEditBaseWidget.closeEvent(self, event)
 
     def get_document_id(self):
@@ -831,7 +866,8 @@ def setup_editor(self,
                      remove_trailing_spaces=False,
                      remove_trailing_newlines=False,
                      add_newline=False,
-                     format_on_save=False):
+                     format_on_save=False,
+                     large_file_features=None):
         """
         Set-up configuration for the CodeEditor instance.
 
@@ -913,7 +949,12 @@ def setup_editor(self,
             Default False.
         format_on_save: Autoformat file automatically when saving.
             Default False.
+        large_file_features: Features to disable because the file is large,
+            regardless of the other options. Default None.
         """
+        if cloned_from is not None:
+            large_file_features = cloned_from.large_file_features
+        self.large_file_features = set(large_file_features or [])
 
         self.set_close_parentheses_enabled(close_parentheses)
         self.set_close_quotes_enabled(close_quotes)
@@ -960,6 +1001,7 @@ def setup_editor(self,
             # Needed to show indent guides for splited editor panels
             # See spyder-ide/spyder#10900
             self.patch = cloned_from.patch
+            self.text_changes = cloned_from.text_changes
             self.is_cloned = True
         self.toggle_line_numbers(linenumbers, markers)
 
@@ -1068,6 +1110,11 @@ def log_lsp_handle_errors(self, message):
     # ------------- LSP: Configuration and protocol start/end ----------------
     def start_completion_services(self):
         """Start completion services for this instance."""
+        if 'completions' in self.large_file_features:
+            logger.debug(u"Completion services disabled for large file: "
+                         u"{0}".format(self.filename))
+            return
+
         self.completions_available = True
 
         if self.is_cloned:
@@ -1126,11 +1173,13 @@ def register_completion_capabilities(self, capabilities):
             self.format_action.setEnabled(True)
             self.sig_refresh_formatting.emit(True)
 
-        self.completions_available = True
+        self.completions_available = (
+            'completions' not in self.large_file_features)
 
     def stop_completion_services(self):
         logger.debug('Stopping completion services for %s' % self.filename)
         self.completions_available = False
+        TextChangesRecorder.get_recorder(self.document()).stop()
 
     @schedule_request(method=CompletionRequestTypes.DOCUMENT_DID_OPEN,
                       requires_response=False)
@@ -1141,6 +1190,14 @@ def document_did_open(self):
         if self.is_ipython():
             # Send valid python text to LSP as it doesn't support IPython
             text = self.ipython_to_python(text)
+
+        # Following changes are relative to this text
+        recorder = TextChangesRecorder.get_recorder(self.document())
+        if self.is_incremental_sync():
+            recorder.start()
+        else:
+            recorder.stop()
+
         params = {
             'file': self.filename,
             'language': self.language,
@@ -1186,6 +1243,16 @@ def schedule_document_did_change(self):
         self._document_server_needs_update = True
         self._server_requests_timer.start()
 
+    def is_incremental_sync(self):
+        """
+        Check if text changes are sent to the server incrementally.
+
+        That's the case if the server supports it, except for IPython files,
+        whose full text needs to be converted to Python.
+        """
+        return (self.sync_mode == TextDocumentSyncKind.INCREMENTAL and
+                not self.is_ipython())
+
     @request(
         method=CompletionRequestTypes.DOCUMENT_DID_CHANGE,
         requires_response=False)
@@ -1193,25 +1260,61 @@ def document_did_change(self):
         """Send textDocument/didChange request to the server."""
         # Cancel formatting
         self.formatting_in_progress = False
-        text = self.get_text_with_eol()
-        if self.is_ipython():
-            # Send valid python text to LSP
-            text = self.ipython_to_python(text)
 
-        self.text_version += 1
+        recorder = TextChangesRecorder.get_recorder(self.document())
+        changes = None
+        if self.is_incremental_sync():
+            changes = recorder.take_changes()
+            if changes is not None and not changes:
+                # Changes were already sent by another editor of the same
+                # document (i.e. a clone).
+                return
 
-        self.patch = self.differ.patch_make(self.previous_text, text)
-        self.previous_text = text
+        self.text_version += 1
         cursor = self.textCursor()
         params = {
             'file': self.filename,
             'version': self.text_version,
-            'text': text,
-            'diff': self.patch,
             'offset': cursor.position(),
             'selection_start': cursor.selectionStart(),
             'selection_end': cursor.selectionEnd(),
         }
+
+        if changes is not None:
+            # Only send the ranges that changed
+            eol_chars = self.get_line_separator()
+            if eol_chars != '\n':
+                for change in changes:
+                    change['text'] = change['text'].replace('\n', eol_chars)
+            self.patch = []
+            self.text_changes = changes
+            params['changes'] = changes
+
+            # The text the next full update would be diffed against is
+            # outdated now
+            self.previous_text = None
+            return params
+
+        text = self.get_text_with_eol()
+        if self.is_ipython():
+            # Send valid python text to LSP
+            text = self.ipython_to_python(text)
+
+        if self.previous_text is None:
+            # Incremental changes were sent since the last full text, so
+            # there's nothing to diff the text against.
+            self.patch = []
+        else:
+            self.patch = self.differ.patch_make(self.previous_text, text)
+        self.previous_text = text
+        self.text_changes = []
+        params['text'] = text
+        params['diff'] = self.patch
+
+        if self.is_incremental_sync():
+            # Following changes are relative to this text
+            recorder.start()
+
         return params
 
     @handles(CompletionRequestTypes.DOCUMENT_PUBLISH_DIAGNOSTICS)
@@ -1257,7 +1360,7 @@ def sync_symbols_and_folding(self):
 
     def process_code_analysis(self, diagnostics):
         """Process code analysis results in a thread."""
-        self.cleanup_code_analysis()
+        self.clear_extra_selections('code_analysis_highlight')
         self._diagnostics = diagnostics
 
         # Process diagnostics in a thread to improve performance.
@@ -1270,11 +1373,14 @@ def cleanup_code_analysis(self):
         self.clear_extra_selections('code_analysis_underline')
         for data in self.blockuserdata_list():
             data.code_analysis = []
+        self._diagnostics_store.clear()
+        self._code_analysis_blocks = {}
 
         self.setUpdatesEnabled(True)
         # When the new code analysis results are empty, it is necessary
         # to update manually the scrollflag and linenumber areas (otherwise,
         # the old flags will still be displayed):
+        self.sig_block_flags_changed.emit(None)
         self.sig_flags_changed.emit()
         self.linenumberarea.update()
 
@@ -1311,6 +1417,7 @@ def finish_code_analysis(self):
         if self.underline_errors_enabled:
             self.underline_errors()
         self.sig_process_code_analysis.emit()
+        self.sig_block_flags_changed.emit(self._code_analysis_changed_blocks)
         self.sig_flags_changed.emit()
 
     def errors_present(self):
@@ -1319,9 +1426,31 @@ def errors_present(self):
         """
         return bool(len(self._diagnostics))
 
+    def _filter_diagnostics(self, block, diagnostics):
+        """Remove diagnostics that need to be ignored in `block`."""
+        text = block.text()
+
+        # Skip messages according to certain criteria.
+        # This one works for any programming language
+        if 'analysis:ignore' in text:
+            return []
+
+        # This only works for Python.
+        if self.language == 'Python':
+            if NOQA_INLINE_REGEXP.search(text) is not None:
+                return []
+
+        if self.is_ipython():
+            # get_ipython is defined in IPython files
+            diagnostics = [
+                diagnostic for diagnostic in diagnostics
+                if diagnostic["message"] != "undefined name 'get_ipython'"]
+
+        return diagnostics
+
     def _process_code_analysis(self, underline):
         """
-        Process all code analysis results.
+        Process code analysis results.
 
         Parameters
         ----------
@@ -1331,68 +1460,152 @@ def _process_code_analysis(self, underline):
             these two processes for perfomance reasons. That's because
             setting errors can be done in a thread whereas underlining
             them can't.
+
+        Notes
+        -----
+        * Results are set only in the blocks of lines whose diagnostics
+          changed since the last time they were set, or whose text or
+          position changed since then.
+        * Only the visible blocks are underlined.
         """
         document = self.document()
+        store = self._diagnostics_store
+
         if underline:
             first_block, last_block = self.get_buffer_block_numbers()
-
-        for diagnostic in self._diagnostics:
-            if self.is_ipython() and (
-                    diagnostic["message"] == "undefined name 'get_ipython'"):
-                # get_ipython is defined in IPython files
-                continue
-            source = diagnostic.get('source', '')
-            msg_range = diagnostic['range']
-            start = msg_range['start']
-            end = msg_range['end']
-            code = diagnostic.get('code', 'E')
-            message = diagnostic['message']
-            severity = diagnostic.get(
-                'severity', DiagnosticSeverity.ERROR)
-
-            block = document.findBlockByNumber(start['line'])
-            text = block.text()
-
-            # Skip messages according to certain criteria.
-            # This one works for any programming language
-            if 'analysis:ignore' in text:
-                continue
-
-            # This only works for Python.
-            if self.language == 'Python':
-                if NOQA_INLINE_REGEXP.search(text) is not None:
+            for line in range(first_block, last_block + 1):
+                diagnostics = store.get(line)
+                if not diagnostics:
                     continue
 
-            data = block.userData()
-            if not data:
-                data = BlockUserData(self)
+                block = document.findBlockByNumber(line)
+                for diagnostic in self._filter_diagnostics(block,
+                                                           diagnostics):
+                    data = block.userData()
+                    if not data:
+                        data = BlockUserData(self)
 
-            if underline:
-                block_nb = block.blockNumber()
-                if first_block <= block_nb <= last_block:
+                    severity = diagnostic.get(
+                        'severity', DiagnosticSeverity.ERROR)
                     error = severity == DiagnosticSeverity.ERROR
                     color = self.error_color if error else self.warning_color
                     color = QColor(color)
                     color.setAlpha(255)
                     block.color = color
 
-                    data.selection_start = start
-                    data.selection_end = end
+                    data.selection_start = diagnostic['range']['start']
+                    data.selection_end = diagnostic['range']['end']
 
                     self.highlight_selection('code_analysis_underline',
                                              data._selection(),
                                              underline_color=block.color)
-            else:
-                # Don't append messages to data for cloned editors to avoid
-                # showing them twice or more times on hover.
-                # Fixes spyder-ide/spyder#15618
-                if not self.is_cloned:
-                    data.code_analysis.append(
-                        (source, code, severity, message)
-                    )
-                block.setUserData(data)
+            return
+
+        changed_lines = store.update(self._diagnostics)
+
+        # Don't set messages in data for cloned editors to avoid showing them
+        # twice or more times on hover.
+        # Fixes spyder-ide/spyder#15618
+        # Since we don't know which blocks the editor they were cloned from
+        # changed, all flags need to be updated for them.
+        self._code_analysis_changed_blocks = None
+        if self.is_cloned:
+            return
+
+        # Blocks can move or change after their results were set, so they
+        # need to be updated too in that case.
+        set_blocks = self._code_analysis_blocks
+        for line, (data, text) in set_blocks.items():
+            if line not in changed_lines:
+                block = document.findBlockByNumber(line)
+                if block.userData() is not data or block.text() != text:
+                    changed_lines.add(line)
+
+        # Remove old results. This only touches Python attributes, so it's
+        # safe even if their blocks were removed.
+        for line in changed_lines:
+            data, __ = set_blocks.pop(line, (None, None))
+            if data is not None:
+                data.code_analysis = []
+
+        changed_blocks = []
+        for line in sorted(changed_lines):
+            diagnostics = store.get(line)
+            block = document.findBlockByNumber(line)
+            if not diagnostics or not block.isValid():
+                continue
+
+            data = block.userData()
+            if not data:
+                data = BlockUserData(self)
+
+            data.code_analysis = [
+                (diagnostic.get('source', ''),
+                 diagnostic.get('code', 'E'),
+                 diagnostic.get('severity', DiagnosticSeverity.ERROR),
+                 diagnostic['message'])
+                for diagnostic in self._filter_diagnostics(block, diagnostics)
+            ]
+
+            block.setUserData(data)
+            set_blocks[line] = (data, block.text())
+            changed_blocks.append(block)
+
+        self._code_analysis_changed_blocks = changed_blocks
 
     # ------------- LSP: Completion ---------------------------------------
+    def _get_completion_context(self):
+        """
+        Get the word being completed and the context of a completion session.
+
+        The context is made of the word start, the text of its line before
+        it and the length of the document without the word, so it stays
+        the same while only the word under the cursor is edited.
+        """
+        cursor = self.textCursor()
+        under_cursor = self.get_current_word_and_position(completion=True)
+        if under_cursor:
+            word, word_start = under_cursor
+        else:
+            word, word_start = '', cursor.position()
+        block = cursor.block()
+        context = (
+            word_start,
+            block.text()[:max(word_start - block.position(), 0)],
+            self.document().characterCount() - len(word)
+        )
+        return word, context
+
+    def _get_session_completions(self, word, context, position):
+        """
+        Get the completions that match `word` from the current completion
+        session, or None if the session can't be used for it.
+        """
+        session = self._completion_session
+        if (session is None or session['completions'] is None or
+                session['partial'] or context != session['context'] or
+                not word.lower().startswith(session['word'].lower())):
+            return None
+
+        word = word.lower()
+        word_start = context[0]
+        completions = []
+        for completion in session['completions']:
+            filter_text = completion.get('filterText')
+            if filter_text and not filter_text.lower().startswith(word):
+                continue
+            completion = dict(completion)
+
+            # Extend the text edits that replaced the word to its new end
+            text_edit = completion.get('textEdit')
+            if (text_edit is not None and
+                    text_edit['range']['start'] == word_start and
+                    text_edit['range']['end'] == session['position']):
+                completion['textEdit'] = dict(
+                    text_edit, range={'start': word_start, 'end': position})
+            completions.append(completion)
+        return completions
+
     @schedule_request(method=CompletionRequestTypes.DOCUMENT_COMPLETION)
     def do_completion(self, automatic=False):
         """Trigger completion."""
@@ -1402,6 +1615,25 @@ def do_completion(self, automatic=False):
             valid_python_variable=False
         )
 
+        word, context = self._get_completion_context()
+        if automatic:
+            # Filter the completions of the word being typed, if possible
+            completions = self._get_session_completions(
+                word, context, cursor.position())
+            if completions is not None:
+                self.completion_args = None
+                self._show_completions(
+                    completions, cursor.position(), automatic)
+                return
+
+        self._completion_session = {
+            'word': word,
+            'context': context,
+            'position': cursor.position(),
+            'completions': None,
+            'partial': False,
+        }
+
         params = {
             'file': self.filename,
             'line': cursor.blockNumber(),
@@ -1411,7 +1643,8 @@ def do_completion(self, automatic=False):
             'selection_end': cursor.selectionEnd(),
             'current_word': current_word
         }
-        self.completion_args = (self.textCursor().position(), automatic)
+        self.completion_args = (
+            self.textCursor().position(), automatic, False)
         return params
 
     @handles(CompletionRequestTypes.DOCUMENT_COMPLETION)
@@ -1421,9 +1654,55 @@ def process_completion(self, params):
         if args is None:
             # This should not happen
             return
-        self.completion_args = None
-        position, automatic = args
+        position, automatic, update_only = args
+
+        if update_only and not self.completion_widget.isVisible():
+            # The completions of a partial response were dismissed or
+            # inserted, so don't show the list again for the rest of them.
+            self.completion_args = None
+            self._completion_session = None
+            return
+
+        # Partial responses are followed by a complete one, which must be
+        # handled too.
+        partial = params.get('partial', False)
+        if not partial:
+            self.completion_args = None
+
+        try:
+            completions = params['params']
+            completions = ([] if completions is None else
+                           [completion for completion in completions
+                            if completion.get('insertText')
+                            or completion.get('textEdit', {}).get('newText')])
+
+            # Keep the completions for the rest of the session, unless the
+            # user has moved to another word in the meantime
+            session = self._completion_session
+            if session is not None:
+                __, context = self._get_completion_context()
+                if context == session['context']:
+                    session['completions'] = [
+                        dict(completion) for completion in completions]
+                    session['partial'] = partial
+                else:
+                    self._completion_session = None
+        except RuntimeError:
+            # This is triggered when a codeeditor instance was removed
+            # before the response can be processed.
+            return
+        except Exception:
+            self.log_lsp_handle_errors('Error when processing completions')
+            return
+
+        self._show_completions(completions, position, automatic)
+        if partial:
+            # Only update the list with the next responses while it's shown
+            self.completion_args = (
+                position, automatic, self.completion_widget.isVisible())
 
+    def _show_completions(self, completions, position, automatic):
+        """Sort, adjust and show completions in the completion widget."""
         start_cursor = self.textCursor()
         start_cursor.movePosition(QTextCursor.StartOfBlock)
         line_text = self.get_text(start_cursor.position(), 'eol')
@@ -1432,11 +1711,6 @@ def process_completion(self, params):
         eol_char = self.get_line_separator()
 
         try:
-            completions = params['params']
-            completions = ([] if completions is None else
-                           [completion for completion in completions
-                            if completion.get('insertText')
-                            or completion.get('textEdit', {}).get('newText')])
             prefix = self.get_current_word(completion=True,
                                            valid_python_variable=False)
             if (len(completions) == 1
@@ -1977,7 +2251,7 @@ def finish_code_folding(self):
         folding_panel.update_folding(self._folding_info)
 
         # Update indent guides, which depend on folding
-        if self.indent_guides._enabled and len(self.patch) > 0:
+        if self.indent_guides._enabled and (self.patch or self.text_changes):
             line, column = self.get_cursor_line_column()
             self.update_whitespace_count(line, column)
 
@@ -2051,12 +2325,17 @@ def toggle_format_on_save(self, state):
         self.format_on_save = state
 
     def toggle_code_folding(self, state):
+        if 'folding' in self.large_file_features:
+            state = False
         self.code_folding = state
         self.set_folding_panel(state)
-        if not state and self.indent_guides._enabled:
+        if (not state and self.indent_guides._enabled and
+                'indent_guides' not in self.large_file_features):
             self.code_folding = True
 
     def toggle_identation_guides(self, state):
+        if 'indent_guides' in self.large_file_features:
+            state = False
         if state and not self.code_folding:
             self.code_folding = True
         self.indent_guides.set_enabled(state)
@@ -2186,9 +2465,12 @@ def _set_highlighter(self, sh_class):
             # TODO: test if leaving parent/document as is eats memory
             self.highlighter.setParent(None)
             self.highlighter.setDocument(None)
-        self.highlighter = self.highlighter_class(self.document(),
-                                                  self.font(),
-                                                  self.color_scheme)
+        if 'highlighting' in self.large_file_features:
+            # Only highlight blank spaces. The highlighter class is kept
+            # because it's used to know the language of the file.
+            sh_class = sh.TextSH
+        self.highlighter = sh_class(self.document(), self.font(),
+                                    self.color_scheme)
         self._apply_highlighter_color_scheme()
 
         self.highlighter.editor = self
@@ -2412,26 +2694,6 @@ def delete(self):
             self.setTextCursor(cursor)
         self.remove_selected_text()
 
-    #------Find occurrences
-    def __find_first(self, text):
-        """Find first occurrence: scan whole document"""
-        flags = QTextDocument.FindCaseSensitively|QTextDocument.FindWholeWords
-        cursor = self.textCursor()
-        # Scanning whole document
-        cursor.movePosition(QTextCursor.Start)
-        regexp = QRegExp(r"\b%s\b" % QRegExp.escape(text), Qt.CaseSensitive)
-        cursor = self.document().find(regexp, cursor, flags)
-        self.__find_first_pos = cursor.position()
-        return cursor
-
-    def __find_next(self, text, cursor):
-        """Find next occurrence"""
-        flags = QTextDocument.FindCaseSensitively|QTextDocument.FindWholeWords
-        regexp = QRegExp(r"\b%s\b" % QRegExp.escape(text), Qt.CaseSensitive)
-        cursor = self.document().find(regexp, cursor, flags)
-        if cursor.position() != self.__find_first_pos:
-            return cursor
-
     def __cursor_position_changed(self):
         """Cursor position has changed"""
         line, column = self.get_cursor_line_column()
@@ -2446,13 +2708,25 @@ def __cursor_position_changed(self):
         else:
             self.unhighlight_current_line()
         if self.occurrence_highlighting:
+            # Occurrences of the previous word are not needed anymore
+            self.stop_occurrences_search()
             self.occurrence_timer.start()
 
         # Strip if needed
         self.strip_trailing_spaces()
 
+    def stop_occurrences_search(self):
+        """Stop searching for occurrences, if a search is in progress."""
+        if self._occurrences_search is not None:
+            # The worker still emits its finished signal, which is needed to
+            # stop its thread, but its results are ignored.
+            __, stopped = self._occurrences_search
+            stopped.set()
+            self._occurrences_search = None
+
     def clear_occurrences(self):
         """Clear occurrence markers"""
+        self.stop_occurrences_search()
         self.occurrences = []
         self.clear_extra_selections('occurrences')
         self.sig_flags_changed.emit()
@@ -2514,12 +2788,52 @@ def mark_occurrences(self):
                  to_text_string(text) == 'self')):
             return
 
-        # Highlighting all occurrences of word *text*
-        cursor = self.__find_first(text)
+        # Highlighting all occurrences of word *text*. They are searched in
+        # a thread in the current text, to not block the interface in big
+        # files.
+        document = self.document()
+        first, last = self.get_buffer_block_numbers()
+        visible_start = document.findBlockByNumber(first).position()
+        last_block = document.findBlockByNumber(last)
+        if last_block.isValid():
+            visible_end = last_block.position() + last_block.length()
+        else:
+            visible_end = document.characterCount()
+
+        stopped = threading.Event()
+        worker = self._occurrences_worker_manager.create_python_worker(
+            find_occurrences,
+            to_text_string(document.toPlainText()),
+            text,
+            visible_start,
+            visible_end,
+            stopped=stopped.is_set
+        )
+        worker.sig_finished.connect(
+            functools.partial(self._set_occurrences, document.revision()))
+        self._occurrences_search = (worker, stopped)
+        worker.start()
+
+    def _set_occurrences(self, revision, worker, occurrences, error):
+        """Highlight the occurrences found by mark_occurrences."""
+        if (self._occurrences_search is None or
+                self._occurrences_search[0] is not worker):
+            return
+        self._occurrences_search = None
+
+        # The text changed while searching, so positions are not valid.
+        # Occurrences will be searched again when the cursor moves.
+        if (error is not None or occurrences is None or
+                self.document().revision() != revision):
+            return
+
         self.occurrences = []
-        extra_selections = self.get_extra_selections('occurrences')
-        first_occurrence = None
-        while cursor:
+        extra_selections = []
+        for start, end in occurrences:
+            cursor = self.textCursor()
+            cursor.setPosition(start)
+            cursor.setPosition(end, QTextCursor.KeepAnchor)
+
             block = cursor.block()
             if not block.userData():
                 # Add user data to check block validity
@@ -2527,22 +2841,11 @@ def mark_occurrences(self):
             self.occurrences.append(block)
 
             selection = self.get_selection(cursor)
-            if len(selection.cursor.selectedText()) > 0:
-                extra_selections.append(selection)
-                if len(extra_selections) == 1:
-                    first_occurrence = selection
-                else:
-                    selection.format.setBackground(self.occurrence_color)
-                    first_occurrence.format.setBackground(
-                        self.occurrence_color)
-            cursor = self.__find_next(text, cursor)
-        self.set_extra_selections('occurrences', extra_selections)
+            if len(occurrences) > 1:
+                selection.format.setBackground(self.occurrence_color)
+            extra_selections.append(selection)
 
-        if len(self.occurrences) > 1 and self.occurrences[-1] == 0:
-            # XXX: this is never happening with PySide but it's necessary
-            # for PyQt4... this must be related to a different behavior for
-            # the QTextDocument.find function between those two libraries
-            self.occurrences.pop(-1)
+        self.set_extra_selections('occurrences', extra_selections)
         self.sig_flags_changed.emit()
 
     #-----highlight found results (find/replace widget)
@@ -2817,6 +3120,9 @@ def set_text(self, text):
         self.setPlainText(text)
         self.set_eol_chars(text=text)
 
+        # For files that use the PygmentsSH we parse the full file inside
+        # the highlighter in order to generate the correct coloring. After
+        # that, text changes are parsed incrementally.
         if (isinstance(self.highlighter, sh.PygmentsSH)
                 and not running_under_pytest()):
             self.highlighter.make_charlist()
@@ -3304,9 +3610,13 @@ def go_to_next_todo(self):
 
     def process_todo(self, todo_results):
         """Process todo finder results"""
-        for data in self.blockuserdata_list():
+        # This only touches Python attributes, so it's safe even if the
+        # blocks of the previous results were removed.
+        for data in self._todo_data:
             data.todo = ''
+        self._todo_data = []
 
+        blocks = []
         for message, line_number in todo_results:
             block = self.document().findBlockByNumber(line_number - 1)
             data = block.userData()
@@ -3314,6 +3624,9 @@ def process_todo(self, todo_results):
                 data = BlockUserData(self)
             data.todo = message
             block.setUserData(data)
+            blocks.append(block)
+            self._todo_data.append(data)
+        self.sig_block_flags_changed.emit(blocks)
         self.sig_flags_changed.emit()
 
     #------Comments/Indentation
@@ -4482,25 +4795,6 @@ def keyReleaseEvent(self, event):
         if key in {Qt.Key_Up,  Qt.Key_Down}:
             self.update_decorations_timer.start()
 
-        # This necessary to run our Pygments highlighter again after the
-        # user generated text changes
-        if event.text():
-            # Stop the active timer and start it again to not run it on
-            # every event
-            if self.timer_syntax_highlight.isActive():
-                self.timer_syntax_highlight.stop()
-
-            # Adjust interval to rehighlight according to the lines
-            # present in the file
-            total_lines = self.get_line_count()
-            if total_lines < 1000:
-                self.timer_syntax_highlight.setInterval(600)
-            elif total_lines < 2000:
-                self.timer_syntax_highlight.setInterval(800)
-            else:
-                self.timer_syntax_highlight.setInterval(1000)
-            self.timer_syntax_highlight.start()
-
         self._restore_editor_cursor_and_selections()
         super(CodeEditor, self).keyReleaseEvent(event)
         event.ignore()
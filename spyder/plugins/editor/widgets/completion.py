@@ -96,6 +96,15 @@ def is_empty(self):
 
     def show_list(self, completion_list, position, automatic):
         """Show list corresponding to position."""
+        # Keep the selected item if the list is only being updated (e.g.
+        # with the completions of slower providers).
+        selected_label = None
+        current_item = self.currentItem()
+        if (self.isVisible() and not self.is_internal_console and
+                position == self.completion_position and
+                current_item is not None):
+            selected_label = current_item.data(Qt.UserRole)['label']
+
         self.current_selected_item_label = None
         self.current_selected_item_point = None
 
@@ -153,9 +162,16 @@ def show_list(self, completion_list, position, automatic):
                 for completion in self.completion_list:
                     completion['point'] = tooltip_point
 
-        # Show hint for first completion element
-        self.setCurrentRow(0)
-        self.row_changed(0)
+        # Show hint for the first or previously selected completion element
+        row = 0
+        if selected_label is not None:
+            for index in range(self.count()):
+                label = self.item(index).data(Qt.UserRole)['label']
+                if label == selected_label:
+                    row = index
+                    break
+        self.setCurrentRow(row)
+        self.row_changed(row)
 
         # signal used for testing
         self.sig_show_completions.emit(completion_list)
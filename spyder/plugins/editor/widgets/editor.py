@@ -36,13 +36,17 @@
 from spyder.config.utils import (get_edit_filetypes, get_edit_filters,
                                  get_filter, is_kde_desktop, is_anaconda)
 from spyder.plugins.editor.utils.autosave import AutosaveForStack
+from spyder.plugins.editor.utils.bookmarks import load_bookmarks
 from spyder.plugins.editor.utils.editor import get_file_language
+from spyder.plugins.editor.utils.largefile import (LARGE_FILE_THRESHOLDS,
+                                                   get_large_file_features)
 from spyder.plugins.editor.utils.switcher import EditorSwitcherManager
 from spyder.plugins.editor.widgets import codeeditor
 from spyder.plugins.editor.widgets.editorstack_helpers import (
-    ThreadManager, FileInfo, StackHistory)
+    ThreadManager, FileInfo, PendingLoad, StackHistory)
 from spyder.plugins.editor.widgets.status import (CursorPositionStatus,
                                                   EncodingStatus, EOLStatus,
+                                                  LargeFileStatus,
                                                   ReadWriteStatus, VCSStatus)
 from spyder.plugins.explorer.widgets.explorer import (
     show_in_external_file_explorer)
@@ -174,6 +178,7 @@ class EditorStack(QWidget):
     encoding_changed = Signal(str)
     sig_editor_cursor_position_changed = Signal(int, int)
     sig_refresh_eol_chars = Signal(str)
+    sig_refresh_large_file = Signal(list)
     sig_refresh_formatting = Signal(bool)
     starting_long_process = Signal(str)
     ending_long_process = Signal(str)
@@ -394,6 +399,7 @@ def __init__(self, parent, actions):
         self.run_cell_copy = False
         self.create_new_file_if_empty = True
         self.indent_guides = False
+        self.large_file_mode_enabled = True
         ccs = 'spyder/dark'
         if ccs not in syntaxhighlighters.COLOR_SCHEME_NAMES:
             ccs = syntaxhighlighters.COLOR_SCHEME_NAMES[0]
@@ -805,6 +811,9 @@ def clone_editor_from(self, other_finfo, set_current):
         finfo = self.create_new_editor(fname, enc, "",
                                        set_current=set_current, new=new,
                                        cloned_from=other_finfo.editor)
+        if other_finfo.pending_load is not None:
+            finfo.pending_load = other_finfo.pending_load
+            finfo.pending_load.finfos.append(finfo)
         finfo.set_todo_results(other_finfo.todo_results)
         return finfo.editor
 
@@ -1006,6 +1015,11 @@ def set_indent_guides(self, state):
             for finfo in self.data:
                 finfo.editor.toggle_identation_guides(state)
 
+    def set_large_file_mode_enabled(self, state):
+        # CONF.get(self.CONF_SECTION, 'large_file_mode')
+        # Only files opened after changing this option are affected
+        self.large_file_mode_enabled = state
+
     def set_close_parentheses_enabled(self, state):
         # CONF.get(self.CONF_SECTION, 'close_parentheses')
         self.close_parentheses_enabled = state
@@ -1678,6 +1692,7 @@ def close_file(self, index=None, force=False):
 
             if finfo.filename in self.autosave.file_hashes:
                 del self.autosave.file_hashes[finfo.filename]
+            self.autosave.file_revisions.pop(finfo.filename, None)
 
         if self.get_stack_count() == 0 and self.create_new_file_if_empty:
             self.sig_new_file[()].emit()
@@ -1845,10 +1860,10 @@ def compute_hash(self, fileinfo):
                 to be computed.
 
         Returns:
-            int: computed hash.
+            str: computed hash.
         """
         txt = to_text_string(fileinfo.editor.get_text_with_eol())
-        return hash(txt)
+        return encoding.get_text_hash(txt)
 
     def _write_to_file(self, fileinfo, filename):
         """Low-level function for writing text of editor to file.
@@ -1890,6 +1905,9 @@ def save(self, index=None, force=False, save_new_files=True):
         if not (finfo.editor.document().isModified() or
                 finfo.newly_created) and not force:
             return True
+        if finfo.pending_load is not None:
+            # Don't write the empty text of an editor whose file wasn't read
+            self.load_pending_file(index)
         if not osp.isfile(finfo.filename) and not force:
             # File has not been saved yet
             if save_new_files:
@@ -2114,6 +2132,8 @@ def save_copy_as(self, index=None):
             # Save the currently edited file
             index = self.get_stack_index()
         finfo = self.data[index]
+        if finfo.pending_load is not None:
+            self.load_pending_file(index)
         original_filename = finfo.filename
         filename = self.select_savename(original_filename)
         if filename:
@@ -2184,6 +2204,9 @@ def get_todo_results(self):
 
     def current_changed(self, index):
         """Stack index has changed"""
+        if index != -1 and self.data[index].pending_load is not None:
+            self.load_pending_file(index)
+
         editor = self.get_current_editor()
         if index != -1:
             editor.setFocus()
@@ -2293,6 +2316,8 @@ def __refresh_statusbar(self, index):
         if self.data and len(self.data) > index:
             finfo = self.data[index]
             self.encoding_changed.emit(finfo.encoding)
+            self.sig_refresh_large_file.emit(
+                sorted(finfo.editor.large_file_features))
             # Refresh cursor position status:
             line, index = finfo.editor.get_cursor_line_column()
             self.sig_editor_cursor_position_changed.emit(line, index)
@@ -2451,12 +2476,13 @@ def reload(self, index):
         finfo = self.data[index]
         logger.debug("Reloading {}".format(finfo.filename))
 
-        txt, finfo.encoding = encoding.read(finfo.filename)
+        txt, finfo.encoding, txt_hash, __ = encoding.read_text_file(
+            finfo.filename)
         finfo.lastmodified = QFileInfo(finfo.filename).lastModified()
         position = finfo.editor.get_position('cursor')
         finfo.editor.set_text(txt)
         finfo.editor.document().setModified(False)
-        self.autosave.file_hashes[finfo.filename] = hash(txt)
+        self.autosave.file_hashes[finfo.filename] = txt_hash
         finfo.editor.set_cursor_position(position)
 
         #XXX CodeEditor-only: re-scan the whole text to rebuild outline
@@ -2488,10 +2514,13 @@ def revert(self):
         self.reload(index)
 
     def create_new_editor(self, fname, enc, txt, set_current, new=False,
-                          cloned_from=None, add_where='end'):
+                          cloned_from=None, add_where='end', lazy=False):
         """
         Create a new editor instance
         Returns finfo object (instead of editor as in previous releases)
+
+        If *lazy* is True, *txt* is ignored and the file is registered with
+        completion services when it's loaded (see `load_pending_file`).
         """
         editor = codeeditor.CodeEditor(self)
         editor.go_to_definition.connect(
@@ -2519,7 +2548,10 @@ def create_new_editor(self, fname, enc, txt, set_current, new=False,
         editor.sig_process_code_analysis.connect(
             lambda: self.update_code_analysis_actions.emit())
         editor.sig_refresh_formatting.connect(self.sig_refresh_formatting)
-        language = get_file_language(fname, txt)
+        language = get_file_language(fname, None if lazy else txt)
+        large_file_features = None
+        if cloned_from is None and self.large_file_mode_enabled:
+            large_file_features = get_large_file_features(txt)
         editor.setup_editor(
             linenumbers=self.linenumbers_enabled,
             show_blanks=self.blanks_enabled,
@@ -2560,9 +2592,10 @@ def create_new_editor(self, fname, enc, txt, set_current, new=False,
             remove_trailing_spaces=self.always_remove_trailing_spaces,
             remove_trailing_newlines=self.remove_trailing_newlines,
             add_newline=self.add_newline,
-            format_on_save=self.format_on_save
+            format_on_save=self.format_on_save,
+            large_file_features=large_file_features
         )
-        if cloned_from is None:
+        if cloned_from is None and not lazy:
             editor.set_text(txt)
             editor.document().setModified(False)
         finfo.text_changed_at.connect(
@@ -2609,12 +2642,16 @@ def perform_completion_request(lang, method, params):
         # Needs to reset the highlighting on startup in case the PygmentsSH
         # is in use
         editor.run_pygments_highlighter()
-        options = {
-            'language': editor.language,
-            'filename': editor.filename,
-            'codeeditor': editor
-        }
-        self.sig_open_file.emit(options)
+        if lazy:
+            finfo.pending_load = PendingLoad(editor)
+            finfo.pending_load.finfos.append(finfo)
+        else:
+            options = {
+                'language': editor.language,
+                'filename': editor.filename,
+                'codeeditor': editor
+            }
+            self.sig_open_file.emit(options)
         self.sig_codeeditor_created.emit(editor)
         if self.get_stack_index() == 0:
             self.current_changed(0)
@@ -2672,28 +2709,42 @@ def new(self, filename, encoding, text, default_content=False,
         return finfo
 
     def load(self, filename, set_current=True, add_where='end',
-             processevents=True):
+             processevents=True, lazy=False):
         """
         Load filename, create an editor instance and return it
 
         This also sets the hash of the loaded file in the autosave component.
 
+        If *lazy* is True and *set_current* is False, only an empty editor is
+        created for the file. Reading it and the rest of its setup are
+        deferred until its tab is activated (see `load_pending_file`).
+
         *Warning* This is loading file, creating editor but not executing
         the source code analysis -- the analysis must be done by the editor
         plugin (in case multiple editorstack instances are handled)
         """
         filename = osp.abspath(to_text_string(filename))
+        lazy = lazy and not set_current
+        if lazy and self.large_file_mode_enabled:
+            # Large files need to be read to know the features to disable
+            # in their editor when it's created
+            lazy = osp.getsize(filename) < min(
+                size for size, __ in LARGE_FILE_THRESHOLDS.values())
+        if lazy:
+            return self.create_new_editor(filename, 'utf-8', '', set_current,
+                                          add_where=add_where, lazy=True)
+
         if processevents:
             self.starting_long_process.emit(_("Loading %s...") % filename)
-        text, enc = encoding.read(filename)
-        self.autosave.file_hashes[filename] = hash(text)
+        text, enc, text_hash, eol_counts = encoding.read_text_file(filename)
+        self.autosave.file_hashes[filename] = text_hash
         finfo = self.create_new_editor(filename, enc, text, set_current,
                                        add_where=add_where)
         index = self.data.index(finfo)
         if processevents:
             self.ending_long_process.emit("")
         if self.isVisible() and self.checkeolchars_enabled \
-           and sourcecode.has_mixed_eol_chars(text):
+           and len(eol_counts) > 1:
             name = osp.basename(filename)
             self.msgbox = QMessageBox(
                     QMessageBox.Warning,
@@ -2710,6 +2761,51 @@ def load(self, filename, set_current=True, add_where='end',
         finfo.editor.set_sync_symbols_and_folding_timeout()
         return finfo
 
+    def load_pending_file(self, index):
+        """
+        Read a file that was loaded lazily and finish setting up its editor.
+
+        This is done only once for the editors of the file in all editor
+        stacks, which share the same document.
+        """
+        finfo = self.data[index]
+        pending = finfo.pending_load
+        filename = finfo.filename
+        logger.debug("Loading pending file {}".format(filename))
+
+        if osp.isfile(filename):
+            text, enc, text_hash, __ = encoding.read_text_file(filename)
+        else:
+            # The file was removed after its tab was created, which is
+            # reported to users by __check_file_status
+            text, enc = '', finfo.encoding
+            text_hash = encoding.get_text_hash(text)
+        self.autosave.file_hashes[filename] = text_hash
+        editor = finfo.editor
+        editor.set_text(text)
+        editor.document().setModified(False)
+
+        lastmodified = QFileInfo(filename).lastModified()
+        for other_finfo in pending.finfos:
+            other_finfo.pending_load = None
+            other_finfo.encoding = enc
+            other_finfo.lastmodified = lastmodified
+            other_finfo.editor.eol_chars = editor.eol_chars
+
+        editor.set_bookmarks(load_bookmarks(filename))
+        if pending.line is not None:
+            editor.go_to_line(pending.line)
+        pending.editor.set_sync_symbols_and_folding_timeout()
+
+        options = {
+            'language': pending.editor.language,
+            'filename': pending.editor.filename,
+            'codeeditor': pending.editor
+        }
+        self.sig_open_file.emit(options)
+        self.is_analysis_done = False
+        self.analyze_script(index)
+
     def set_os_eol_chars(self, index=None, osname=None):
         """
         Sets the EOL character(s) based on the operating system.
@@ -3157,7 +3253,7 @@ def get_layout_settings(self):
             # XXX - this overrides value from the loop to always be False?
             orientation = False
             if hasattr(editorstack, 'data'):
-                clines = [finfo.editor.get_cursor_line_number()
+                clines = [finfo.get_cursor_line_number()
                           for finfo in editorstack.data]
                 cfname = editorstack.get_current_filename()
             splitsettings.append((orientation == Qt.Vertical, cfname, clines))
@@ -3242,7 +3338,9 @@ def __init__(self, parent, plugin, menu_actions):
         self.encoding_status = EncodingStatus(self)
         self.eol_status = EOLStatus(self)
         self.readwrite_status = ReadWriteStatus(self)
+        self.large_file_status = LargeFileStatus(self)
 
+        statusbar.insertPermanentWidget(0, self.large_file_status)
         statusbar.insertPermanentWidget(0, self.readwrite_status)
         statusbar.insertPermanentWidget(0, self.eol_status)
         statusbar.insertPermanentWidget(0, self.encoding_status)
@@ -3299,6 +3397,7 @@ def register_editorstack(self, editorstack):
         editorstack.reset_statusbar.connect(self.readwrite_status.hide)
         editorstack.reset_statusbar.connect(self.encoding_status.hide)
         editorstack.reset_statusbar.connect(self.cursorpos_status.hide)
+        editorstack.reset_statusbar.connect(self.large_file_status.hide)
         editorstack.readonly_changed.connect(
                                         self.readwrite_status.update_readonly)
         editorstack.encoding_changed.connect(
@@ -3306,6 +3405,8 @@ def register_editorstack(self, editorstack):
         editorstack.sig_editor_cursor_position_changed.connect(
                      self.cursorpos_status.update_cursor_position)
         editorstack.sig_refresh_eol_chars.connect(self.eol_status.update_eol)
+        editorstack.sig_refresh_large_file.connect(
+            self.large_file_status.update_large_file)
         self.plugin.register_editorstack(editorstack)
 
     def __print_editorstacks(self):
@@ -6,112 +6,137 @@
 
 # Standard library imports
 import logging
+import os
 
 # Third party imports
-from qtpy.QtCore import Signal, QFileInfo, QObject, QTimer, QThread
-from qtpy.QtWidgets import QApplication
+from qtpy.QtCore import Signal, QFileInfo, QObject, QRunnable, QThreadPool
 
 # Local imports
-from spyder.plugins.editor.utils.findtasks import find_tasks
+from spyder.plugins.editor.utils.findtasks import TaskFinder
 from spyder.py3compat import to_text_string, MutableSequence
 
 logger = logging.getLogger(__name__)
 
 
-class AnalysisThread(QThread):
-    """Analysis thread."""
+class AnalysisTask(QRunnable):
+    """Analysis task, run in the thread pool of a ThreadManager."""
 
-    def __init__(self, parent, checker, source_code):
-        """Initialize the Analysis thread."""
-        super(AnalysisThread, self).__init__(parent)
+    def __init__(self, manager, key, checker, end_callback, source_code):
+        """Initialize the analysis task."""
+        super(AnalysisTask, self).__init__()
+        self.setAutoDelete(False)
+        self.manager = manager
+        self.key = key
         self.checker = checker
-        self.results = None
+        self.end_callback = end_callback
         self.source_code = source_code
+        self.cancelled = False
 
     def run(self):
-        """Run analysis."""
-        try:
-            self.results = self.checker(self.source_code)
-        except Exception as e:
-            logger.error(e, exc_info=True)
+        """Run analysis, unless the task was cancelled."""
+        results = None
+        if not self.cancelled:
+            try:
+                results = self.checker(self.source_code)
+            except Exception as e:
+                logger.error(e, exc_info=True)
+        self.manager.sig_task_finished.emit(self, results)
 
 
 class ThreadManager(QObject):
-    """Analysis thread manager."""
-    def __init__(self, parent, max_simultaneous_threads=2):
+    """
+    Analysis thread manager.
+
+    Analysis tasks are run in a thread pool. Tasks are identified by their
+    parent and checker, so a task that is added while another one with the
+    same parent and checker is waiting or running supersedes it: the old
+    task is dropped, or its results are discarded.
+    """
+    sig_task_finished = Signal(object, object)
+
+    def __init__(self, parent, max_simultaneous_threads=None):
         """Initialize the ThreadManager."""
         super(ThreadManager, self).__init__(parent)
+        if max_simultaneous_threads is None:
+            max_simultaneous_threads = max(2, os.cpu_count() or 1)
         self.max_simultaneous_threads = max_simultaneous_threads
-        self.started_threads = {}
-        self.pending_threads = []
-        self.end_callbacks = {}
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(max_simultaneous_threads)
+
+        # Last task added for each key
+        self.tasks = {}
+
+        # Tasks in the thread pool. References to them need to be kept
+        # until they finish.
+        self.started_tasks = set()
+
+        self.sig_task_finished.connect(self.task_finished)
 
     def close_threads(self, parent):
-        """Close threads associated to parent_id."""
+        """Cancel tasks associated to parent."""
         logger.debug("Call ThreadManager's 'close_threads'")
-        if parent is None:
-            # Closing all threads
-            self.pending_threads = []
-            threadlist = []
-            for threads in list(self.started_threads.values()):
-                threadlist += threads
-        else:
-            parent_id = id(parent)
-            self.pending_threads = [(_th, _id) for (_th, _id)
-                                    in self.pending_threads
-                                    if _id != parent_id]
-            threadlist = self.started_threads.get(parent_id, [])
-        for thread in threadlist:
-            logger.debug("Waiting for thread %r to finish" % thread)
-            while thread.isRunning():
-                # We can't terminate thread safely, so we simply wait...
-                QApplication.processEvents()
+        parent_id = id(parent)
+        for key in [key for key in self.tasks if key[0] == parent_id]:
+            self.cancel_task(self.tasks.pop(key))
 
     def close_all_threads(self):
-        """Close all threads."""
+        """Cancel all tasks and wait for the running ones to finish."""
         logger.debug("Call ThreadManager's 'close_all_threads'")
-        self.close_threads(None)
+        for task in self.tasks.values():
+            self.cancel_task(task)
+        self.tasks = {}
+        self.thread_pool.waitForDone()
 
     def add_thread(self, checker, end_callback, source_code, parent):
-        """Add thread to queue."""
-        parent_id = id(parent)
-        thread = AnalysisThread(None, checker, source_code)
-        self.end_callbacks[id(thread)] = end_callback
-        self.pending_threads.append((thread, parent_id))
-        logger.debug("Added thread %r to queue" % thread)
-        QTimer.singleShot(50, self.update_queue)
-
-    def update_queue(self):
-        """Update queue."""
-        started = 0
-        for parent_id, threadlist in list(self.started_threads.items()):
-            still_running = []
-            for thread in threadlist:
-                if thread.isFinished():
-                    end_callback = self.end_callbacks.pop(id(thread))
-                    if thread.results is not None:
-                        #  The thread was executed successfully
-                        end_callback(thread.results)
-                    thread.setParent(None)
-                    thread = None
-                else:
-                    still_running.append(thread)
-                    started += 1
-            threadlist = None
-            if still_running:
-                self.started_threads[parent_id] = still_running
-            else:
-                self.started_threads.pop(parent_id)
-        logger.debug("Updating queue:")
-        logger.debug("    started: %d" % started)
-        logger.debug("    pending: %d" % len(self.pending_threads))
-        if self.pending_threads and started < self.max_simultaneous_threads:
-            thread, parent_id = self.pending_threads.pop(0)
-            thread.finished.connect(self.update_queue)
-            threadlist = self.started_threads.get(parent_id, [])
-            self.started_threads[parent_id] = threadlist+[thread]
-            logger.debug("===>starting: %r" % thread)
-            thread.start()
+        """Add task to the thread pool, superseding the previous one."""
+        key = (id(parent), checker)
+        previous_task = self.tasks.get(key)
+        if previous_task is not None:
+            self.cancel_task(previous_task)
+
+        task = AnalysisTask(self, key, checker, end_callback, source_code)
+        self.tasks[key] = task
+        self.started_tasks.add(task)
+        logger.debug("Added task %r to thread pool" % task)
+        self.thread_pool.start(task)
+
+    def cancel_task(self, task):
+        """
+        Cancel a task.
+
+        The task is removed from the thread pool if it didn't start yet,
+        and its results are discarded otherwise.
+        """
+        task.cancelled = True
+        if self.thread_pool.tryTake(task):
+            self.started_tasks.discard(task)
+
+    def task_finished(self, task, results):
+        """Call the end callback of a task if it was not cancelled."""
+        self.started_tasks.discard(task)
+        if task.cancelled or self.tasks.get(task.key) is not task:
+            return
+        del self.tasks[task.key]
+        if results is not None:
+            #  The task was executed successfully
+            task.end_callback(results)
+
+
+class PendingLoad(object):
+    """
+    Loading of a file that is deferred until its tab is activated.
+
+    It's shared by the FileInfo's of the file in all editor stacks, so that
+    the file is read only once.
+    """
+
+    def __init__(self, editor):
+        # Editor that registers the file with completion services
+        self.editor = editor
+        # Line to go to once the file is loaded
+        self.line = None
+        # FileInfo's of the file in all editor stacks
+        self.finfos = []
 
 
 class FileInfo(QObject):
@@ -138,8 +163,12 @@ def __init__(self, filename, encoding, editor, new, threadmanager):
 
         self.classes = (filename, None, None)
         self.todo_results = []
+        self.task_finder = TaskFinder()
         self.lastmodified = QFileInfo(filename).lastModified()
 
+        # PendingLoad instance if the file was not read yet
+        self.pending_load = None
+
         self.editor.textChanged.connect(self.text_changed)
         self.editor.sig_bookmarks_changed.connect(self.bookmarks_changed)
         self.editor.sig_show_object_info.connect(self.sig_show_object_info)
@@ -164,14 +193,24 @@ def text_changed(self):
         self.text_changed_at.emit(self.filename,
                                   self.editor.get_position('cursor'))
 
+    def get_cursor_line_number(self):
+        """
+        Return the cursor line number, or the line to go to once the file
+        is loaded if it was not read yet.
+        """
+        if self.pending_load is not None and self.pending_load.line:
+            return self.pending_load.line
+        return self.editor.get_cursor_line_number()
+
     def get_source_code(self):
         """Return associated editor source code."""
         return to_text_string(self.editor.toPlainText())
 
     def run_todo_finder(self):
         """Run TODO finder."""
-        if self.editor.is_python_or_ipython():
-            self.threadmanager.add_thread(find_tasks,
+        if (self.editor.is_python_or_ipython() and
+                'todo_finder' not in self.editor.large_file_features):
+            self.threadmanager.add_thread(self.task_finder.find_tasks,
                                           self.todo_finished,
                                           self.get_source_code(), self)
 
@@ -78,6 +78,40 @@ def get_tooltip(self):
         return _("Cursor position")
 
 
+class LargeFileStatus(StatusBarWidget):
+    """Status bar widget for the features disabled in large files."""
+    ID = "large_file_status"
+
+    FEATURE_NAMES = {
+        'completions': _("Completions and linting"),
+        'folding': _("Code folding"),
+        'highlighting': _("Syntax highlighting"),
+        'indent_guides': _("Indentation guides"),
+        'todo_finder': _("Todo list"),
+    }
+
+    def __init__(self, parent):
+        self._features = []
+        super().__init__(parent)
+        self.set_value(_("Large file"))
+        self.hide()
+
+    def update_large_file(self, features):
+        """Update the features disabled in the current file."""
+        self._features = features
+        self.update_tooltip()
+        self.setVisible(bool(features))
+
+    def get_tooltip(self):
+        """Return localized tool tip for widget."""
+        if not self._features:
+            return _("Large file mode")
+        names = [self.FEATURE_NAMES.get(feature, feature)
+                 for feature in self._features]
+        return _("Large file mode. These features are disabled: {}").format(
+            ', '.join(names))
+
+
 class VCSStatus(StatusBarWidget):
     """Status bar widget for system vcs."""
     ID = "vcs_status"
@@ -17,6 +17,7 @@
 from qtpy.QtGui import QFont, QTextCursor
 
 # Local imports
+from spyder.plugins.editor.utils.occurrences import MAX_OCCURRENCES
 from spyder.plugins.editor.widgets.codeeditor import CodeEditor
 
 
@@ -56,7 +57,8 @@ def test_decorations(codeeditor, qtbot):
     qtbot.wait(3000)
     decorations = editor.decorations._sorted_decorations()
 
-    assert len(decorations) == 2 + text.count('some_variable')
+    assert len(decorations) == 2 + min(text.count('some_variable'),
+                                       MAX_OCCURRENCES)
 
     # Assert that selection 0 is current cell
     assert decorations[0].kind == 'current_cell'
@@ -184,5 +186,91 @@ def test_update_decorations_when_scrolling(qtbot):
         assert _update.call_count == 5
 
 
+def test_occurrences_search(codeeditor, qtbot):
+    """
+    Test that occurrences are searched in a thread and that searches are
+    stopped when the cursor moves.
+    """
+    editor = codeeditor
+    editor.set_text("foo = 1\nbar = foo\n" * 10)
+    editor.occurrence_timer.stop()
+
+    # Start a search and move the cursor before it finishes
+    editor.mark_occurrences()
+    worker, stopped = editor._occurrences_search
+    editor.go_to_line(2)
+    editor.occurrence_timer.stop()
+    assert stopped.is_set()
+    assert editor._occurrences_search is None
+    qtbot.wait(500)
+    assert editor.occurrences == []
+
+    # Let the search finish
+    editor.mark_occurrences()
+    qtbot.waitUntil(lambda: editor._occurrences_search is None)
+    assert [block.blockNumber() for block in editor.occurrences] == [
+        n for n in range(1, 20, 2)]
+    assert len(editor.get_extra_selections('occurrences')) == 10
+
+
+def test_indexed_decorations(codeeditor, qtbot):
+    """
+    Test that only decorations in the visible portion of the editor are
+    painted when they are indexed, even after the text changes.
+    """
+    editor = codeeditor
+    rnd = random.Random(0)
+    editor.set_text("foo = bar + foo\n" * 2000)
+    editor.highlight_found_results('foo')
+    found = editor.get_extra_selections('find')
+    assert len(found) == 4000
+
+    # Found results are cleared when the text changes, so we need to use
+    # another key for them.
+    editor.clear_found_results()
+    editor.set_extra_selections('test', found)
+
+    def check_visible_decorations():
+        editor.decorations._update()
+        first, last = editor.get_buffer_block_numbers()
+        expected = [
+            d for d in found
+            if first <= d.cursor.block().blockNumber() <= last]
+        painted = [d for d in editor.extraSelections()
+                   if d.format.background() ==
+                   found[0].format.background()]
+        assert len(painted) == len(expected)
+        assert ({(d.cursor.selectionStart(), d.cursor.selectionEnd())
+                 for d in painted} ==
+                {(d.cursor.selectionStart(), d.cursor.selectionEnd())
+                 for d in expected})
+
+    check_visible_decorations()
+    tree, __ = editor.decorations._index['test']
+
+    for __ in range(20):
+        editor.go_to_line(rnd.randint(1, editor.blockCount()))
+        check_visible_decorations()
+
+        # Edit the text before, in and after the visible portion
+        for __ in range(5):
+            first, last = editor.get_visible_block_numbers()
+            line = rnd.choice([0, first, (first + last) // 2, last])
+            cursor = editor.textCursor()
+            cursor.setPosition(
+                editor.document().findBlockByNumber(line).position())
+            if rnd.random() < 0.5:
+                cursor.insertText(rnd.choice(['x', '\n\n', 'foo\nbar']))
+            else:
+                cursor.movePosition(QTextCursor.NextCharacter,
+                                    QTextCursor.KeepAnchor,
+                                    rnd.randint(1, 40))
+                cursor.removeSelectedText()
+        check_visible_decorations()
+
+    # Decorations were indexed only once
+    assert editor.decorations._index['test'][0] is tree
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -18,11 +18,15 @@
 import pytest
 from flaky import flaky
 from qtpy.QtCore import Qt
-from qtpy.QtGui import QTextCursor
+from qtpy.QtGui import QFont, QTextCursor
 
 # Local imports
 from spyder.config.base import get_conf_path, running_in_ci
+from spyder.plugins.completion.api import TextDocumentSyncKind
+from spyder.plugins.editor.utils.editor import TextChangesRecorder
 from spyder.plugins.editor.widgets.editor import EditorStack
+from spyder.utils import syntaxhighlighters
+from spyder.utils.encoding import get_text_hash
 from spyder.widgets.findreplace import FindReplace
 from spyder.py3compat import PY2
 
@@ -30,6 +34,11 @@
 HERE = osp.abspath(osp.dirname(__file__))
 
 
+def read_text_file_result(text, enc):
+    """Return what encoding.read_text_file returns for a file with text."""
+    return text, enc, get_text_hash(text), {}
+
+
 # =============================================================================
 # ---- Qt Test Fixtures
 # =============================================================================
@@ -56,7 +65,8 @@ def editor_bot(base_editor_bot, mocker, qtbot):
             'x = 2')  # a newline is added at end
     finfo = editor_stack.new('foo.py', 'utf-8', text)
     finfo.newly_created = False
-    editor_stack.autosave.file_hashes = {'foo.py': hash(text + '\n')}
+    editor_stack.autosave.file_hashes = {
+        'foo.py': get_text_hash(text + '\n')}
     qtbot.addWidget(editor_stack)
     return editor_stack, finfo.editor
 
@@ -673,7 +683,7 @@ def test_autosave_all(editor_bot, mocker):
     assert actual_calls == expected_calls
 
 
-def test_maybe_autosave(editor_bot):
+def test_maybe_autosave(editor_bot, qtbot):
     """
     Test that maybe_autosave() saves text to correct autosave file if contents
     are changed.
@@ -682,6 +692,7 @@ def test_maybe_autosave(editor_bot):
     editor.set_text('spam\n')
     editor_stack.autosave.maybe_autosave(0)
     autosave_filename = os.path.join(get_conf_path('autosave'), 'foo.py')
+    qtbot.waitUntil(lambda: osp.isfile(autosave_filename))
     assert open(autosave_filename).read() == 'spam\n'
     os.remove(autosave_filename)
 
@@ -696,54 +707,58 @@ def test_maybe_autosave_saves_only_if_changed(editor_bot, mocker):
     call #3 should not autosave.
     """
     editor_stack, editor = editor_bot
-    mocker.patch.object(editor_stack, '_write_to_file')
+    mocker.patch.object(editor_stack.autosave.writer, 'write')
     editor_stack.autosave.maybe_autosave(0)  # call #1, should not write
-    assert editor_stack._write_to_file.call_count == 0
+    assert editor_stack.autosave.writer.write.call_count == 0
     editor.set_text('ham\n')
     editor_stack.autosave.maybe_autosave(0)  # call #2, should write
-    assert editor_stack._write_to_file.call_count == 1
+    assert editor_stack.autosave.writer.write.call_count == 1
     editor_stack.autosave.maybe_autosave(0)  # call #3, should not write
-    assert editor_stack._write_to_file.call_count == 1
+    assert editor_stack.autosave.writer.write.call_count == 1
 
 
 def test_maybe_autosave_does_not_save_new_files(editor_bot, mocker):
     """Test that maybe_autosave() does not save newly created files."""
     editor_stack, editor = editor_bot
     editor_stack.data[0].newly_created = True
-    mocker.patch.object(editor_stack, '_write_to_file')
+    mocker.patch.object(editor_stack.autosave.writer, 'write')
     editor_stack.autosave.maybe_autosave(0)
-    editor_stack._write_to_file.assert_not_called()
+    editor_stack.autosave.writer.write.assert_not_called()
 
 
 def test_opening_sets_file_hash(base_editor_bot, mocker):
     """Test that opening a file sets the file hash."""
     editor_stack = base_editor_bot
-    mocker.patch('spyder.plugins.editor.widgets.editor.encoding.read',
-                 return_value=('my text', 42))
+    mocker.patch(
+        'spyder.plugins.editor.widgets.editor.encoding.read_text_file',
+        return_value=read_text_file_result('my text', 42))
     filename = osp.realpath('/mock-filename')
     editor_stack.load(filename)
-    expected = {filename: hash('my text')}
+    expected = {filename: get_text_hash('my text')}
     assert editor_stack.autosave.file_hashes == expected
 
 
 def test_reloading_updates_file_hash(base_editor_bot, mocker):
     """Test that reloading a file updates the file hash."""
     editor_stack = base_editor_bot
-    mocker.patch('spyder.plugins.editor.widgets.editor.encoding.read',
-                 side_effect=[('my text', 42), ('new text', 42)])
+    mocker.patch(
+        'spyder.plugins.editor.widgets.editor.encoding.read_text_file',
+        side_effect=[read_text_file_result('my text', 42),
+                     read_text_file_result('new text', 42)])
     filename = osp.realpath('/mock-filename')
     finfo = editor_stack.load(filename)
     index = editor_stack.data.index(finfo)
     editor_stack.reload(index)
-    expected = {filename: hash('new text')}
+    expected = {filename: get_text_hash('new text')}
     assert editor_stack.autosave.file_hashes == expected
 
 
 def test_closing_removes_file_hash(base_editor_bot, mocker):
     """Test that closing a file removes the file hash."""
     editor_stack = base_editor_bot
-    mocker.patch('spyder.plugins.editor.widgets.editor.encoding.read',
-                 return_value=('my text', 42))
+    mocker.patch(
+        'spyder.plugins.editor.widgets.editor.encoding.read_text_file',
+        return_value=read_text_file_result('my text', 42))
     filename = osp.realpath('/mock-filename')
     finfo = editor_stack.load(filename)
     index = editor_stack.data.index(finfo)
@@ -762,13 +777,14 @@ def test_maybe_autosave_does_not_save_after_open(base_editor_bot, mocker,
     both Python and text files. The latter covers spyder-ide/spyder#8654.
     """
     editor_stack = base_editor_bot
-    mocker.patch('spyder.plugins.editor.widgets.editor.encoding.read',
-                 return_value=('spam\n', 42))
+    mocker.patch(
+        'spyder.plugins.editor.widgets.editor.encoding.read_text_file',
+        return_value=read_text_file_result('spam\n', 42))
     editor_stack.load(filename)
-    mocker.patch.object(editor_stack, '_write_to_file')
+    mocker.patch.object(editor_stack.autosave.writer, 'write')
     qtbot.wait(100)  # Wait for PygmentsSH.makeCharlist() if applicable
     editor_stack.autosave.maybe_autosave(0)
-    editor_stack._write_to_file.assert_not_called()
+    editor_stack.autosave.writer.write.assert_not_called()
 
 
 def test_maybe_autosave_does_not_save_after_reload(base_editor_bot, mocker):
@@ -782,37 +798,40 @@ def test_maybe_autosave_does_not_save_after_reload(base_editor_bot, mocker):
     editor_stack = base_editor_bot
     txt = 'spam\n'
     editor_stack.create_new_editor('ham.py', 'ascii', txt, set_current=True)
-    mocker.patch.object(editor_stack, '_write_to_file')
-    mocker.patch('spyder.plugins.editor.widgets.editor.encoding.read',
-                 return_value=(txt, 'ascii'))
+    mocker.patch.object(editor_stack.autosave.writer, 'write')
+    mocker.patch(
+        'spyder.plugins.editor.widgets.editor.encoding.read_text_file',
+        return_value=read_text_file_result(txt, 'ascii'))
     editor_stack.reload(0)
     editor_stack.autosave.maybe_autosave(0)
-    editor_stack._write_to_file.assert_not_called()
+    editor_stack.autosave.writer.write.assert_not_called()
 
 def test_autosave_updates_name_mapping(editor_bot, mocker, qtbot):
     """Test that maybe_autosave() updates name_mapping."""
     editor_stack, editor = editor_bot
     assert editor_stack.autosave.name_mapping == {}
-    mocker.patch.object(editor_stack, '_write_to_file')
+    mocker.patch.object(editor_stack.autosave.writer, 'write')
     editor.set_text('spam\n')
     editor_stack.autosave.maybe_autosave(0)
     expected = {'foo.py': os.path.join(get_conf_path('autosave'), 'foo.py')}
     assert editor_stack.autosave.name_mapping == expected
 
 
-def test_maybe_autosave_handles_error(editor_bot, mocker):
+def test_maybe_autosave_handles_error(editor_bot, mocker, qtbot):
     """Test that autosave() ignores errors when writing to file."""
     editor_stack, editor = editor_bot
-    mock_write = mocker.patch.object(editor_stack, '_write_to_file')
+    mock_write = mocker.patch(
+        'spyder.plugins.editor.utils.autosave.encoding.write')
     mock_dialog = mocker.patch(
         'spyder.plugins.editor.utils.autosave.AutosaveErrorDialog')
-    try:
-        mock_write.side_effect = PermissionError
-    except NameError:  # Python 2
-        mock_write.side_effect = IOError
+    mock_write.side_effect = PermissionError
     editor.set_text('spam\n')
     editor_stack.autosave.maybe_autosave(0)
-    assert mock_dialog.called
+    qtbot.waitUntil(lambda: mock_dialog.called)
+
+    # The file is autosaved again in the next autosave
+    editor_stack.autosave.maybe_autosave(0)
+    qtbot.waitUntil(lambda: mock_write.call_count == 2)
 
 
 def test_remove_autosave_file(editor_bot, mocker, qtbot):
@@ -828,7 +847,7 @@ def test_remove_autosave_file(editor_bot, mocker, qtbot):
     autosave.maybe_autosave(0)
 
     autosave_filename = os.path.join(get_conf_path('autosave'), 'foo.py')
-    assert os.access(autosave_filename, os.R_OK)
+    qtbot.waitUntil(lambda: os.access(autosave_filename, os.R_OK))
     expected = {'foo.py': autosave_filename}
     assert autosave.name_mapping == expected
 
@@ -903,5 +922,139 @@ def test_ipython_files(base_editor_bot, qtbot):
     assert blocks_with_data == 1
 
 
+def test_full_sync_after_incremental_changes(base_editor_bot, qtbot,
+                                             tmpdir):
+    """
+    Test that the full text sent after incremental changes is not diffed
+    against the text sent before them.
+    """
+    spam_file = tmpdir.join('spam.py')
+    spam_file.write('a = 1\n')
+    editor = base_editor_bot.load(str(spam_file)).editor
+    editor.completions_available = True
+    editor.sync_mode = TextDocumentSyncKind.INCREMENTAL
+    with qtbot.waitSignal(editor.sig_perform_completion_request):
+        editor.document_did_open()
+
+    cursor = editor.textCursor()
+    cursor.movePosition(QTextCursor.End)
+    cursor.insertText('b = 2\n')
+    with qtbot.waitSignal(editor.sig_perform_completion_request) as blocker:
+        editor.document_did_change()
+    assert 'changes' in blocker.args[2]
+
+    # Changes stop being recorded, so the full text is sent
+    TextChangesRecorder.get_recorder(editor.document()).stop()
+    cursor.insertText('c = 3\n')
+    with qtbot.waitSignal(editor.sig_perform_completion_request) as blocker:
+        editor.document_did_change()
+    params = blocker.args[2]
+    assert params['text'] == 'a = 1\nb = 2\nc = 3\n'
+    assert params['diff'] == []
+    assert editor.previous_text == params['text']
+
+
+def test_load_large_file(base_editor_bot, mocker, qtbot, tmpdir):
+    """Test that expensive features are disabled for large files."""
+    editor_stack = base_editor_bot
+    mocker.patch.dict(
+        'spyder.plugins.editor.utils.largefile.LARGE_FILE_THRESHOLDS',
+        {'folding': (100, 10), 'indent_guides': (100, 10),
+         'highlighting': (10 ** 6, 10 ** 5)},
+        clear=True)
+    large_file = tmpdir.join('large.py')
+    large_file.write('x = 1\n' * 20)
+    small_file = tmpdir.join('small.py')
+    small_file.write('x = 1\n')
+    editor_stack.set_code_folding_enabled(True)
+
+    editor = editor_stack.load(str(large_file)).editor
+    with qtbot.waitSignal(editor_stack.sig_refresh_large_file) as blocker:
+        editor_stack.refresh()
+    assert blocker.args == [['folding', 'indent_guides']]
+    assert editor.large_file_features == {'folding', 'indent_guides'}
+    assert not editor.code_folding
+    assert isinstance(editor.highlighter, syntaxhighlighters.PythonSH)
+
+    # The option can't enable a disabled feature
+    editor_stack.set_code_folding_enabled(True)
+    assert not editor.code_folding
+
+    # Small files keep all features
+    editor = editor_stack.load(str(small_file)).editor
+    with qtbot.waitSignal(editor_stack.sig_refresh_large_file) as blocker:
+        editor_stack.refresh()
+    assert blocker.args == [[]]
+    assert editor.code_folding
+
+
+def test_load_lazily(base_editor_bot, mocker, qtbot, tmpdir):
+    """Test that files loaded lazily are read when their tab is activated."""
+    editor_stack = base_editor_bot
+    clone_stack = EditorStack(None, [])
+    clone_stack.set_find_widget(Mock())
+    clone_stack.set_io_actions(Mock(), Mock(), Mock(), Mock())
+    clone_stack.set_default_font(QFont())
+    qtbot.addWidget(clone_stack)
+    mocker.patch.object(editor_stack, 'sig_open_file')
+
+    first_file = tmpdir.join('first.py')
+    first_file.write('a = 1\n')
+    lazy_file = tmpdir.join('lazy.py')
+    lazy_file.write(b'b = 2\r\nc = 3\r\n', mode='wb')
+    editor_stack.load(str(first_file))
+    finfo = editor_stack.load(str(lazy_file), set_current=False, lazy=True)
+    clone_stack.clone_editor_from(finfo, set_current=False)
+    clone_finfo = clone_stack.data[0]
+
+    # Only an empty editor was created
+    assert finfo.editor.toPlainText() == ''
+    assert finfo.pending_load is clone_finfo.pending_load
+    assert editor_stack.sig_open_file.emit.call_count == 1
+    finfo.pending_load.line = 2
+    assert finfo.get_cursor_line_number() == 2
+
+    # The file is read when its tab is activated
+    editor_stack.set_stack_index(1)
+    assert finfo.editor.toPlainText() == 'b = 2\nc = 3\n'
+    assert not finfo.editor.document().isModified()
+    assert finfo.editor.get_cursor_line_number() == 2
+    assert editor_stack.sig_open_file.emit.call_count == 2
+    options = editor_stack.sig_open_file.emit.call_args[0][0]
+    assert options['codeeditor'] is finfo.editor
+
+    # And its editors in other stacks are updated too
+    assert clone_finfo.pending_load is None
+    assert clone_finfo.editor.toPlainText() == 'b = 2\nc = 3\n'
+    assert clone_finfo.editor.get_line_separator() == '\r\n'
+
+
+def test_lazy_files_not_autosaved(base_editor_bot, mocker, qtbot, tmpdir):
+    """
+    Test that the empty editors of files loaded lazily are neither
+    autosaved nor written when saving them.
+    """
+    editor_stack = base_editor_bot
+    mocker.patch.object(editor_stack, 'sig_open_file')
+    editor_stack.autosave.writer = mocker.Mock()
+
+    first_file = tmpdir.join('first.py')
+    first_file.write('a = 1\n')
+    lazy_file = tmpdir.join('lazy.py')
+    lazy_file.write('b = 2\n')
+    editor_stack.load(str(first_file))
+    finfo = editor_stack.load(str(lazy_file), set_current=False, lazy=True)
+
+    editor_stack.autosave.autosave_all()
+    editor_stack.autosave.autosave(finfo)
+    assert editor_stack.autosave.writer.write.call_count == 0
+    assert finfo.pending_load is not None
+
+    # Forcing a save reads the file first
+    editor_stack.save(index=1, force=True)
+    assert finfo.pending_load is None
+    assert lazy_file.read() == 'b = 2\n'
+
+
 if __name__ == "__main__":
     pytest.main(['test_editor.py'])
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+#
+
+"""
+Tests for editorstack_helpers.py
+"""
+
+# Standard library imports
+import threading
+
+# Test library imports
+import pytest
+
+# Local imports
+from spyder.plugins.editor.widgets.editorstack_helpers import ThreadManager
+
+
+@pytest.fixture
+def threadmanager(qtbot):
+    """Set up a ThreadManager with a single thread."""
+    manager = ThreadManager(None, max_simultaneous_threads=1)
+    yield manager
+    manager.close_all_threads()
+
+
+def test_threadmanager_default_size(qtbot, mocker):
+    """Test that the thread pool is sized from the number of CPUs."""
+    mocker.patch('os.cpu_count', return_value=8)
+    assert ThreadManager(None).thread_pool.maxThreadCount() == 8
+    mocker.patch('os.cpu_count', return_value=None)
+    assert ThreadManager(None).thread_pool.maxThreadCount() == 2
+
+
+def test_threadmanager_supersedes_tasks(threadmanager, qtbot):
+    """
+    Test that a task supersedes the previous one with the same parent and
+    checker, whether it's waiting or running.
+    """
+    parent, other_parent = object(), object()
+    results = []
+    release = threading.Event()
+
+    def checker(source_code):
+        release.wait(5)
+        return source_code
+
+    threadmanager.add_thread(checker, results.append, 'running', parent)
+    threadmanager.add_thread(checker, results.append, 'waiting', parent)
+    threadmanager.add_thread(checker, results.append, 'other', other_parent)
+    threadmanager.add_thread(checker, results.append, 'last', parent)
+    release.set()
+    qtbot.waitUntil(lambda: not threadmanager.started_tasks)
+
+    assert sorted(results) == ['last', 'other']
+    assert threadmanager.tasks == {}
+
+
+def test_threadmanager_close_threads(threadmanager, qtbot):
+    """Test that closing the threads of a parent discards their results."""
+    parent, other_parent = object(), object()
+    results = []
+    release = threading.Event()
+
+    def checker(source_code):
+        release.wait(5)
+        return source_code
+
+    threadmanager.add_thread(checker, results.append, 'closed', parent)
+    threadmanager.add_thread(checker, results.append, 'other', other_parent)
+    threadmanager.close_threads(parent)
+    release.set()
+    qtbot.waitUntil(lambda: not threadmanager.started_tasks)
+
+    assert results == ['other']
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -1109,6 +1109,126 @@ def test_kite_textEdit_completions(mock_completions_codeeditor, qtbot):
     code_editor.toggle_code_snippets(True)
 
 
+@pytest.mark.slow
+@pytest.mark.order(1)
+@flaky(max_runs=5)
+def test_completions_session_cache(mock_completions_codeeditor, qtbot):
+    """
+    Test that completions are filtered locally while the same word is typed
+    and only requested again when it changes.
+    """
+    code_editor, mock_response = mock_completions_codeeditor
+    completion = code_editor.completion_widget
+    code_editor.set_text('')
+    code_editor.toggle_code_snippets(False)
+
+    def completion_item(label):
+        return {'kind': CompletionItemKind.TEXT, 'label': label,
+                'insertText': label, 'filterText': label, 'sortText': label,
+                'documentation': '', 'provider': 'Fallback'}
+
+    requests = []
+
+    def response(lang, method, params):
+        if method != CompletionRequestTypes.DOCUMENT_COMPLETION:
+            return None
+        requests.append(params['current_word'])
+        return {'params': [completion_item(label)
+                           for label in ['spam', 'spamalot', 'sparrow']]}
+
+    mock_response.side_effect = response
+
+    with qtbot.waitSignal(completion.sig_show_completions,
+                          timeout=10000) as sig:
+        qtbot.keyClicks(code_editor, 's')
+    assert requests == ['s']
+    assert len(sig.args[0]) == 3
+
+    with qtbot.waitSignal(completion.sig_show_completions,
+                          timeout=10000) as sig:
+        qtbot.keyClicks(code_editor, 'pam')
+    assert requests == ['s']
+    assert [x['label'] for x in sig.args[0]] == ['spam', 'spamalot']
+
+    # A new word starts a new session
+    qtbot.keyPress(code_editor, Qt.Key_Escape)
+    qtbot.keyClicks(code_editor, ' ')
+    with qtbot.waitSignal(completion.sig_show_completions,
+                          timeout=10000) as sig:
+        qtbot.keyClicks(code_editor, 's')
+    assert requests == ['s', 's']
+
+    mock_response.side_effect = None
+    code_editor.completion_widget.hide()
+    code_editor.toggle_code_snippets(True)
+
+
+@pytest.mark.slow
+@pytest.mark.order(1)
+@flaky(max_runs=5)
+def test_partial_completions_dismissed(mock_completions_codeeditor, qtbot):
+    """
+    Test that the rest of the completions of a request aren't shown if the
+    ones of a partial response were dismissed.
+    """
+    code_editor, mock_response = mock_completions_codeeditor
+    completion = code_editor.completion_widget
+    code_editor.set_text('')
+    code_editor.toggle_code_snippets(False)
+
+    def completions(labels, partial=False):
+        items = [{'kind': CompletionItemKind.TEXT, 'label': label,
+                  'insertText': label, 'filterText': label,
+                  'sortText': label, 'documentation': '',
+                  'provider': 'Fallback'} for label in labels]
+        response = {'params': items}
+        if partial:
+            response['partial'] = True
+        return response
+
+    def response(lang, method, params):
+        if method != CompletionRequestTypes.DOCUMENT_COMPLETION:
+            return None
+        return completions(['spam'], partial=True)
+
+    mock_response.side_effect = response
+
+    with qtbot.waitSignal(completion.sig_show_completions, timeout=10000):
+        qtbot.keyClicks(code_editor, 's')
+    assert completion.isVisible()
+
+    # The list is updated while it's shown
+    code_editor.handle_response(CompletionRequestTypes.DOCUMENT_COMPLETION,
+                                completions(['spam', 'sparrow'], True))
+    assert completion.count() == 2
+
+    # But not after it's dismissed
+    qtbot.keyPress(completion, Qt.Key_Escape)
+    assert not completion.isVisible()
+    code_editor.handle_response(CompletionRequestTypes.DOCUMENT_COMPLETION,
+                                completions(['spam', 'sparrow', 'spy']))
+    assert not completion.isVisible()
+    assert code_editor.completion_args is None
+
+    # An empty partial response doesn't prevent showing the final one
+    mock_response.side_effect = lambda lang, method, params: (
+        completions([], partial=True)
+        if method == CompletionRequestTypes.DOCUMENT_COMPLETION else None)
+    code_editor.set_text('')
+    qtbot.keyClicks(code_editor, 's')
+    qtbot.wait(1000)
+    assert not completion.isVisible()
+    with qtbot.waitSignal(completion.sig_show_completions, timeout=10000):
+        code_editor.handle_response(
+            CompletionRequestTypes.DOCUMENT_COMPLETION,
+            completions(['spam']))
+    assert completion.isVisible()
+
+    mock_response.side_effect = None
+    code_editor.completion_widget.hide()
+    code_editor.toggle_code_snippets(True)
+
+
 @pytest.mark.slow
 @pytest.mark.order(1)
 @flaky(max_runs=5)
@@ -19,6 +19,7 @@
 from spyder.plugins.debugger.panels.debuggerpanel import DebuggerPanel
 from spyder.plugins.editor.widgets import editor
 from spyder.plugins.outlineexplorer.main_widget import OutlineExplorerWidget
+from spyder.utils.encoding import get_text_hash
 from spyder.plugins.debugger.utils.breakpointsmanager import BreakpointsManager
 
 
@@ -193,7 +194,7 @@ def test_save(editor_bot, mocker):
         str(id(editor_stack)), 'foo.py', 'foo.py')
     editor_stack.autosave.remove_autosave_file.assert_called_with(
         editor_stack.data[0].filename)
-    expected = {'foo.py': hash('a = 1\nprint(a)\n\nx = 2\n')}
+    expected = {'foo.py': get_text_hash('a = 1\nprint(a)\n\nx = 2\n')}
     assert editor_stack.autosave.file_hashes == expected
 
     editor_stack.file_saved = save_file_saved
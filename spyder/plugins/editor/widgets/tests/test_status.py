@@ -17,6 +17,7 @@
 # Local imports
 from spyder.plugins.editor.widgets.status import (CursorPositionStatus,
                                                   EncodingStatus, EOLStatus,
+                                                  LargeFileStatus,
                                                   ReadWriteStatus, VCSStatus)
 
 
@@ -36,11 +37,27 @@ def test_status_bar(status_bar, qtbot):
     win, statusbar = status_bar
     swidgets = []
     for klass in (ReadWriteStatus, EOLStatus, EncodingStatus,
-                  CursorPositionStatus, VCSStatus):
+                  CursorPositionStatus, VCSStatus, LargeFileStatus):
         swidget = klass(win)
         swidgets.append(swidget)
     assert win
-    assert len(swidgets) == 5
+    assert len(swidgets) == 6
+
+
+def test_large_file_status(status_bar, qtbot):
+    """Test that the large file status is only shown for large files."""
+    win, statusbar = status_bar
+    swidget = LargeFileStatus(win)
+    statusbar.addPermanentWidget(swidget)
+    win.show()
+    assert not swidget.isVisible()
+
+    swidget.update_large_file(['folding', 'indent_guides'])
+    assert swidget.isVisible()
+    assert 'Code folding, Indentation guides' in swidget.toolTip()
+
+    swidget.update_large_file([])
+    assert not swidget.isVisible()
 
 
 if __name__ == "__main__":
@@ -379,3 +379,59 @@ def test_ignore_warnings_with_comments(
     qtbot.wait(2000)
 
     assert editor.get_current_warnings() == expected
+
+
+def test_update_warnings_incrementally(codeeditor):
+    """
+    Test that code analysis results are only set in the blocks whose
+    diagnostics, text or position changed.
+    """
+    editor = codeeditor
+    editor.set_text("a\nb\nc\nd\n")
+
+    def diagnostic(line, name):
+        return {
+            'source': 'pyflakes',
+            'range': {'start': {'line': line, 'character': 0},
+                      'end': {'line': line, 'character': 1}},
+            'message': "undefined name '{}'".format(name),
+            'severity': 1
+        }
+
+    def set_diagnostics(diagnostics):
+        editor._diagnostics = diagnostics
+        editor.set_errors()
+
+    set_diagnostics([diagnostic(0, 'a'), diagnostic(2, 'c')])
+    assert editor.get_current_warnings() == [
+        ["undefined name 'a'", 1], ["undefined name 'c'", 3]]
+    data_c = editor.document().findBlockByNumber(2).userData()
+
+    # Only the changed line is updated
+    set_diagnostics([diagnostic(0, 'a'), diagnostic(2, 'c'),
+                     diagnostic(3, 'd')])
+    assert editor.get_current_warnings() == [
+        ["undefined name 'a'", 1], ["undefined name 'c'", 3],
+        ["undefined name 'd'", 4]]
+    assert editor._code_analysis_blocks[2][0] is data_c
+
+    # Results are moved when blocks move, although diagnostics are the same
+    # for the first lines.
+    cursor = editor.textCursor()
+    cursor.setPosition(0)
+    cursor.insertText("x\n")
+    set_diagnostics([diagnostic(0, 'x'), diagnostic(1, 'a'),
+                     diagnostic(3, 'c'), diagnostic(4, 'd')])
+    assert editor.get_current_warnings() == [
+        ["undefined name 'x'", 1], ["undefined name 'a'", 2],
+        ["undefined name 'c'", 4], ["undefined name 'd'", 5]]
+
+    # Results are removed when ignored in the text
+    cursor = editor.textCursor()
+    cursor.setPosition(editor.document().findBlockByNumber(3).position() + 1)
+    cursor.insertText("  # noqa")
+    set_diagnostics([diagnostic(0, 'x'), diagnostic(1, 'a'),
+                     diagnostic(3, 'c'), diagnostic(4, 'd')])
+    assert editor.get_current_warnings() == [
+        ["undefined name 'x'", 1], ["undefined name 'a'", 2],
+        ["undefined name 'd'", 5]]
@@ -83,6 +83,7 @@ def on_projects_available(self):
         projects = self.get_plugin(Plugins.Projects)
         projects.sig_project_loaded.connect(self.set_project_path)
         projects.sig_project_closed.connect(self.unset_project_path)
+        projects.sig_project_file_changed.connect(self.update_project_index)
 
     @on_plugin_available(plugin=Plugins.MainMenu)
     def on_main_menu_available(self):
@@ -107,6 +108,8 @@ def on_projects_teardon_plugin_teardown(self):
         projects = self.get_plugin(Plugins.Projects)
         projects.sig_project_loaded.disconnect(self.set_project_path)
         projects.sig_project_closed.disconnect(self.unset_project_path)
+        projects.sig_project_file_changed.disconnect(
+            self.update_project_index)
 
     @on_plugin_teardown(plugin=Plugins.MainMenu)
     def on_main_menu_teardown(self):
@@ -121,6 +124,7 @@ def on_close(self, cancelable=False):
         self.get_widget()._update_options()
         if self.get_widget().running:
             self.get_widget()._stop_and_reset_thread(ignore_results=True)
+        self.get_widget().stop_project_index()
         return True
 
     # --- Public API
@@ -171,6 +175,17 @@ def unset_project_path(self):
         """
         self.get_widget().disable_project_search()
 
+    def update_project_index(self, path):
+        """
+        Update the index of the current project after a change in it.
+
+        Parameters
+        ----------
+        path: str
+            Path of the file or directory that changed.
+        """
+        self.get_widget().update_project_index(path)
+
     def find(self):
         """
         Search text in multiple files.
@@ -0,0 +1,419 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+# (see spyder/__init__.py for details)
+
+"""
+Walking and matching functions used by the Find in files search engines.
+
+Notes
+-----
+This module must not import Qt or any other Spyder module that does it
+because its functions are run in worker processes by the parallel search
+engine.
+"""
+
+# Standard library imports
+import functools
+import os
+import os.path as osp
+import re
+import stat
+
+# Local imports
+from spyder.utils.encoding import is_text_file
+
+
+# ---- Constants
+# ----------------------------------------------------------------------------
+PYTHON_EXTENSIONS = ['.py', '.pyw', '.pyx', '.ipy', '.pyi', '.pyt']
+
+USEFUL_EXTENSIONS = [
+    '.ipynb', '.md',  '.c', '.cpp', '.h', '.cxx', '.f', '.f03', '.f90',
+    '.json', '.dat', '.csv', '.tsv', '.txt', '.md', '.rst', '.yml',
+    '.yaml', '.ini', '.bat', '.sh', '.ui'
+]
+
+SKIPPED_EXTENSIONS = ['.svg']
+
+# Files bigger than this (in bytes) are always searched line by line to avoid
+# loading them in memory at once.
+MAX_WHOLE_FILE_SIZE = 64 * 1024 ** 2
+
+
+# ---- Files
+# ----------------------------------------------------------------------------
+def is_searchable_file(filename, text_only=True):
+    """
+    Check if `filename` is a regular file in which to search.
+
+    Parameters
+    ----------
+    filename: str
+        Path of the file.
+    text_only: bool, optional
+        Whether to also check that files with unknown extensions are text
+        files, which requires reading them. Default is True.
+    """
+    ext = osp.splitext(filename)[1]
+
+    # Only search in regular files (i.e. not pipes)
+    st_file_mode = os.stat(filename).st_mode
+    if not stat.S_ISREG(st_file_mode):
+        return False
+
+    # Don't search in plain text files with skipped extensions
+    # (e.g .svg)
+    if ext in SKIPPED_EXTENSIONS:
+        return False
+
+    # It's much faster to check for extension first before
+    # validating if the file is plain text.
+    return (not text_only or
+            ext in PYTHON_EXTENSIONS or
+            ext in USEFUL_EXTENSIONS or
+            is_text_file(filename))
+
+
+def is_path_excluded(path, root_path, exclude):
+    """
+    Check if `path` is excluded from a search in `root_path`.
+
+    This applies the same rules as `iter_files_in_path` to a single file, so
+    it can be used to filter files that were not found by walking the tree.
+
+    Parameters
+    ----------
+    path: str
+        Path of a file inside `root_path`.
+    root_path: str
+        Directory where the search is done.
+    exclude: re.Pattern or None
+        Exclude pattern defined by the user.
+    """
+    dirname = osp.dirname(path)
+    while len(dirname) > len(root_path):
+        if osp.basename(dirname).startswith('.'):
+            return True
+        if exclude and re.search(exclude, dirname + os.sep):
+            return True
+        dirname = osp.dirname(dirname)
+
+    return bool(exclude and re.search(exclude, path))
+
+
+def iter_files_in_path(path, exclude=None, stopped=None, text_only=True):
+    """
+    Walk `path` and yield the files in which to search.
+
+    Parameters
+    ----------
+    path: str
+        Directory to walk.
+    exclude: re.Pattern, optional
+        Exclude pattern defined by the user.
+    stopped: callable, optional
+        Function that returns True if the walk needs to be interrupted.
+    text_only: bool, optional
+        See `is_searchable_file`. Default is True.
+    """
+    for path, dirs, files in os.walk(path):
+        if stopped is not None and stopped():
+            return
+
+        # For directories
+        for d in dirs[:]:
+            if stopped is not None and stopped():
+                return
+
+            dirname = os.path.join(path, d)
+
+            # Only search in regular directories
+            st_dir_mode = os.stat(dirname).st_mode
+            if not stat.S_ISDIR(st_dir_mode):
+                dirs.remove(d)
+
+            if exclude and re.search(exclude, dirname + os.sep):
+                # Exclude patterns defined by the user
+                dirs.remove(d)
+            elif d.startswith('.'):
+                # Exclude all dot dirs.
+                dirs.remove(d)
+
+        # For files
+        for f in files:
+            if stopped is not None and stopped():
+                return
+
+            filename = os.path.join(path, f)
+
+            # Exclude patterns defined by the user
+            if exclude and re.search(exclude, filename):
+                continue
+
+            if is_searchable_file(filename, text_only=text_only):
+                yield filename
+
+
+# ---- Matching
+# ----------------------------------------------------------------------------
+
+@functools.lru_cache(maxsize=8)
+def compile_search_regex(texts, text_re):
+    """
+    Combine `texts` in a single compiled regular expression.
+
+    Each text is wrapped in a named group (`t0`, `t1`, ...) so that the text
+    (and hence the encoding) a match corresponds to can be recovered with
+    `match.lastgroup`. A single regular expression is used as it is, to not
+    interfere with its own flags.
+
+    Plain texts only consume their first byte, with the rest of them in a
+    lookahead, to report overlapping matches as the line by line search does
+    while still letting the regex engine skip ahead to that first byte.
+
+    Parameters
+    ----------
+    texts: tuple
+        Tuple of `(text, encoding)` tuples, as passed to `iter_file_matches`.
+    text_re: bool
+        Whether `texts` are regular expressions.
+
+    Returns
+    -------
+    re.Pattern or None
+        The combined regular expression or None if it's not possible to
+        combine `texts`.
+    """
+    alternatives = []
+    for i, (text, __) in enumerate(texts):
+        if text_re:
+            pattern = getattr(text, 'pattern', text)
+            if len(texts) == 1:
+                alternatives.append(pattern)
+            else:
+                alternatives.append(b'(?P<t%d>%s)' % (i, pattern))
+        else:
+            alternatives.append(
+                b'(?P<t%d>%s(?=%s))' % (i, re.escape(text[:1]),
+                                        re.escape(text[1:]))
+            )
+
+    try:
+        return re.compile(b'|'.join(alternatives), re.MULTILINE)
+    except re.error:
+        return None
+
+
+def can_search_whole_file(texts, text_re):
+    """
+    Check if searching `texts` in a whole file at once gives the same
+    results as searching it line by line.
+
+    That's only guaranteed for plain texts without newlines: regular
+    expressions can behave differently when run over several lines (e.g.
+    `\\s` or `[^x]` match newlines and `\\A` only matches at the start of
+    the file), so they are always searched line by line.
+    """
+    if text_re:
+        return False
+    return (all(b'\n' not in text for text, __ in texts) and
+            compile_search_regex(tuple(texts), text_re) is not None)
+
+
+def iter_file_matches(fname, texts, text_re, case_sensitive, stopped=None,
+                      whole_file=False):
+    """
+    Yield all the matches of `texts` found in file `fname`.
+
+    Parameters
+    ----------
+    fname: str
+        Path of the file to search in.
+    texts: list
+        List of `(text, encoding)` tuples to search for. `text` is a bytes
+        string or a compiled bytes regular expression if `text_re` is True.
+    text_re: bool
+        Whether `texts` are regular expressions.
+    case_sensitive: bool
+        Whether the search is case sensitive. If it's not, `texts` are
+        expected to be lowercase.
+    stopped: callable, optional
+        Function that returns True if the search needs to be interrupted.
+    whole_file: bool, optional
+        Whether to search the whole file at once with `iter_buffer_matches`
+        instead of line by line, when `can_search_whole_file` allows it.
+        Default is False.
+
+    Yields
+    ------
+    tuple
+        `(lineno, start, end, line)` for each match, where `start` and `end`
+        are character positions in the decoded `line`.
+    """
+    if (whole_file and can_search_whole_file(texts, text_re) and
+            os.stat(fname).st_size <= MAX_WHOLE_FILE_SIZE):
+        yield from iter_buffer_matches(fname, texts, text_re, case_sensitive,
+                                       stopped=stopped)
+        return
+
+    with open(fname, 'rb') as f:
+        for lineno, line in enumerate(f):
+            for text, enc in texts:
+                if stopped is not None and stopped():
+                    return
+                line_search = line
+                if not case_sensitive:
+                    line_search = line_search.lower()
+                if text_re:
+                    found = re.search(text, line_search)
+                    if found is not None:
+                        break
+                else:
+                    found = line_search.find(text)
+                    if found > -1:
+                        break
+            try:
+                line_dec = line.decode(enc)
+            except UnicodeDecodeError:
+                line_dec = line
+
+            if not case_sensitive:
+                line = line.lower()
+
+            if text_re:
+                for match in re.finditer(text, line):
+                    if stopped is not None and stopped():
+                        return
+                    bstart, bend = match.start(), match.end()
+                    try:
+                        # Go from binary position to utf8 position
+                        start = len(line[:bstart].decode(enc))
+                        end = start + len(line[bstart:bend].decode(enc))
+                    except UnicodeDecodeError:
+                        start = bstart
+                        end = bend
+                    yield (lineno + 1, start, end, line_dec)
+            else:
+                found = line.find(text)
+                while found > -1:
+                    if stopped is not None and stopped():
+                        return
+                    try:
+                        # Go from binary position to utf8 position
+                        start = len(line[:found].decode(enc))
+                        end = start + len(text.decode(enc))
+                    except UnicodeDecodeError:
+                        start = found
+                        end = found + len(text)
+                    yield (lineno + 1, start, end, line_dec)
+
+                    for text, enc in texts:
+                        found = line.find(text, found + 1)
+                        if found > -1:
+                            break
+
+
+def iter_buffer_matches(fname, texts, text_re, case_sensitive, stopped=None):
+    """
+    Yield all the matches of `texts` found in file `fname`, searching its
+    whole contents at once.
+
+    The file is read in a single buffer and scanned with one compiled regular
+    expression, so the cost of searching a file doesn't depend on its number
+    of lines. Match offsets are mapped back to lines by counting newlines
+    between consecutive matches, which is also done at the C level.
+
+    Matches can't span several lines: they are clipped to the end of the
+    line in which they start.
+
+    See `iter_file_matches` for the meaning of the parameters and yielded
+    values.
+    """
+    regex = compile_search_regex(tuple(texts), text_re)
+    with open(fname, 'rb') as f:
+        data = f.read()
+
+    # As in the line by line search, texts are expected to be lowercase
+    # for case insensitive searches.
+    data_search = data if case_sensitive else data.lower()
+
+    lineno = 0
+    line_start = 0
+    line_end = -1
+    for match in regex.finditer(data_search):
+        if stopped is not None and stopped():
+            return
+
+        group = match.lastgroup
+        if group is None or (text_re and len(texts) == 1):
+            enc = texts[0][1]
+            bstart, bend = match.span()
+        else:
+            text, enc = texts[int(group[1:])]
+            bstart, bend = match.span(group)
+            if not text_re:
+                bend = bstart + len(text)
+
+        if bstart == len(data) and (not data or data.endswith(b'\n')):
+            # Empty match after the last line
+            break
+
+        if bstart > line_end:
+            # Matches are found in order, so we only need to count the
+            # newlines between the previous match and this one.
+            lineno += data.count(b'\n', line_start, bstart)
+            line_start = data.rfind(b'\n', 0, bstart) + 1
+            line_end = data.find(b'\n', bstart)
+            if line_end == -1:
+                line_end = len(data)
+            line = data[line_start:line_end + 1]
+
+        bstart -= line_start
+        bend = min(bend, line_end + 1) - line_start
+
+        try:
+            line_dec = line.decode(enc)
+        except UnicodeDecodeError:
+            line_dec = line
+
+        try:
+            # Go from binary position to utf8 position
+            start = len(line[:bstart].decode(enc))
+            end = start + len(line[bstart:bend].decode(enc))
+        except UnicodeDecodeError:
+            start = bstart
+            end = bend
+
+        yield (lineno + 1, start, end, line_dec)
+
+
+def search_files(fnames, texts, text_re, case_sensitive, whole_file=False):
+    """
+    Search `texts` in a batch of files.
+
+    This is the task run by the worker processes of the parallel search
+    engine. See `iter_file_matches` for the meaning of the parameters.
+
+    Returns
+    -------
+    list
+        A `(fname, matches, error)` tuple per file, in the same order as
+        `fnames`. `matches` is a list of `(abspath, lineno, start, end, line)`
+        tuples and `error` is True if the file couldn't be read.
+    """
+    results = []
+    for fname in fnames:
+        matches = []
+        error = False
+        abspath = osp.abspath(fname)
+        try:
+            for match in iter_file_matches(fname, texts, text_re,
+                                           case_sensitive,
+                                           whole_file=whole_file):
+                matches.append((abspath,) + match)
+        except IOError:
+            error = True
+        results.append((fname, matches, error))
+    return results
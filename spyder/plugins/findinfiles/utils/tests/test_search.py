@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+#
+
+"""Tests for the Find in files matching functions."""
+
+# Standard library imports
+import os.path as osp
+import re
+
+# Third party imports
+import pytest
+
+# Local imports
+from spyder.plugins.findinfiles.utils.search import (
+    can_search_whole_file, compile_search_regex, iter_buffer_matches,
+    iter_file_matches, search_files)
+
+
+DATA_DIR = osp.join(osp.dirname(osp.dirname(osp.dirname(__file__))),
+                    'widgets', 'tests', 'data')
+
+
+@pytest.fixture
+def text_file(tmp_path):
+    fname = tmp_path / 'spam.txt'
+    fname.write_text('spam ham spam\neggs\nñandú spam\n', encoding='utf-8')
+    return str(fname)
+
+
+@pytest.mark.parametrize('text_re', [True, False])
+def test_iter_file_matches(text_file, text_re):
+    """Test that matches are reported with their line and columns."""
+    text = re.compile(b'spam') if text_re else b'spam'
+    matches = list(iter_file_matches(text_file, [(text, 'utf-8')], text_re,
+                                     case_sensitive=True))
+    assert [m[:3] for m in matches] == [(1, 0, 4), (1, 9, 13), (3, 6, 10)]
+    assert matches[-1][3] == 'ñandú spam\n'
+
+
+def test_iter_file_matches_stopped(text_file):
+    """Test that no matches are reported after the search is stopped."""
+    matches = list(iter_file_matches(text_file, [(b'spam', 'utf-8')], False,
+                                     True, stopped=lambda: True))
+    assert matches == []
+
+
+def test_search_files(text_file, tmp_path):
+    """Test that results are returned in the same order as files."""
+    other_file = tmp_path / 'ham.txt'
+    other_file.write_text('no match\n')
+    missing_file = str(tmp_path / 'missing.txt')
+    fnames = [str(other_file), text_file, missing_file]
+
+    results = search_files(fnames, [(b'spam', 'utf-8')], False, True)
+
+    assert [r[0] for r in results] == fnames
+    assert results[0][1:] == ([], False)
+    assert len(results[1][1]) == 3
+    assert results[1][1][0][0] == osp.abspath(text_file)
+    assert results[2][1:] == ([], True)
+
+
+@pytest.mark.parametrize('fname', ['spam.txt', 'spam.py', 'spam.cpp',
+                                   'ham.txt'])
+@pytest.mark.parametrize('text_re', [True, False])
+@pytest.mark.parametrize('case_sensitive', [True, False])
+def test_whole_file_matches_line_matches(fname, text_re, case_sensitive):
+    """
+    Test that searching the whole file at once gives the same results as
+    searching it line by line.
+    """
+    fname = osp.join(DATA_DIR, fname)
+    text = b'spam' if case_sensitive else b'ham'
+    if text_re:
+        text = re.compile(text)
+    texts = [(text, 'utf-8')]
+
+    line_matches = list(iter_file_matches(fname, texts, text_re,
+                                          case_sensitive))
+    buffer_matches = list(iter_buffer_matches(fname, texts, text_re,
+                                              case_sensitive))
+    assert buffer_matches == line_matches
+
+
+def test_whole_file_overlapping_matches(tmp_path):
+    """Test that overlapping matches of plain texts are reported."""
+    fname = tmp_path / 'spam.txt'
+    fname.write_bytes(b'aaa\r\nbaa')
+    matches = list(iter_buffer_matches(str(fname), [(b'aa', 'utf-8')],
+                                       False, True))
+    assert matches == [(1, 0, 2, 'aaa\r\n'), (1, 1, 3, 'aaa\r\n'),
+                       (2, 1, 3, 'baa')]
+
+
+@pytest.mark.parametrize('content', [b'', b'spam', b'spam\n\neggs\n'])
+def test_whole_file_empty_matches(tmp_path, content):
+    """Test that empty matches are reported once per line."""
+    fname = tmp_path / 'spam.txt'
+    fname.write_bytes(content)
+    texts = [(re.compile(b'^'), 'utf-8')]
+    assert (list(iter_buffer_matches(str(fname), texts, True, True)) ==
+            list(iter_file_matches(str(fname), texts, True, True)))
+
+
+def test_whole_file_matches_clipped_to_line(tmp_path):
+    """Test that matches spanning several lines are clipped."""
+    fname = tmp_path / 'spam.txt'
+    fname.write_bytes(b'spam  \n  eggs\n')
+    matches = list(iter_buffer_matches(str(fname),
+                                       [(re.compile(rb'm\s+'), 'utf-8')],
+                                       True, True))
+    assert matches == [(1, 3, 7, 'spam  \n')]
+
+
+@pytest.mark.parametrize('pattern', [rb'o\s*b', rb'[^x]+', rb'\Ab'])
+def test_whole_file_regex_searched_by_line(tmp_path, pattern):
+    """
+    Test that regular expressions are searched line by line even if whole
+    file searches are enabled, because they could match differently.
+    """
+    fname = tmp_path / 'spam.txt'
+    fname.write_bytes(b'foo\nbar\nbaz\nfoo\nbar\n')
+    texts = [(re.compile(pattern), 'utf-8')]
+    assert not can_search_whole_file(texts, True)
+    assert (list(iter_file_matches(str(fname), texts, True, True,
+                                   whole_file=True)) ==
+            list(iter_file_matches(str(fname), texts, True, True)))
+
+
+def test_can_search_whole_file():
+    assert can_search_whole_file([(b'spam', 'utf-8')], False)
+    assert not can_search_whole_file([(b'spam\n', 'utf-8')], False)
+    assert not can_search_whole_file([(re.compile(b'spam'), 'utf-8')], True)
+
+
+def test_compile_search_regex():
+    """Test combining several texts with different encodings."""
+    texts = ((re.compile(b'sp(a)m'), 'utf-8'), (re.compile(b'h(?P<x>a)m'),
+                                                'latin-1'))
+    regex = compile_search_regex(texts, True)
+    assert [m.lastgroup for m in regex.finditer(b'ham spam')] == ['t1', 't0']
+
+    # Global flags can only be used at the start of a combined expression
+    texts = ((re.compile(b'(?i)spam'), 'utf-8'), (b'(?i)ham', 'latin-1'))
+    assert compile_search_regex(texts, True) is None
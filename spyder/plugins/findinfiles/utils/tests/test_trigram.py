@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+#
+
+"""Tests for the Find in files trigram index."""
+
+# Standard library imports
+import os
+import os.path as osp
+
+# Third party imports
+import pytest
+
+# Local imports
+from spyder.plugins.findinfiles.utils import trigram
+from spyder.plugins.findinfiles.utils.trigram import get_trigrams, TrigramIndex
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / 'spam.py').write_text('spam = 1\n')
+    (tmp_path / 'ham.txt').write_text('Ham and Spam\n')
+    (tmp_path / 'eggs.txt').write_text('eggs\n')
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / 'bacon.py').write_text('bacon = "spam"\n')
+    (tmp_path / '.hidden').mkdir()
+    (tmp_path / '.hidden' / 'spam.txt').write_text('spam\n')
+    return tmp_path
+
+
+def candidates(index, text):
+    return [osp.relpath(p, index.root_path)
+            for p in index.get_candidates([(text, 'utf-8')], False)]
+
+
+def test_get_trigrams():
+    assert get_trigrams(b'SpAms') == {b'spa', b'pam', b'ams'}
+    assert get_trigrams(b'sp') == set()
+
+
+def test_build_and_query(project):
+    """Test that only files containing all trigrams are candidates."""
+    index = TrigramIndex(str(project))
+    assert index.get_candidates([(b'spam', 'utf-8')], False) is None
+
+    assert index.build()
+    assert candidates(index, b'spam') == [
+        'ham.txt', 'spam.py', osp.join('sub', 'bacon.py')]
+    assert candidates(index, b'eggs') == ['eggs.txt']
+    assert candidates(index, b'sausage') == []
+
+    # The index can't be used in these cases
+    assert index.get_candidates([(b'sp', 'utf-8')], False) is None
+    assert index.get_candidates([(b'spam', 'utf-8')], True) is None
+
+
+def test_build_interrupted(project):
+    index = TrigramIndex(str(project))
+    assert not index.build(stopped=lambda: True)
+    assert not index.ready
+
+
+def test_update_path(project):
+    """Test updating the index after files change."""
+    index = TrigramIndex(str(project))
+    index.build()
+
+    # Dirty files are candidates until they are updated
+    new_file = project / 'sub' / 'sausage.txt'
+    new_file.write_text('sausage\n')
+    assert candidates(index, b'sausage') == []
+    index.mark_dirty(str(new_file))
+    assert candidates(index, b'bacon') == [
+        osp.join('sub', 'bacon.py'), osp.join('sub', 'sausage.txt')]
+    index.update_path(str(new_file))
+    assert candidates(index, b'bacon') == [osp.join('sub', 'bacon.py')]
+    assert candidates(index, b'sausage') == [osp.join('sub', 'sausage.txt')]
+
+    # Modified files
+    (project / 'eggs.txt').write_text('no more\n', encoding='utf-8')
+    os.utime(str(project / 'eggs.txt'), ns=(0, 0))
+    index.update_path(str(project / 'eggs.txt'))
+    assert candidates(index, b'eggs') == []
+    assert candidates(index, b'more') == ['eggs.txt']
+
+    # Removed directories
+    (project / 'sub' / 'bacon.py').unlink()
+    (project / 'sub' / 'sausage.txt').unlink()
+    (project / 'sub').rmdir()
+    index.update_path(str(project / 'sub'))
+    assert candidates(index, b'spam') == ['ham.txt', 'spam.py']
+
+
+def test_big_files_always_candidates(project, monkeypatch):
+    monkeypatch.setattr(trigram, 'MAX_INDEXED_FILE_SIZE', 10)
+    index = TrigramIndex(str(project))
+    index.build()
+    assert candidates(index, b'eggs') == [
+        'eggs.txt', 'ham.txt', osp.join('sub', 'bacon.py')]
+
+
+def test_save_and_load(project, tmp_path_factory):
+    """Test that the index is persisted and compacted."""
+    index_path = str(tmp_path_factory.mktemp('index') / 'index.pkl')
+    index = TrigramIndex(str(project), index_path)
+    index.build()
+    for __ in range(5):
+        os.utime(str(project / 'spam.py'), ns=(0, 0))
+        (project / 'spam.py').write_text('spam = 2\n')
+        index.update_path(str(project / 'spam.py'))
+    index.save()
+
+    loaded = TrigramIndex(str(project), index_path)
+    assert loaded.load()
+    assert len(loaded._paths) == len(loaded._ids) == 4
+    assert loaded.build()
+    assert candidates(loaded, b'spam') == candidates(index, b'spam')
+
+    # Indexes for other directories are not loaded
+    other = TrigramIndex(str(project / 'sub'), index_path)
+    assert not other.load()
@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+# (see spyder/__init__.py for details)
+
+"""
+Trigram index to narrow down the files to search in a project.
+
+The index maps every sequence of three (lowercase) bytes found in a file to
+the files that contain it. A file can only contain a text if it contains all
+of the text's trigrams, so intersecting their posting lists gives a small set
+of candidate files that then need to be verified by the normal search.
+"""
+
+# Standard library imports
+from array import array
+import logging
+import os
+import os.path as osp
+import pickle
+import threading
+
+# Third party imports
+from atomicwrites import atomic_write
+
+# Local imports
+from spyder.plugins.findinfiles.utils.search import (
+    is_searchable_file, iter_files_in_path)
+from spyder.utils.encoding import is_text_file
+
+
+logger = logging.getLogger(__name__)
+
+
+# ---- Constants
+# ----------------------------------------------------------------------------
+# Files bigger than this (in bytes) are not indexed and always considered
+# candidates, to keep the index size reasonable.
+MAX_INDEXED_FILE_SIZE = 4 * 1024 ** 2
+
+
+# ---- Auxiliary functions
+# ----------------------------------------------------------------------------
+def get_trigrams(data):
+    """Get the set of lowercase trigrams in `data` (a bytes string)."""
+    data = data.lower()
+    return set(map(bytes, set(zip(data, data[1:], data[2:]))))
+
+
+# ---- Index
+# ----------------------------------------------------------------------------
+class TrigramIndex:
+    """
+    Trigram index of the files in a directory.
+
+    Notes
+    -----
+    * The index can be updated and queried from different threads.
+    * Files are identified by an integer id in posting lists. Removing or
+      updating a file only invalidates its id, so stale postings can only
+      produce false positives. They are compacted when the index is saved.
+    """
+
+    VERSION = 1
+
+    def __init__(self, root_path, index_path=None):
+        """
+        Parameters
+        ----------
+        root_path: str
+            Directory to index.
+        index_path: str, optional
+            File where the index is saved to and loaded from. If None, the
+            index is kept in memory only.
+        """
+        self.root_path = osp.normpath(root_path)
+        self.index_path = index_path
+        self.ready = False
+
+        self._lock = threading.RLock()
+        self._dirty = set()
+        self._clear()
+
+    # ---- Private API
+    # ------------------------------------------------------------------------
+    def _clear(self):
+        # Relative path of each file id, or None if the id was invalidated
+        self._paths = []
+
+        # Id of each relative path
+        self._ids = {}
+
+        # (mtime, size) of the indexed files, by relative path
+        self._stats = {}
+
+        # Relative paths of files too big to be indexed
+        self._unindexed = set()
+
+        # Ids of the files that contain each trigram
+        self._postings = {}
+
+    def _relpath(self, path):
+        return osp.relpath(osp.normpath(path), self.root_path)
+
+    def _is_hidden(self, relpath):
+        parts = relpath.split(os.sep)
+        return parts[0] == os.pardir or any(p.startswith('.') for p in parts)
+
+    def _remove(self, relpath):
+        file_id = self._ids.pop(relpath, None)
+        if file_id is not None:
+            self._paths[file_id] = None
+        self._stats.pop(relpath, None)
+        self._unindexed.discard(relpath)
+
+    def _remove_tree(self, relpath):
+        prefix = relpath + os.sep
+        for path in [p for p in self._stats if p.startswith(prefix)]:
+            self._remove(path)
+
+    def _index_file(self, path, check_text=False):
+        """Add or update `path` in the index if it changed."""
+        relpath = self._relpath(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            with self._lock:
+                self._remove(relpath)
+            return
+
+        file_stat = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            if self._stats.get(relpath) == file_stat:
+                return
+
+        if check_text and not is_searchable_file(path):
+            with self._lock:
+                self._remove(relpath)
+            return
+
+        if st.st_size > MAX_INDEXED_FILE_SIZE:
+            with self._lock:
+                self._remove(relpath)
+                self._unindexed.add(relpath)
+                self._stats[relpath] = file_stat
+            return
+
+        try:
+            with open(path, 'rb') as f:
+                trigrams = get_trigrams(f.read())
+        except OSError:
+            with self._lock:
+                self._remove(relpath)
+            return
+
+        with self._lock:
+            self._remove(relpath)
+            file_id = len(self._paths)
+            self._paths.append(relpath)
+            self._ids[relpath] = file_id
+            self._stats[relpath] = file_stat
+
+            postings = self._postings
+            for trigram in trigrams:
+                posting = postings.get(trigram)
+                if posting is None:
+                    postings[trigram] = array('I', [file_id])
+                else:
+                    posting.append(file_id)
+
+    def _compact(self):
+        """Remove invalidated ids from posting lists and renumber files."""
+        new_ids = array('I', [0]) * len(self._paths)
+        paths = []
+        for file_id, relpath in enumerate(self._paths):
+            if relpath is not None:
+                new_ids[file_id] = len(paths)
+                paths.append(relpath)
+
+        alive = set(self._ids.values())
+        postings = {}
+        for trigram, posting in self._postings.items():
+            posting = array(
+                'I', map(new_ids.__getitem__, filter(alive.__contains__,
+                                                     posting)))
+            if posting:
+                postings[trigram] = posting
+
+        self._paths = paths
+        self._ids = {relpath: i for i, relpath in enumerate(paths)}
+        self._postings = postings
+
+    # ---- Public API
+    # ------------------------------------------------------------------------
+    def load(self):
+        """
+        Load the index from `index_path`.
+
+        Returns
+        -------
+        bool
+            True if the index was loaded, False otherwise.
+        """
+        if self.index_path is None or not osp.isfile(self.index_path):
+            return False
+
+        try:
+            with open(self.index_path, 'rb') as f:
+                state = pickle.load(f)
+            if (state['version'] != self.VERSION or
+                    state['root_path'] != self.root_path):
+                return False
+        except Exception:
+            logger.debug(f'Could not load index from {self.index_path}',
+                         exc_info=True)
+            return False
+
+        with self._lock:
+            self._paths = state['paths']
+            self._ids = {relpath: i for i, relpath in enumerate(self._paths)
+                         if relpath is not None}
+            self._stats = state['stats']
+            self._unindexed = state['unindexed']
+            self._postings = state['postings']
+
+        return True
+
+    def save(self):
+        """Save the index to `index_path`."""
+        if self.index_path is None:
+            return
+
+        with self._lock:
+            if len(self._paths) > 2 * len(self._ids):
+                self._compact()
+
+            state = dict(
+                version=self.VERSION,
+                root_path=self.root_path,
+                paths=self._paths,
+                stats=self._stats,
+                unindexed=self._unindexed,
+                postings=self._postings,
+            )
+
+            os.makedirs(osp.dirname(self.index_path), exist_ok=True)
+            with atomic_write(self.index_path, mode='wb',
+                              overwrite=True) as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def build(self, stopped=None):
+        """
+        Walk `root_path` and bring the index up to date with it.
+
+        Files whose modification time and size didn't change since they were
+        indexed are not read again, so this is fast after `load`.
+
+        Parameters
+        ----------
+        stopped: callable, optional
+            Function that returns True if the build needs to be interrupted.
+
+        Returns
+        -------
+        bool
+            True if the index is ready to be used, False if the build was
+            interrupted.
+        """
+        seen = set()
+        for path in iter_files_in_path(self.root_path, stopped=stopped,
+                                       text_only=False):
+            relpath = self._relpath(path)
+            seen.add(relpath)
+            with self._lock:
+                known = relpath in self._stats
+            if not known and not is_text_file(path):
+                seen.discard(relpath)
+                continue
+            self._index_file(path)
+
+        if stopped is not None and stopped():
+            return False
+
+        with self._lock:
+            for relpath in set(self._stats) - seen:
+                self._remove(relpath)
+            self.ready = True
+
+        return True
+
+    def mark_dirty(self, path):
+        """
+        Mark `path` as changed until `update_path` is called for it.
+
+        Dirty files and directories are always considered candidates.
+        """
+        with self._lock:
+            self._dirty.add(osp.normpath(path))
+
+    def update_path(self, path):
+        """Update the index for a file or directory that changed."""
+        path = osp.normpath(path)
+        relpath = self._relpath(path)
+
+        if not self._is_hidden(relpath):
+            if osp.isdir(path):
+                for filename in iter_files_in_path(path):
+                    self._index_file(filename)
+            elif osp.isfile(path):
+                self._index_file(path, check_text=True)
+            else:
+                with self._lock:
+                    self._remove(relpath)
+                    self._remove_tree(relpath)
+
+        with self._lock:
+            self._dirty.discard(path)
+
+    def get_candidates(self, texts, text_re):
+        """
+        Get the files that can contain any of `texts`.
+
+        Parameters
+        ----------
+        texts: list
+            List of `(text, encoding)` tuples, as passed to the search
+            functions.
+        text_re: bool
+            Whether `texts` are regular expressions.
+
+        Returns
+        -------
+        list or None
+            Sorted list of absolute paths or None if the index can't be used
+            for this search. That's the case if it isn't ready, for regular
+            expressions and for texts shorter than three bytes.
+        """
+        if not self.ready or text_re:
+            return None
+
+        texts_trigrams = []
+        for text, __ in texts:
+            if len(text) < 3:
+                return None
+            texts_trigrams.append(get_trigrams(text))
+
+        with self._lock:
+            file_ids = set()
+            for trigrams in texts_trigrams:
+                postings = sorted(
+                    [self._postings.get(t, ()) for t in trigrams], key=len)
+                found = set(postings[0])
+                for posting in postings[1:]:
+                    if not found:
+                        break
+                    found.intersection_update(posting)
+                file_ids.update(found)
+
+            relpaths = {self._paths[i] for i in file_ids}
+            relpaths.discard(None)
+            relpaths.update(self._unindexed)
+            candidates = {osp.join(self.root_path, p) for p in relpaths}
+            dirty = list(self._dirty)
+
+        for path in dirty:
+            if self._is_hidden(self._relpath(path)):
+                continue
+            if osp.isdir(path):
+                candidates.update(iter_files_in_path(path))
+            elif osp.isfile(path) and is_searchable_file(path):
+                candidates.add(path)
+
+        return sorted(candidates)
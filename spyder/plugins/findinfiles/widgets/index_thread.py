@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © Spyder Project Contributors
+# Licensed under the terms of the MIT License
+# (see spyder/__init__.py for details)
+
+"""Project index thread."""
+
+# Standard library imports
+import hashlib
+import logging
+import os.path as osp
+import time
+import traceback
+
+# Third party imports
+from qtpy.QtCore import QMutex, QMutexLocker, QThread
+
+# Local imports
+from spyder.config.base import get_conf_path
+from spyder.plugins.findinfiles.utils.trigram import TrigramIndex
+
+
+logger = logging.getLogger(__name__)
+
+
+# ---- Constants
+# ----------------------------------------------------------------------------
+# Minimum time (in seconds) between saves of an index after updating it.
+# Updates that weren't saved yet are saved when the thread is stopped.
+INDEX_SAVE_INTERVAL = 60
+
+
+# ---- Auxiliary functions
+# ----------------------------------------------------------------------------
+def get_index_path(root_path):
+    """Get the file where the index of `root_path` is saved."""
+    name = hashlib.md5(osp.normpath(root_path).encode('utf-8')).hexdigest()
+    return get_conf_path(osp.join('findinfiles', 'index', name + '.pkl'))
+
+
+# ---- Thread
+# ----------------------------------------------------------------------------
+class IndexThread(QThread):
+    """
+    Thread to build the trigram index of a project and keep it up to date.
+
+    The first time it runs, the index is loaded from disk, refreshed
+    against the project's files and saved. After that, each run only
+    processes the paths added with `add_path` since the previous one, and
+    the index is saved at most every `INDEX_SAVE_INTERVAL` seconds and when
+    the thread is stopped.
+    """
+
+    def __init__(self, parent, root_path):
+        super().__init__(parent)
+        self.index = TrigramIndex(root_path, get_index_path(root_path))
+        self.mutex = QMutex()
+        self.stopped = False
+        self.pending = []
+        self.unsaved = False
+        self._last_save = 0
+
+    def run(self):
+        try:
+            if not self.index.ready:
+                if self.is_stopped():
+                    return
+                self.index.load()
+                logger.debug(f'Building index for {self.index.root_path}')
+                if not self.index.build(stopped=self.is_stopped):
+                    return
+                self._save()
+
+            while True:
+                with QMutexLocker(self.mutex):
+                    if self.stopped or not self.pending:
+                        break
+                    paths, self.pending = self.pending, []
+
+                for path in paths:
+                    self.index.update_path(path)
+                self.unsaved = True
+
+            if self.unsaved and (
+                    self.is_stopped() or
+                    time.monotonic() - self._last_save >= INDEX_SAVE_INTERVAL):
+                self._save()
+        except Exception:
+            # Important note: we have to handle unexpected exceptions by
+            # ourselves because they won't be catched by the main thread
+            # (known QThread limitation/bug)
+            traceback.print_exc()
+
+    def _save(self):
+        self.index.save()
+        self.unsaved = False
+        self._last_save = time.monotonic()
+
+    def stop(self):
+        with QMutexLocker(self.mutex):
+            self.stopped = True
+
+    def is_stopped(self):
+        """Check if the thread was requested to stop."""
+        with QMutexLocker(self.mutex):
+            return self.stopped
+
+    def has_pending_paths(self):
+        """Check if there are paths waiting to be processed."""
+        with QMutexLocker(self.mutex):
+            return bool(self.pending)
+
+    def add_path(self, path):
+        """
+        Add a file or directory that changed to be processed in the next run.
+        """
+        self.index.mark_dirty(path)
+        with QMutexLocker(self.mutex):
+            if path not in self.pending:
+                self.pending.append(path)
@@ -6,11 +6,13 @@
 
 # Standard library imports
 import fnmatch
+import functools
+import os
 import os.path as osp
 import re
 
 # Third party imports
-from qtpy.QtCore import Signal
+from qtpy.QtCore import QTimer, Signal
 from qtpy.QtWidgets import QHBoxLayout, QInputDialog, QLabel
 
 # Local imports
@@ -21,6 +23,7 @@
     ON, ResultsBrowser)
 from spyder.plugins.findinfiles.widgets.combobox import (
     MAX_PATH_HISTORY, SearchInComboBox)
+from spyder.plugins.findinfiles.widgets.index_thread import IndexThread
 from spyder.plugins.findinfiles.widgets.search_thread import SearchThread
 from spyder.utils.misc import regexp_error_msg
 from spyder.utils.palette import QStylePalette, SpyderPalette
@@ -35,6 +38,10 @@
 # -----------------------------------------------------------------------------
 MAIN_TEXT_COLOR = QStylePalette.COLOR_TEXT_1
 
+# Time to wait (in ms) after a project file changes before updating its
+# index, so that changes done at the same time are processed together.
+INDEX_UPDATE_DELAY = 1000
+
 
 # ---- Enums
 # -----------------------------------------------------------------------------
@@ -48,6 +55,8 @@ class FindInFilesWidgetActions:
     ToggleExcludeCase = 'toggle_exclude_case_action'
     ToggleExcludeRegex = 'togle_use_regex_on_exlude_action'
     ToggleMoreOptions = 'toggle_more_options_action'
+    ToggleParallelSearch = 'toggle_parallel_search_action'
+    ToggleProjectIndex = 'toggle_project_index_action'
     ToggleSearchRegex = 'toggle_use_regex_on_search_action'
 
 
@@ -128,6 +137,8 @@ def __init__(self, name=None, plugin=None, parent=None):
         self.text_color = self.get_conf('text_color')
         self.supported_encodings = self.get_conf('supported_encodings')
         self.search_thread = None
+        self.index_thread = None
+        self._stopped_index_threads = set()
         self.running = False
         self.more_options_action = None
         self.extras_toolbar = None
@@ -189,6 +200,11 @@ def __init__(self, name=None, plugin=None, parent=None):
         self.path_selection_combo.set_current_searchpath_index(
             search_in_index)
 
+        self._index_timer = QTimer(self)
+        self._index_timer.setSingleShot(True)
+        self._index_timer.setInterval(INDEX_UPDATE_DELAY)
+        self._index_timer.timeout.connect(self._start_index_thread)
+
         # Layout
         layout = QHBoxLayout()
         layout.addWidget(self.result_browser)
@@ -275,6 +291,23 @@ def setup(self):
             tip=_('Set maximum number of results'),
             triggered=lambda x=None: self.set_max_results(),
         )
+        self.parallel_search_action = self.create_action(
+            FindInFilesWidgetActions.ToggleParallelSearch,
+            text=_('Search using multiple processes'),
+            tip=_('Search files in parallel using multiple processes'),
+            toggled=True,
+            initial=self.get_conf('parallel_search'),
+            option='parallel_search'
+        )
+        self.project_index_action = self.create_action(
+            FindInFilesWidgetActions.ToggleProjectIndex,
+            text=_('Index project files'),
+            tip=_('Keep an index of the project files to speed up searches '
+                  'in them'),
+            toggled=True,
+            initial=self.get_conf('use_project_index'),
+            option='use_project_index'
+        )
 
         # Toolbar
         toolbar = self.get_main_toolbar()
@@ -312,10 +345,13 @@ def setup(self):
             )
 
         menu = self.get_options_menu()
-        self.add_item_to_menu(
-            self.set_max_results_action,
-            menu=menu,
-        )
+        for item in [self.set_max_results_action,
+                     self.parallel_search_action,
+                     self.project_index_action]:
+            self.add_item_to_menu(
+                item,
+                menu=menu,
+            )
 
     def update_actions(self):
         self.find_action.setIcon(self.create_icon(
@@ -348,6 +384,10 @@ def on_more_options_update(self, value):
     def on_max_results_update(self, value):
         self.result_browser.set_max_results(value)
 
+    @on_conf_change(option='use_project_index')
+    def on_use_project_index_update(self, value):
+        self._setup_project_index(self.project_path if value else None)
+
     # --- Private API
     # ------------------------------------------------------------------------
     def _update_size(self, size, old_size):
@@ -421,6 +461,66 @@ def _get_options(self):
 
         return (path, file_search, exclude, texts, text_re, case_sensitive)
 
+    def _get_num_workers(self):
+        """Get the number of processes to use for searching."""
+        if self.get_conf('parallel_search'):
+            return os.cpu_count() or 1
+        return 1
+
+    def _setup_project_index(self, path):
+        """Start indexing the project in `path` or stop if it's None."""
+        self._stop_index_thread()
+        if path is None or not self.get_conf('use_project_index'):
+            return
+
+        self.index_thread = IndexThread(None, path)
+        self.index_thread.finished.connect(self._handle_index_finished)
+        self._start_index_thread()
+
+    def _start_index_thread(self):
+        if self.index_thread is not None and not self.index_thread.isRunning():
+            self.index_thread.start()
+
+    def _stop_index_thread(self, wait=False):
+        """
+        Stop the index thread, letting it save the changes of the index that
+        weren't saved yet.
+
+        Unless `wait` is True, this doesn't block until the thread finishes.
+        """
+        self._index_timer.stop()
+        index_thread = self.index_thread
+        if index_thread is None:
+            return
+
+        self.index_thread = None
+        index_thread.finished.disconnect(self._handle_index_finished)
+        index_thread.stop()
+        if not index_thread.isRunning():
+            if not index_thread.unsaved:
+                return
+            index_thread.start()
+
+        if wait:
+            index_thread.wait()
+        else:
+            # Keep a reference to the thread until it finishes
+            self._stopped_index_threads.add(index_thread)
+            index_thread.finished.connect(
+                functools.partial(self._stopped_index_threads.discard,
+                                  index_thread))
+
+    def _handle_index_finished(self):
+        """Process the project changes received while the index was busy."""
+        if self.index_thread is not None:
+            if self.index_thread.has_pending_paths():
+                self._index_timer.start()
+
+    def _get_project_index(self):
+        """Get the project index if it can be used for searching."""
+        if self.index_thread is not None and self.index_thread.index.ready:
+            return self.index_thread.index
+
     def _update_options(self):
         """
         Extract search options from widgets and set the corresponding option.
@@ -445,6 +545,7 @@ def _handle_search_complete(self, completed):
         """
         Current search thread has finished.
         """
+        self.result_browser.flush_results()
         self.result_browser.set_sorting(ON)
         self.result_browser.set_width()
         self.result_browser.expandAll()
@@ -515,10 +616,34 @@ def set_project_path(self, path):
             Project path string.
         """
         self.path_selection_combo.set_project_path(path)
+        self._setup_project_index(path)
 
     def disable_project_search(self):
         """Disable project search path in combobox."""
         self.path_selection_combo.set_project_path(None)
+        self._setup_project_index(None)
+
+    def update_project_index(self, path):
+        """
+        Update the project index after a change in a file or directory.
+
+        Parameters
+        ----------
+        path: str
+            Path of the file or directory that changed.
+        """
+        if self.index_thread is not None:
+            self.index_thread.add_path(path)
+            if not self.index_thread.isRunning():
+                self._index_timer.start()
+
+    def stop_project_index(self):
+        """
+        Stop indexing the current project and wait until its index is saved.
+        """
+        self._stop_index_thread(wait=True)
+        for index_thread in list(self._stopped_index_threads):
+            index_thread.wait()
 
     def set_file_path(self, path):
         """
@@ -583,8 +708,6 @@ def start(self):
 
         # Setup result_browser
         self.result_browser.set_path(options[0])
-        self.result_browser.longest_file_item = ''
-        self.result_browser.longest_line_item = ''
 
         # Start
         self.running = True
@@ -593,7 +716,10 @@ def start(self):
             None,
             search_text,
             self.text_color,
-            self.get_conf('max_results')
+            self.get_conf('max_results'),
+            num_workers=self._get_num_workers(),
+            whole_file=self.get_conf('whole_file_search'),
+            index=self._get_project_index()
         )
         self.search_thread.sig_finished.connect(self._handle_search_complete)
         self.search_thread.sig_file_match.connect(
@@ -7,23 +7,28 @@
 """Results browser."""
 
 # Standard library imports
+from array import array
+import itertools
 import os.path as osp
 
 # Third party imports
-from qtpy.QtCore import QPoint, QSize, Qt, Signal, Slot
+from qtpy import PYQT5
+from qtpy.QtCore import (QAbstractItemModel, QModelIndex, QPoint, QSize, Qt,
+                         QTimer, Signal, Slot)
 from qtpy.QtGui import (QAbstractTextDocumentLayout, QColor, QFontMetrics,
                         QTextDocument)
-from qtpy.QtWidgets import (QApplication, QStyle, QStyledItemDelegate,
-                            QStyleOptionViewItem, QTreeWidgetItem)
+from qtpy.QtWidgets import (QAbstractItemView, QApplication, QHeaderView,
+                            QStyle, QStyledItemDelegate, QStyleOptionViewItem,
+                            QTreeView)
 
 # Local imports
 from spyder.api.translations import get_translation
+from spyder.api.widgets.mixins import SpyderWidgetMixin
 from spyder.config.gui import get_font
 from spyder.plugins.findinfiles.widgets.search_thread import (
-    ELLIPSIS, MAX_RESULT_LENGTH)
+    ELLIPSIS, MAX_NUM_CHAR_FRAGMENT, MAX_RESULT_LENGTH)
 from spyder.utils import icon_manager as ima
-from spyder.utils.palette import QStylePalette
-from spyder.widgets.onecolumntree import OneColumnTree
+from spyder.utils.palette import QStylePalette, SpyderPalette
 
 # Localization
 _ = get_translation('spyder')
@@ -34,84 +39,378 @@
 ON = 'on'
 OFF = 'off'
 
+# Time to wait (in ms) to add new results to the model. Every time results
+# are added, the view needs to lay out all expanded rows again.
+RESULTS_UPDATE_INTERVAL = 250
 
-# ---- Items
+# New file rows are only expanded while a search is running if there are less
+# results than this, to keep laying out the view cheap.
+MAX_EXPANDED_RESULTS = 5000
+
+
+# ---- Formatting
 # ----------------------------------------------------------------------------
-class LineMatchItem(QTreeWidgetItem):
+HTML_ESCAPE_TABLE = {
+    "&": "&amp;",
+    '"': "&quot;",
+    "'": "&apos;",
+    ">": "&gt;",
+    "<": "&lt;",
+}
 
-    def __init__(self, parent, lineno, colno, match, font, text_color):
-        self.lineno = lineno
-        self.colno = colno
-        self.match = match['formatted_text']
-        self.plain_match = match['text']
-        self.text_color = text_color
-        self.font = font
-        super().__init__(parent, [self.__repr__()], QTreeWidgetItem.Type)
 
-    def __repr__(self):
-        match = str(self.match).rstrip()
-        _str = (
-            f"<!-- LineMatchItem -->"
-            f"<p style=\"color:'{self.text_color}';\">"
-            f'&nbsp;&nbsp;'
-            f"<b>{self.lineno}</b> ({self.colno}): "
-            f"<span style='font-family:{self.font.family()};"
-            f"font-size:{self.font.pointSize()}pt;'>{match}</span></p>"
-        )
-        return _str
+def html_escape(text):
+    """Produce entities within text."""
+    return "".join(HTML_ESCAPE_TABLE.get(c, c) for c in text)
 
-    def __unicode__(self):
-        return self.__repr__()
 
-    def __str__(self):
-        return self.__repr__()
+def truncate_result(line, start, end):
+    """
+    Shorten text on line to display the match within `MAX_RESULT_LENGTH`.
 
-    def __lt__(self, x):
-        return self.lineno < x.lineno
+    Returns
+    -------
+    tuple
+        `(left, match, right)` parts of the shortened line.
+    """
+    line = str(line)
+    left, match, right = line[:start], line[start:end], line[end:]
 
-    def __ge__(self, x):
-        return self.lineno >= x.lineno
+    if len(line) > MAX_RESULT_LENGTH:
+        offset = (len(line) - len(match)) // 2
 
+        left = left.split(' ')
+        num_left_words = len(left)
 
-class FileMatchItem(QTreeWidgetItem):
+        if num_left_words == 1:
+            left = left[0]
+            if len(left) > MAX_NUM_CHAR_FRAGMENT:
+                left = ELLIPSIS + left[-offset:]
+            left = [left]
 
-    def __init__(self, parent, path, filename, sorting, text_color):
+        right = right.split(' ')
+        num_right_words = len(right)
 
-        self.sorting = sorting
-        self.filename = osp.basename(filename)
+        if num_right_words == 1:
+            right = right[0]
+            if len(right) > MAX_NUM_CHAR_FRAGMENT:
+                right = right[:offset] + ELLIPSIS
+            right = [right]
 
-        # Get relative dirname according to the path we're searching in.
-        dirname = osp.dirname(filename)
-        rel_dirname = dirname.split(path)[1]
-        if rel_dirname.startswith(osp.sep):
-            rel_dirname = rel_dirname[1:]
+        left = left[-4:]
+        right = right[:4]
+
+        if len(left) < num_left_words:
+            left = [ELLIPSIS] + left
+
+        if len(right) < num_right_words:
+            right = right + [ELLIPSIS]
+
+        left = ' '.join(left)
+        right = ' '.join(right)
+
+        if len(left) > MAX_NUM_CHAR_FRAGMENT:
+            left = ELLIPSIS + left[-30:]
+
+        if len(right) > MAX_NUM_CHAR_FRAGMENT:
+            right = right[:30] + ELLIPSIS
+
+    return left, match, right
+
+
+# ---- Model
+# ----------------------------------------------------------------------------
+class FileMatches:
+    """
+    Matches found in a file.
+
+    Positions are kept in compact integer arrays, next to the text of the
+    lines, which is only shortened and formatted when its row needs to be
+    painted.
+    """
+
+    def __init__(self, filename, rel_dirname, row):
+        self.filename = filename
+        self.basename = osp.basename(filename)
         self.rel_dirname = rel_dirname
+        self.row = row
+        self.linenos = array('l')
+        self.colnos = array('l')
+        self.colends = array('l')
+        self.lines = []
+
+    def __len__(self):
+        return len(self.linenos)
+
+    def append(self, lineno, colno, colend, line):
+        self.linenos.append(lineno)
+        self.colnos.append(colno)
+        self.colends.append(colend)
+        self.lines.append(line)
+
+
+class ResultsModel(QAbstractItemModel):
+    """
+    Two level model of search results: files and the matches found in them.
+
+    Notes
+    -----
+    Only file rows are backed by Python objects. Match rows are identified by
+    their row number and the file they belong to, which is stored as the
+    internal pointer of their indexes.
+    """
+
+    def __init__(self, parent, text_color):
+        super().__init__(parent)
+        self.text_color = text_color
+        self.font = get_font()
+        self.title = ''
+        self.path = None
+        self.sorting = {'status': OFF}
+        self.files = []
+        self.files_by_name = {}
+        self.num_matches = 0
+        self.longest_file_item = ''
+        self.longest_line_item = ''
+        self._icons = {}
+
+    # ---- Qt methods
+    # ------------------------------------------------------------------------
+    def index(self, row, column, parent=QModelIndex()):
+        # This is called for every expanded row when the view is laid out, so
+        # it avoids going through hasIndex and rowCount.
+        if column != 0 or row < 0:
+            return QModelIndex()
+
+        if not parent.isValid():
+            if row < len(self.files):
+                return self.createIndex(row, column)
+            return QModelIndex()
+
+        if parent.internalPointer() is not None:
+            return QModelIndex()
+
+        file_matches = self.files[parent.row()]
+        if row < len(file_matches.linenos):
+            return self.createIndex(row, column, file_matches)
+        return QModelIndex()
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+
+        file_matches = index.internalPointer()
+        if file_matches is None:
+            return QModelIndex()
+
+        return self.createIndex(file_matches.row, 0)
+
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return len(self.files)
+
+        if parent.internalPointer() is None:
+            return len(self.files[parent.row()])
+
+        return 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        file_matches = index.internalPointer()
+        if file_matches is None:
+            file_matches = self.files[index.row()]
+            if role == Qt.DisplayRole:
+                return self._format_file(file_matches)
+            elif role == Qt.DecorationRole:
+                return self._get_icon(file_matches.filename)
+            elif role == Qt.ToolTipRole:
+                return file_matches.filename
+        elif role == Qt.DisplayRole:
+            return self._format_match(file_matches, index.row())
+
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.title
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Sort file rows by file name."""
+        if self.sorting['status'] != ON:
+            return
+
+        self.layoutAboutToBeChanged.emit()
+
+        # Keep track of what persistent indexes (e.g. the current one) point
+        # to, to update them after sorting.
+        old_indexes = self.persistentIndexList()
+        old_items = []
+        for index in old_indexes:
+            file_matches = index.internalPointer()
+            if file_matches is None:
+                old_items.append((self.files[index.row()], None))
+            else:
+                old_items.append((file_matches, index.row()))
+
+        self.files.sort(key=lambda f: f.basename,
+                        reverse=(order == Qt.DescendingOrder))
+        for row, file_matches in enumerate(self.files):
+            file_matches.row = row
 
-        title = (
+        new_indexes = []
+        for file_matches, row in old_items:
+            if row is None:
+                new_indexes.append(self.createIndex(file_matches.row, 0))
+            else:
+                new_indexes.append(self.createIndex(row, 0, file_matches))
+
+        self.changePersistentIndexList(old_indexes, new_indexes)
+        self.layoutChanged.emit()
+
+    # ---- Private API
+    # ------------------------------------------------------------------------
+    def _get_icon(self, filename):
+        ext = osp.splitext(filename)[1]
+        icon = self._icons.get(ext)
+        if icon is None:
+            icon = ima.get_icon_by_extension_or_type(filename, 1.0)
+            self._icons[ext] = icon
+        return icon
+
+    def _format_file(self, file_matches):
+        return (
             f'<!-- FileMatchItem -->'
-            f'<b style="color:{text_color}">{osp.basename(filename)}</b>'
+            f'<b style="color:{self.text_color}">{file_matches.basename}</b>'
             f'&nbsp;&nbsp;&nbsp;'
-            f'<span style="color:{text_color}">'
-            f'<em>{self.rel_dirname}</em>'
+            f'<span style="color:{self.text_color}">'
+            f'<em>{file_matches.rel_dirname}</em>'
             f'</span>'
         )
 
-        super().__init__(parent, [title], QTreeWidgetItem.Type)
+    def _format_match(self, file_matches, row):
+        match = self.format_line(file_matches.lines[row],
+                                 file_matches.colnos[row],
+                                 file_matches.colends[row])
+        return (
+            f"<!-- LineMatchItem -->"
+            f"<p style=\"color:'{self.text_color}';\">"
+            f'&nbsp;&nbsp;'
+            f"<b>{file_matches.linenos[row]}</b> "
+            f"({file_matches.colnos[row]}): "
+            f"<span style='font-family:{self.font.family()};"
+            f"font-size:{self.font.pointSize()}pt;'>{match}</span></p>"
+        )
 
-        self.setIcon(0, ima.get_icon_by_extension_or_type(filename, 1.0))
-        self.setToolTip(0, filename)
+    # ---- Public API
+    # ------------------------------------------------------------------------
+    def format_line(self, line, start, end):
+        """
+        Get the HTML of `line`, shortened around the match from `start` to
+        `end`, which is highlighted.
+        """
+        left, match, right = truncate_result(line, start, end)
+        match_color = SpyderPalette.COLOR_OCCURRENCE_4
+        return (
+            f'<span style="color:{self.text_color}">'
+            f'{html_escape(left)}'
+            f'<span style="background-color:{match_color}">'
+            f'{html_escape(match)}'
+            f'</span>'
+            f'{html_escape(right)}'
+            f'</span>'
+        )
 
-    def __lt__(self, x):
-        if self.sorting['status'] == ON:
-            return self.filename < x.filename
-        else:
-            return False
+    def clear(self):
+        """Remove all results."""
+        self.beginResetModel()
+        self.font = get_font()
+        self.files = []
+        self.files_by_name = {}
+        self.num_matches = 0
+        self.longest_file_item = ''
+        self.longest_line_item = ''
+        self.endResetModel()
 
-    def __ge__(self, x):
-        if self.sorting['status'] == ON:
-            return self.filename >= x.filename
-        else:
-            return False
+    def set_title(self, title):
+        self.title = title
+        self.headerDataChanged.emit(Qt.Horizontal, 0, 0)
+
+    def add_file(self, filename):
+        """Add a row for `filename` and return its index."""
+        # Get relative dirname according to the path we're searching in.
+        dirname = osp.dirname(filename)
+        rel_dirname = dirname.split(self.path)[1]
+        if rel_dirname.startswith(osp.sep):
+            rel_dirname = rel_dirname[1:]
+
+        row = len(self.files)
+        file_matches = FileMatches(filename, rel_dirname, row)
+
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.files.append(file_matches)
+        self.files_by_name[filename] = file_matches
+        self.endInsertRows()
+
+        item_text = osp.join(rel_dirname, file_matches.basename)
+        if len(item_text) > len(self.longest_file_item):
+            self.longest_file_item = item_text
+
+        return self.createIndex(row, 0)
+
+    def add_matches(self, filename, matches):
+        """
+        Add `matches` to the row of `filename`.
+
+        Parameters
+        ----------
+        filename: str
+            Path of the file the matches belong to.
+        matches: list
+            List of `(lineno, colno, line, match_end)` tuples, where `line`
+            is the full text of the line.
+        """
+        file_matches = self.files_by_name[filename]
+        first = len(file_matches)
+        parent = self.createIndex(file_matches.row, 0)
+
+        self.beginInsertRows(parent, first, first + len(matches) - 1)
+        for lineno, colno, line, match_end in matches:
+            file_matches.append(lineno, colno, match_end, line)
+            if len(line) > len(self.longest_line_item):
+                self.longest_line_item = line
+        self.num_matches += len(matches)
+        self.endInsertRows()
+
+    def get_match(self, index):
+        """
+        Get the match at `index`.
+
+        Returns
+        -------
+        tuple or None
+            `(filename, lineno, colno, colend)` or None if `index` doesn't
+            correspond to a match.
+        """
+        file_matches = index.internalPointer() if index.isValid() else None
+        if file_matches is None:
+            return None
+
+        row = index.row()
+        return (file_matches.filename, file_matches.linenos[row],
+                file_matches.colnos[row], file_matches.colends[row])
+
+    def iter_matches(self):
+        """Iterate over all matches, as returned by `get_match`."""
+        for file_matches in self.files:
+            for row in range(len(file_matches)):
+                yield (file_matches.filename, file_matches.linenos[row],
+                       file_matches.colnos[row], file_matches.colends[row])
 
 
 # ---- Browser
@@ -122,6 +421,8 @@ def __init__(self, parent):
         super().__init__(parent)
         self._margin = None
         self._background_color = QColor(QStylePalette.COLOR_BACKGROUND_3)
+        self._row_height = None
+        self._font_key = None
         self.width = 0
 
     def paint(self, painter, option, index):
@@ -170,145 +471,251 @@ def paint(self, painter, option, index):
         painter.restore()
 
     def sizeHint(self, option, index):
-        options = QStyleOptionViewItem(option)
-        self.initStyleOption(options, index)
-        doc = QTextDocument()
-        doc.setHtml(options.text)
-        doc.setTextWidth(options.rect.width())
-        size = QSize(self.width, int(doc.size().height()))
-        return size
+        # All rows have the same height, so we only need to compute it once
+        # per font instead of laying out the text of each row.
+        font_key = option.font.key()
+        if self._row_height is None or self._font_key != font_key:
+            options = QStyleOptionViewItem(option)
+            self.initStyleOption(options, index)
+            doc = QTextDocument()
+            doc.setHtml(options.text)
+            doc.setTextWidth(options.rect.width())
+            self._row_height = int(doc.size().height())
+            self._font_key = font_key
+
+        return QSize(self.width, self._row_height)
+
+
+class ResultsBrowserActions:
+    CollapseAllAction = "collapse_all_action"
+    ExpandAllAction = "expand_all_action"
+
 
+class ResultsBrowser(QTreeView, SpyderWidgetMixin):
+    """
+    View of the search results.
+
+    Results are stored in a `ResultsModel`, so only the rows that are visible
+    need to be created and painted, no matter how many results there are.
+    """
 
-class ResultsBrowser(OneColumnTree):
     sig_edit_goto_requested = Signal(str, int, str, int, int)
     sig_max_results_reached = Signal()
 
     def __init__(self, parent, text_color, max_results=1000):
-        super().__init__(parent)
+        if PYQT5:
+            super().__init__(parent, class_parent=parent)
+        else:
+            QTreeView.__init__(self, parent)
+            SpyderWidgetMixin.__init__(self, class_parent=parent)
+
         self.search_text = None
-        self.results = None
         self.max_results = max_results
-        self.total_matches = None
+        self._title = ''
         self.error_flag = None
         self.completed = None
-        self.sorting = {}
-        self.font = get_font()
-        self.data = None
-        self.files = None
-        self.root_items = None
         self.text_color = text_color
-        self.path = None
-        self.longest_file_item = ''
-        self.longest_line_item = ''
+        self.results_model = ResultsModel(self, text_color)
+
+        # Results waiting to be added to the model
+        self._pending_files = []
+        self._pending_items = []
+        self._update_timer = QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(RESULTS_UPDATE_INTERVAL)
+        self._update_timer.timeout.connect(self.flush_results)
 
         # Setup
+        self.setup()
+        self.setModel(self.results_model)
+        self.setItemsExpandable(True)
         self.set_title('')
         self.set_sorting(OFF)
         self.setSortingEnabled(False)
         self.setItemDelegate(ItemDelegate(self))
         self.setUniformRowHeights(True)  # Needed for performance
         self.sortByColumn(0, Qt.AscendingOrder)
+        self.setHorizontalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.header().setStretchLastSection(False)
 
-        # Only show the actions for collaps/expand all entries in the widget
-        # For further information see spyder-ide/spyder#13178
-        self.common_actions = self.common_actions[:2]
+        # The column width is set from the longest results in set_width.
+        # Resizing it to its contents would require computing the size of
+        # every row.
+        self.header().setSectionResizeMode(0, QHeaderView.Interactive)
+
+        # To use mouseMoveEvent
+        self.setMouseTracking(True)
 
         # Signals
+        self.activated.connect(self.activated_index)
+        self.clicked.connect(self.clicked_index)
         self.header().sectionClicked.connect(self.sort_section)
 
-    def activated(self, item):
+    # ---- SpyderWidgetMixin API
+    # ------------------------------------------------------------------------
+    def setup(self):
+        self.menu = self.create_menu("context_menu")
+
+        # Only show the actions for collaps/expand all entries in the widget
+        # For further information see spyder-ide/spyder#13178
+        collapse_all_action = self.create_action(
+            ResultsBrowserActions.CollapseAllAction,
+            text=_("Collapse all"),
+            icon=ima.icon("collapse"),
+            triggered=self.collapseAll,
+            register_shortcut=False,
+        )
+        expand_all_action = self.create_action(
+            ResultsBrowserActions.ExpandAllAction,
+            text=_("Expand all"),
+            icon=ima.icon("expand"),
+            triggered=self.expandAll,
+            register_shortcut=False,
+        )
+        for item in [collapse_all_action, expand_all_action]:
+            self.add_item_to_menu(item, self.menu)
+
+    def update_actions(self):
+        pass
+
+    # ---- Qt methods
+    # ------------------------------------------------------------------------
+    def contextMenuEvent(self, event):
+        """Override Qt method"""
+        self.menu.popup(event.globalPos())
+
+    def mouseMoveEvent(self, event):
+        """Change cursor shape."""
+        index = self.indexAt(event.pos())
+        if index.isValid():
+            vrect = self.visualRect(index)
+            item_identation = vrect.x() - self.visualRect(self.rootIndex()).x()
+            if event.pos().x() > item_identation:
+                # When hovering over results
+                self.setCursor(Qt.PointingHandCursor)
+            else:
+                # On every other element
+                self.setCursor(Qt.ArrowCursor)
+
+    # ---- Public API
+    # ------------------------------------------------------------------------
+    @property
+    def data(self):
+        """
+        Dictionary with all the results.
+
+        Values are `(filename, lineno, colno, colend)` tuples. This is built
+        on demand, so it should only be used for testing.
+        """
+        return dict(enumerate(self.results_model.iter_matches()))
+
+    @property
+    def files(self):
+        """Dictionary of file names and their indexes in the model."""
+        return {filename: self.results_model.createIndex(file_matches.row, 0)
+                for filename, file_matches
+                in self.results_model.files_by_name.items()}
+
+    def activated_index(self, index):
         """Double-click event."""
-        itemdata = self.data.get(id(self.currentItem()))
+        itemdata = self.results_model.get_match(index)
         if itemdata is not None:
             filename, lineno, colno, colend = itemdata
             self.sig_edit_goto_requested.emit(
                 filename, lineno, self.search_text, colno, colend - colno)
 
+    def set_title(self, title):
+        self.results_model.set_title(title)
+
     def set_sorting(self, flag):
         """Enable result sorting after search is complete."""
-        self.sorting['status'] = flag
+        self.results_model.sorting['status'] = flag
         self.header().setSectionsClickable(flag == ON)
 
     @Slot(int)
     def sort_section(self, idx):
         self.setSortingEnabled(True)
 
-    def clicked(self, item):
+    def clicked_index(self, index):
         """Click event."""
-        if isinstance(item, FileMatchItem):
-            if item.isExpanded():
-                self.collapseItem(item)
+        if self.results_model.get_match(index) is None:
+            if self.isExpanded(index):
+                self.collapse(index)
             else:
-                self.expandItem(item)
+                self.expand(index)
         else:
-            self.activated(item)
+            self.activated_index(index)
 
     def clear_title(self, search_text):
-        self.font = get_font()
-        self.clear()
+        self._update_timer.stop()
+        self._pending_files = []
+        self._pending_items = []
         self.setSortingEnabled(False)
-        self.num_files = 0
-        self.data = {}
-        self.files = {}
+        self.results_model.clear()
         self.set_sorting(OFF)
         self.search_text = search_text
         title = "'%s' - " % search_text
         text = _('String not found')
         self.set_title(title + text)
 
+    def get_num_results(self):
+        """Get the number of results, including those not added yet."""
+        return self.results_model.num_matches + len(self._pending_items)
+
     @Slot(object)
     def append_file_result(self, filename):
         """Real-time update of file items."""
-        if len(self.data) < self.max_results:
-            # Catch any error while creating file items.
-            # Fixes spyder-ide/spyder#17443
-            try:
-                item = FileMatchItem(
-                    self,
-                    self.path,
-                    filename,
-                    self.sorting,
-                    self.text_color
-                )
-            except Exception:
-                return
-
-            self.files[filename] = item
-
-            item.setExpanded(True)
-            self.num_files += 1
-
-            item_text = osp.join(item.rel_dirname, item.filename)
-            if len(item_text) > len(self.longest_file_item):
-                self.longest_file_item = item_text
+        if self.get_num_results() < self.max_results:
+            self._pending_files.append(filename)
+            self._update_timer.start()
 
     @Slot(object, object)
     def append_result(self, items, title):
         """Real-time update of line items."""
-        if len(self.data) >= self.max_results:
+        if self.get_num_results() >= self.max_results:
+            self.flush_results()
             self.set_title(_('Maximum number of results reached! Try '
                              'narrowing the search.'))
             self.sig_max_results_reached.emit()
             return
 
-        available = self.max_results - len(self.data)
+        available = self.max_results - self.get_num_results()
         if available < len(items):
             items = items[:available]
 
-        self.setUpdatesEnabled(False)
-        self.set_title(title)
-        for item in items:
-            filename, lineno, colno, line, match_end = item
-            file_item = self.files.get(filename, None)
-            if file_item:
-                item = LineMatchItem(file_item, lineno, colno, line,
-                                     self.font, self.text_color)
-                self.data[id(item)] = (filename, lineno, colno, match_end)
+        self._title = title
+        self._pending_items.extend(items)
+        if not self._update_timer.isActive():
+            self._update_timer.start()
+
+    def flush_results(self):
+        """Add pending results to the model."""
+        self._update_timer.stop()
+        files, self._pending_files = self._pending_files, []
+        items, self._pending_items = self._pending_items, []
+        model = self.results_model
+        expand = model.num_matches + len(items) < MAX_EXPANDED_RESULTS
+
+        for filename in files:
+            # Catch any error while creating file items.
+            # Fixes spyder-ide/spyder#17443
+            try:
+                index = model.add_file(filename)
+            except Exception:
+                continue
+
+            if expand:
+                self.expand(index)
 
-                if len(item.plain_match) > len(self.longest_line_item):
-                    self.longest_line_item = item.plain_match
+        if items:
+            self.set_title(self._title)
 
-        self.setUpdatesEnabled(True)
+        # Add matches in groups of consecutive items of the same file
+        for filename, file_items in itertools.groupby(items,
+                                                      key=lambda i: i[0]):
+            if filename in model.files_by_name:
+                model.add_matches(filename,
+                                  [item[1:] for item in file_items])
 
     def set_max_results(self, value):
         """Set maximum amount of results to add."""
@@ -316,20 +723,20 @@ def set_max_results(self, value):
 
     def set_path(self, path):
         """Set path where the search is performed."""
-        self.path = path
+        self.results_model.path = path
 
     def set_width(self):
         """Set widget width according to its longest item."""
         # File item width
         file_item_size = self.fontMetrics().size(
             Qt.TextSingleLine,
-            self.longest_file_item
+            self.results_model.longest_file_item
         )
         file_item_width = file_item_size.width()
 
         # Line item width
-        metrics = QFontMetrics(self.font)
-        line_item_chars = len(self.longest_line_item)
+        metrics = QFontMetrics(self.results_model.font)
+        line_item_chars = len(self.results_model.longest_line_item)
         if line_item_chars >= MAX_RESULT_LENGTH:
             line_item_chars = MAX_RESULT_LENGTH + len(ELLIPSIS) + 1
         line_item_width = line_item_chars * metrics.width('W')
@@ -342,3 +749,7 @@ def set_width(self):
 
         # Increase width a bit to not be too near to the edge
         self.itemDelegate().width = width + 10
+
+        # Add space for the indentation and icon of rows
+        self.header().resizeSection(
+            0, width + 10 + 2 * self.indentation() + self.iconSize().width())
@@ -7,10 +7,12 @@
 """Search thread."""
 
 # Standard library imports
-import os
+import collections
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import multiprocessing
 import os.path as osp
 import re
-import stat
 import traceback
 
 # Third party imports
@@ -18,8 +20,9 @@
 
 # Local imports
 from spyder.api.translations import get_translation
-from spyder.utils.encoding import is_text_file
-from spyder.utils.palette import SpyderPalette
+from spyder.plugins.findinfiles.utils.search import (
+    is_path_excluded, iter_file_matches, iter_files_in_path,
+    PYTHON_EXTENSIONS, search_files, SKIPPED_EXTENSIONS, USEFUL_EXTENSIONS)
 
 
 # Localization
@@ -32,20 +35,23 @@
 MAX_RESULT_LENGTH = 80
 MAX_NUM_CHAR_FRAGMENT = 40
 
+# Number of files sent at once to a worker process by the parallel engine
+FILES_PER_TASK = 16
+
+# Maximum number of batches waiting to be processed per worker process
+MAX_PENDING_TASKS = 4
+
+# Seconds to wait for a batch before checking again if the search was stopped
+STOP_POLL_INTERVAL = 0.1
+
 
 # ---- Thread
 # ----------------------------------------------------------------------------
 class SearchThread(QThread):
     """Find in files search thread."""
-    PYTHON_EXTENSIONS = ['.py', '.pyw', '.pyx', '.ipy', '.pyi', '.pyt']
-
-    USEFUL_EXTENSIONS = [
-        '.ipynb', '.md',  '.c', '.cpp', '.h', '.cxx', '.f', '.f03', '.f90',
-        '.json', '.dat', '.csv', '.tsv', '.txt', '.md', '.rst', '.yml',
-        '.yaml', '.ini', '.bat', '.sh', '.ui'
-    ]
-
-    SKIPPED_EXTENSIONS = ['.svg']
+    PYTHON_EXTENSIONS = PYTHON_EXTENSIONS
+    USEFUL_EXTENSIONS = USEFUL_EXTENSIONS
+    SKIPPED_EXTENSIONS = SKIPPED_EXTENSIONS
 
     sig_finished = Signal(bool)
     sig_current_file = Signal(str)
@@ -58,11 +64,15 @@ class SearchThread(QThread):
     power = 0       # 0**1 = 1
     max_power = 9   # 2**9 = 512
 
-    def __init__(self, parent, search_text, text_color, max_results=1000):
+    def __init__(self, parent, search_text, text_color, max_results=1000,
+                 num_workers=1, whole_file=False, index=None):
         super().__init__(parent)
         self.search_text = search_text
         self.text_color = text_color
         self.max_results = max_results
+        self.num_workers = num_workers
+        self.whole_file = whole_file
+        self.index = index
 
         self.mutex = QMutex()
         self.stopped = None
@@ -80,7 +90,7 @@ def __init__(self, parent, search_text, text_color, max_results=1000):
         self.results = {}
 
         self.num_files = 0
-        self.files = []
+        self.files = set()
         self.partial_results = []
         self.total_items = 0
 
@@ -116,70 +126,30 @@ def stop(self):
         with QMutexLocker(self.mutex):
             self.stopped = True
 
+    def is_stopped(self):
+        """Check if the search was requested to stop."""
+        with QMutexLocker(self.mutex):
+            return self.stopped
+
     def find_files_in_path(self, path):
         if self.pathlist is None:
             self.pathlist = []
         self.pathlist.append(path)
-        for path, dirs, files in os.walk(path):
-            with QMutexLocker(self.mutex):
-                if self.stopped:
-                    return False
-            try:
-                # For directories
-                for d in dirs[:]:
-                    with QMutexLocker(self.mutex):
-                        if self.stopped:
-                            return False
-
-                    dirname = os.path.join(path, d)
-
-                    # Only search in regular directories
-                    st_dir_mode = os.stat(dirname).st_mode
-                    if not stat.S_ISDIR(st_dir_mode):
-                        dirs.remove(d)
-
-                    if (self.exclude and
-                            re.search(self.exclude, dirname + os.sep)):
-                        # Exclude patterns defined by the user
-                        dirs.remove(d)
-                    elif d.startswith('.'):
-                        # Exclude all dot dirs.
-                        dirs.remove(d)
-
-                # For files
-                for f in files:
-                    with QMutexLocker(self.mutex):
-                        if self.stopped:
-                            return False
-
-                    filename = os.path.join(path, f)
-                    ext = osp.splitext(filename)[1]
-
-                    # Only search in regular files (i.e. not pipes)
-                    st_file_mode = os.stat(filename).st_mode
-                    if not stat.S_ISREG(st_file_mode):
-                        continue
-
-                    # Exclude patterns defined by the user
-                    if self.exclude and re.search(self.exclude, filename):
-                        continue
-
-                    # Don't search in plain text files with skipped extensions
-                    # (e.g .svg)
-                    if ext in self.SKIPPED_EXTENSIONS:
-                        continue
-
-                    # It's much faster to check for extension first before
-                    # validating if the file is plain text.
-                    if (ext in self.PYTHON_EXTENSIONS or
-                            ext in self.USEFUL_EXTENSIONS or
-                            is_text_file(filename)):
-                        self.find_string_in_file(filename)
-            except re.error:
-                self.error_flag = _("invalid regular expression")
-                return False
-            except FileNotFoundError:
-                return False
+
+        try:
+            if self.num_workers > 1:
+                self.find_string_in_files(self.iter_files_in_path(path))
+            else:
+                for filename in self.iter_files_in_path(path):
+                    self.find_string_in_file(filename)
+        except re.error:
+            self.error_flag = _("invalid regular expression")
+            return False
+        except FileNotFoundError:
+            return False
+
+        if self.is_stopped():
+            return False
 
         # Process any pending results
         if self.partial_results:
@@ -187,93 +157,140 @@ def find_files_in_path(self, path):
 
         return True
 
+    def iter_files_in_path(self, path):
+        """
+        Yield the files in which to search.
+
+        If there's an up to date index for `path`, only the files it reports
+        as candidates are returned. Otherwise `path` is walked.
+        """
+        candidates = None
+        if (self.index is not None and
+                osp.normpath(path) == self.index.root_path):
+            candidates = self.index.get_candidates(self.texts, self.text_re)
+
+        if candidates is None:
+            yield from iter_files_in_path(path, exclude=self.exclude,
+                                          stopped=self.is_stopped)
+            return
+
+        for filename in candidates:
+            if self.is_stopped():
+                return
+            if not is_path_excluded(filename, self.index.root_path,
+                                    self.exclude):
+                yield filename
+
     def find_string_in_file(self, fname):
         self.error_flag = False
         self.sig_current_file.emit(fname)
+        abspath = osp.abspath(fname)
         try:
-            for lineno, line in enumerate(open(fname, 'rb')):
-                for text, enc in self.texts:
-                    with QMutexLocker(self.mutex):
-                        if self.stopped:
-                            return False
-                    line_search = line
-                    if not self.case_sensitive:
-                        line_search = line_search.lower()
-                    if self.text_re:
-                        found = re.search(text, line_search)
-                        if found is not None:
-                            break
-                    else:
-                        found = line_search.find(text)
-                        if found > -1:
-                            break
-                try:
-                    line_dec = line.decode(enc)
-                except UnicodeDecodeError:
-                    line_dec = line
-
-                if not self.case_sensitive:
-                    line = line.lower()
-
-                if self.text_re:
-                    for match in re.finditer(text, line):
-                        with QMutexLocker(self.mutex):
-                            if self.stopped:
-                                return False
-                        self.total_matches += 1
-                        bstart, bend = match.start(), match.end()
-                        try:
-                            # Go from binary position to utf8 position
-                            start = len(line[:bstart].decode(enc))
-                            end = start + len(line[bstart:bend].decode(enc))
-                        except UnicodeDecodeError:
-                            start = bstart
-                            end = bend
-                        self.partial_results.append((osp.abspath(fname),
-                                                     lineno + 1,
-                                                     start,
-                                                     end,
-                                                     line_dec))
-                        if len(self.partial_results) > (2**self.power):
-                            self.process_results()
-                            if self.power < self.max_power:
-                                self.power += 1
-                else:
-                    found = line.find(text)
-                    while found > -1:
-                        with QMutexLocker(self.mutex):
-                            if self.stopped:
-                                return False
-                        self.total_matches += 1
-                        try:
-                            # Go from binary position to utf8 position
-                            start = len(line[:found].decode(enc))
-                            end = start + len(text.decode(enc))
-                        except UnicodeDecodeError:
-                            start = found
-                            end = found + len(text)
-
-                        self.partial_results.append((osp.abspath(fname),
-                                                     lineno + 1,
-                                                     start,
-                                                     end,
-                                                     line_dec))
-                        if len(self.partial_results) > (2**self.power):
-                            self.process_results()
-                            if self.power < self.max_power:
-                                self.power += 1
-
-                        for text, enc in self.texts:
-                            found = line.find(text, found + 1)
-                            if found > -1:
-                                break
-
-        except IOError as xxx_todo_changeme:
-            (_errno, _strerror) = xxx_todo_changeme.args
+            for match in iter_file_matches(fname, self.texts, self.text_re,
+                                           self.case_sensitive,
+                                           stopped=self.is_stopped,
+                                           whole_file=self.whole_file):
+                self.add_result((abspath,) + match)
+        except IOError:
             self.error_flag = _("permission denied errors were encountered")
 
+        if self.is_stopped():
+            return False
+
         self.completed = True
 
+    def find_string_in_files(self, fnames):
+        """
+        Search in `fnames` using a pool of worker processes.
+
+        Files are sent to the workers in batches, while results are collected
+        in submission order so they reach the results browser sorted as if
+        the search was done serially.
+        """
+        executor = ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+        pending = collections.deque()
+
+        try:
+            batch = []
+            for fname in fnames:
+                batch.append(fname)
+                if len(batch) < FILES_PER_TASK:
+                    continue
+
+                pending.append(self._submit_files(executor, batch))
+                batch = []
+
+                # Limit the number of batches waiting to be processed, so
+                # that we don't walk the entire tree before showing results
+                while len(pending) >= self.num_workers * MAX_PENDING_TASKS:
+                    if not self._collect_results(pending.popleft()):
+                        return False
+
+            if batch:
+                pending.append(self._submit_files(executor, batch))
+
+            while pending:
+                if not self._collect_results(pending.popleft()):
+                    return False
+        finally:
+            # Don't wait for batches that are no longer needed
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+        return True
+
+    def _submit_files(self, executor, fnames):
+        return executor.submit(search_files, fnames, self.texts,
+                               self.text_re, self.case_sensitive,
+                               whole_file=self.whole_file)
+
+    def _collect_results(self, future):
+        """
+        Wait for `future` to finish and add its results.
+
+        Return False if the search was stopped in the meantime.
+        """
+        while True:
+            if self.is_stopped():
+                future.cancel()
+                return False
+            try:
+                results = future.result(timeout=STOP_POLL_INTERVAL)
+                break
+            except FutureTimeoutError:
+                pass
+
+        for fname, matches, error in results:
+            if self.is_stopped():
+                return False
+
+            self.sig_current_file.emit(fname)
+            self.error_flag = False
+            for match in matches:
+                self.add_result(match)
+            if error:
+                self.error_flag = _(
+                    "permission denied errors were encountered")
+            self.completed = True
+
+        return True
+
+    def add_result(self, result):
+        """
+        Add a `(filename, lineno, start, end, line)` match to the pending
+        results and process them if the current batch is complete.
+        """
+        self.total_matches += 1
+        self.partial_results.append(result)
+        if len(self.partial_results) > (2**self.power):
+            self.process_results()
+            if self.power < self.max_power:
+                self.power += 1
+
     def process_results(self):
         """
         Process all matches found inside a file.
@@ -293,12 +310,13 @@ def process_results(self):
                 filename, lineno, colno, match_end, line = result
 
                 if filename not in self.files:
-                    self.files.append(filename)
+                    self.files.add(filename)
                     self.sig_file_match.emit(filename)
                     self.num_files += 1
 
-                line = self.truncate_result(line, colno, match_end)
-                item = (filename, lineno, colno, line, match_end)
+                # Lines are only truncated and formatted by the results
+                # browser when they are shown
+                item = (filename, lineno, colno, str(line), match_end)
                 items.append(item)
                 self.total_items += 1
 
@@ -319,79 +337,5 @@ def process_results(self):
         self.partial_results = []
         self.sig_line_match.emit(items, title)
 
-    def truncate_result(self, line, start, end):
-        """
-        Shorten text on line to display the match within `max_line_length`.
-        """
-        html_escape_table = {
-            "&": "&amp;",
-            '"': "&quot;",
-            "'": "&apos;",
-            ">": "&gt;",
-            "<": "&lt;",
-        }
-
-        def html_escape(text):
-            """Produce entities within text."""
-            return "".join(html_escape_table.get(c, c) for c in text)
-
-        line = str(line)
-        left, match, right = line[:start], line[start:end], line[end:]
-
-        if len(line) > MAX_RESULT_LENGTH:
-            offset = (len(line) - len(match)) // 2
-
-            left = left.split(' ')
-            num_left_words = len(left)
-
-            if num_left_words == 1:
-                left = left[0]
-                if len(left) > MAX_NUM_CHAR_FRAGMENT:
-                    left = ELLIPSIS + left[-offset:]
-                left = [left]
-
-            right = right.split(' ')
-            num_right_words = len(right)
-
-            if num_right_words == 1:
-                right = right[0]
-                if len(right) > MAX_NUM_CHAR_FRAGMENT:
-                    right = right[:offset] + ELLIPSIS
-                right = [right]
-
-            left = left[-4:]
-            right = right[:4]
-
-            if len(left) < num_left_words:
-                left = [ELLIPSIS] + left
-
-            if len(right) < num_right_words:
-                right = right + [ELLIPSIS]
-
-            left = ' '.join(left)
-            right = ' '.join(right)
-
-            if len(left) > MAX_NUM_CHAR_FRAGMENT:
-                left = ELLIPSIS + left[-30:]
-
-            if len(right) > MAX_NUM_CHAR_FRAGMENT:
-                right = right[:30] + ELLIPSIS
-
-        match_color = SpyderPalette.COLOR_OCCURRENCE_4
-        trunc_line = dict(
-            text=''.join([left, match, right]),
-            formatted_text=(
-                f'<span style="color:{self.text_color}">'
-                f'{html_escape(left)}'
-                f'<span style="background-color:{match_color}">'
-                f'{html_escape(match)}'
-                f'</span>'
-                f'{html_escape(right)}'
-                f'</span>'
-            )
-        )
-
-        return trunc_line
-
     def get_results(self):
         return self.results, self.pathlist, self.total_matches, self.error_flag
@@ -26,7 +26,8 @@
 from spyder.plugins.findinfiles.widgets.combobox import (
     CWD, CLEAR_LIST, EXTERNAL_PATHS, FILE_PATH, PROJECT, SearchInComboBox,
     SELECT_OTHER)
-from spyder.plugins.findinfiles.widgets.search_thread import SearchThread
+from spyder.plugins.findinfiles.widgets.results_browser import (
+    ON, ResultsModel)
 from spyder.utils.palette import QStylePalette, SpyderPalette
 from spyder.utils.stylesheet import APP_STYLESHEET
 
@@ -152,6 +153,25 @@ def test_find_in_files_search(findinfiles, qtbot):
     assert expected_results() == matches
 
 
+@pytest.mark.parametrize('findinfiles',
+                         [{'parallel_search': True}],
+                         indirect=True)
+def test_find_in_files_parallel_search(findinfiles, qtbot, mocker):
+    """
+    Test that searching with multiple processes gives the same results as
+    the serial search.
+    """
+    mocker.patch.object(os, 'cpu_count', return_value=2)
+    assert findinfiles._get_num_workers() == 2
+    findinfiles.set_search_text("spam")
+    findinfiles.set_directory(osp.join(LOCATION, "data"))
+    findinfiles.find()
+    blocker = qtbot.waitSignal(findinfiles.sig_finished, timeout=30000)
+    blocker.wait()
+    matches = process_search_results(findinfiles.result_browser.data)
+    assert expected_results() == matches
+
+
 @pytest.mark.parametrize('findinfiles',
                          [{'exclude': r"\.py$", 'exclude_regexp': True}],
                          indirect=True)
@@ -256,11 +276,11 @@ def test_truncate_result_with_different_input(findinfiles, qtbot, line_input):
     )
 
     # when
-    thread = SearchThread(None, '', text_color=QStylePalette.COLOR_TEXT_1)
-    truncated_line = thread.truncate_result(line_input, slice_start,
-                                            slice_end)
+    model = ResultsModel(None, text_color=QStylePalette.COLOR_TEXT_1)
+    formatted_line = model.format_line(line_input, slice_start, slice_end)
+
     # then
-    assert truncated_line['formatted_text'] == expected_result
+    assert formatted_line == expected_result
 
 
 @pytest.mark.parametrize('findinfiles',
@@ -547,6 +567,104 @@ def test_set_project_path(findinfiles, qtbot):
     assert path_selection_combo.currentIndex() == CWD
 
 
+@pytest.mark.parametrize('findinfiles',
+                         [{'use_project_index': True}],
+                         indirect=True)
+def test_project_index_search(findinfiles, qtbot, tmp_path):
+    """
+    Test that searches in a project use its index and that the index is
+    updated when files change.
+    """
+    (tmp_path / 'spam.py').write_text('spam = 1\n')
+    (tmp_path / 'ham.txt').write_text('ham\n')
+    findinfiles.set_project_path(str(tmp_path))
+    findinfiles.path_selection_combo.setCurrentIndex(PROJECT)
+
+    index_thread = findinfiles.index_thread
+    qtbot.waitUntil(lambda: findinfiles._get_project_index() is not None)
+    assert index_thread.index.get_candidates([(b'spam', 'utf-8')], False) == [
+        str(tmp_path / 'spam.py')]
+
+    # Search using the index
+    findinfiles.set_search_text('spam')
+    with qtbot.waitSignal(findinfiles.sig_finished):
+        findinfiles.find()
+    assert process_search_results(findinfiles.result_browser.data) == {
+        'spam.py': [(1, 0)]}
+
+    # Changed files are found before and after updating the index
+    (tmp_path / 'ham.txt').write_text('ham = spam\n')
+    findinfiles.update_project_index(str(tmp_path / 'ham.txt'))
+    with qtbot.waitSignal(findinfiles.sig_finished):
+        findinfiles.find()
+    assert process_search_results(findinfiles.result_browser.data) == {
+        'ham.txt': [(1, 6)], 'spam.py': [(1, 0)]}
+
+    qtbot.waitUntil(lambda: not index_thread.isRunning() and
+                    not index_thread.index._dirty)
+    assert len(index_thread.index.get_candidates([(b'spam', 'utf-8')],
+                                                 False)) == 2
+
+    # Updates are not saved right away
+    assert index_thread.unsaved
+
+    # The index is not used after closing the project, and it's saved in
+    # the background
+    findinfiles.disable_project_search()
+    assert findinfiles.index_thread is None
+    qtbot.waitUntil(lambda: not findinfiles._stopped_index_threads)
+    assert not index_thread.unsaved
+
+
+def test_results_browser_model(findinfiles, qtbot):
+    """
+    Test that the results browser can hold many matches and that they are
+    sorted and activated correctly.
+    """
+    browser = findinfiles.result_browser
+    model = browser.results_model
+    browser.set_max_results(100000)
+    browser.set_path(LOCATION)
+    browser.clear_title('spam')
+
+    line = 'spam = 1\n'
+    filenames = [osp.join(LOCATION, name) for name in ['b.py', 'a.py']]
+    for filename in filenames:
+        browser.append_file_result(filename)
+        items = [(filename, lineno, 0, line, 4) for lineno in range(50000)]
+        browser.append_result(items, 'title')
+
+    # Results are added to the model in batches
+    assert model.rowCount() == 0
+    browser.flush_results()
+    assert model.rowCount() == 2
+    assert model.num_matches == 100000
+    assert len(browser.data) == 100000
+
+    # Matches are only formatted when they are requested
+    file_index = browser.files[filenames[0]]
+    index = model.index(10, 0, file_index)
+    assert '<b>10</b>' in model.data(index)
+    assert model.format_line(line, 0, 4) in model.data(index)
+    assert model.data(file_index, Qt.ToolTipRole) == filenames[0]
+
+    # The current index is kept after sorting files
+    browser.setCurrentIndex(index)
+    browser.set_sorting(ON)
+    model.sort(0, Qt.AscendingOrder)
+    assert model.data(model.index(0, 0), Qt.ToolTipRole) == filenames[1]
+    assert model.get_match(browser.currentIndex()) == (
+        filenames[0], 10, 0, 4)
+
+    # The maximum number of results is respected
+    browser.append_result([(filenames[0], 1, 0, line, 4)], 'title')
+    assert model.num_matches == 100000
+
+    with qtbot.waitSignal(browser.sig_edit_goto_requested) as blocker:
+        browser.activated_index(browser.currentIndex())
+    assert blocker.args == [filenames[0], 10, 'spam', 0, 4]
+
+
 @pytest.mark.parametrize('findinfiles',
                          [{'path_history': [
                              LOCATION,
@@ -125,6 +125,18 @@ class Projects(SpyderDockablePlugin):
     This signal is emitted when the Python path has changed.
     """
 
+    sig_project_file_changed = Signal(str)
+    """
+    This signal is emitted when a file or directory is created, modified,
+    deleted or moved inside the current project.
+
+    Parameters
+    ----------
+    path: str
+        Path of the file or directory. For moves, this is emitted for both
+        the source and destination paths.
+    """
+
     def __init__(self, parent=None, configuration=None):
         """Initialization."""
         super().__init__(parent, configuration)
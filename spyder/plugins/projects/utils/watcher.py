@@ -62,6 +62,7 @@ class WorkspaceEventHandler(QObject, FileSystemEventHandler):
     sig_file_created = Signal(str, bool)
     sig_file_deleted = Signal(str, bool)
     sig_file_modified = Signal(str, bool)
+    sig_path_changed = Signal(str)
 
     def __init__(self, parent=None):
         QObject.__init__(self, parent)
@@ -77,6 +78,8 @@ def on_moved(self, event):
         logger.info("Moved {0}: {1} to {2}".format(
             self.fmt_is_dir(is_dir), src_path, dest_path))
         self.sig_file_moved.emit(src_path, dest_path, is_dir)
+        self.sig_path_changed.emit(src_path)
+        self.sig_path_changed.emit(dest_path)
 
     def on_created(self, event):
         src_path = event.src_path
@@ -84,6 +87,7 @@ def on_created(self, event):
         logger.info("Created {0}: {1}".format(
             self.fmt_is_dir(is_dir), src_path))
         self.sig_file_created.emit(src_path, is_dir)
+        self.sig_path_changed.emit(src_path)
 
     def on_deleted(self, event):
         src_path = event.src_path
@@ -91,6 +95,7 @@ def on_deleted(self, event):
         logger.info("Deleted {0}: {1}".format(
             self.fmt_is_dir(is_dir), src_path))
         self.sig_file_deleted.emit(src_path, is_dir)
+        self.sig_path_changed.emit(src_path)
 
     def on_modified(self, event):
         src_path = event.src_path
@@ -98,6 +103,7 @@ def on_modified(self, event):
         logger.info("Modified {0}: {1}".format(
             self.fmt_is_dir(is_dir), src_path))
         self.sig_file_modified.emit(src_path, is_dir)
+        self.sig_path_changed.emit(src_path)
 
 
 class WorkspaceWatcher(QObject):
@@ -118,6 +124,8 @@ def connect_signals(self, project):
         self.event_handler.sig_file_moved.connect(project.file_moved)
         self.event_handler.sig_file_deleted.connect(project.file_deleted)
         self.event_handler.sig_file_modified.connect(project.file_modified)
+        self.event_handler.sig_path_changed.connect(
+            project.sig_project_file_changed)
 
     def start(self, workspace_folder):
         # Needed to handle an error caused by the inotify limit reached.
@@ -13,6 +13,8 @@
 
 # Standard library imports
 from codecs import BOM_UTF8, BOM_UTF16, BOM_UTF32
+import codecs
+import hashlib
 import tempfile
 import locale
 import re
@@ -308,6 +310,137 @@ def read(filename, encoding='utf-8'):
     text, encoding = decode( open(filename, 'rb').read() )
     return text, encoding
 
+
+# Number of bytes at the start of a file used to detect its encoding
+ENCODING_PREFIX_SIZE = 64 * 1024
+
+# Number of bytes read and decoded at a time by read_text_file
+READ_CHUNK_SIZE = 1024 * 1024
+
+# Line boundaries recognized by str.splitlines, apart from \r and \n
+OTHER_LINE_BOUNDARIES_RE = re.compile(
+    '[\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]')
+
+
+def get_text_hash(text):
+    """
+    Return the hash of `text`, as computed by read_text_file.
+
+    This is used to check if the contents of a file changed.
+    """
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'),
+                           digest_size=16).hexdigest()
+
+
+def _get_prefix_codecs(prefix):
+    """
+    Get the codecs to try to decode a file starting with `prefix`.
+
+    Return a list of (codec, encoding) tuples, in the same order as they
+    are tried by decode.
+    """
+    if prefix.startswith(BOM_UTF8):
+        candidates = [('utf-8-sig', 'utf-8-bom')]
+    elif prefix.startswith(BOM_UTF32):
+        # This has to be checked before UTF-16 because the UTF-32 little
+        # endian BOM starts with the UTF-16 one.
+        candidates = [('utf-32', 'utf-32')]
+    elif prefix.startswith(BOM_UTF16):
+        candidates = [('utf-16', 'utf-16')]
+    else:
+        coding = get_coding(prefix)
+        candidates = [(coding, coding)] if coding else []
+    return candidates + [('utf-8', 'utf-8-guessed'),
+                         ('latin-1', 'latin-1-guessed')]
+
+
+def _count_line_boundaries(text, counts):
+    """Add the number of line boundaries of each kind in `text` to counts."""
+    crlf = text.count('\r\n')
+    for eol, number in (('\r\n', crlf),
+                        ('\n', text.count('\n') - crlf),
+                        ('\r', text.count('\r') - crlf)):
+        if number:
+            counts[eol] = counts.get(eol, 0) + number
+    if OTHER_LINE_BOUNDARIES_RE.search(text):
+        for eol in OTHER_LINE_BOUNDARIES_RE.findall(text):
+            counts[eol] = counts.get(eol, 0) + 1
+
+
+def _decode_stream(stream, prefix, codec, chunk_size):
+    """
+    Decode `prefix` and the rest of `stream` with `codec`, in chunks.
+
+    Return the decoded text, its hash and its line boundary counts.
+    """
+    decoder = codecs.getincrementaldecoder(codec)()
+
+    # The UTF-8 encoding of the text is the file contents themselves, so
+    # there's no need to encode it again to compute its hash.
+    hash_bytes = codecs.lookup(codec).name in ('utf-8', 'ascii')
+    text_hash = hashlib.blake2b(digest_size=16)
+
+    pieces = []
+    eol_counts = {}
+    pending_cr = ''
+    chunk = prefix
+    while True:
+        piece = decoder.decode(chunk, final=not chunk)
+        pieces.append(piece)
+        if hash_bytes:
+            text_hash.update(chunk)
+        else:
+            text_hash.update(piece.encode('utf-8', 'surrogatepass'))
+
+        # A \r at the end of a piece could be followed by a \n in the next
+        # one, so it's counted with the next piece.
+        piece = pending_cr + piece
+        pending_cr = ''
+        if chunk and piece.endswith('\r'):
+            piece, pending_cr = piece[:-1], '\r'
+        _count_line_boundaries(piece, eol_counts)
+
+        if not chunk:
+            break
+        chunk = stream.read(chunk_size)
+
+    return ''.join(pieces), text_hash.hexdigest(), eol_counts
+
+
+def read_text_file(filename, chunk_size=READ_CHUNK_SIZE):
+    """
+    Read text from file ('filename') in a single pass.
+
+    The encoding is detected from the first ENCODING_PREFIX_SIZE bytes of
+    the file, as in decode, and the file is decoded in chunks of
+    `chunk_size` bytes. The hash of the text and its line boundaries are
+    computed while decoding it, to avoid going through it again.
+
+    Returns
+    -------
+    text: str
+        Contents of the file.
+    encoding: str
+        Encoding of the file, as returned by decode.
+    text_hash: str
+        Hash of the text, as returned by get_text_hash.
+    eol_counts: dict
+        Number of line boundaries of each kind in the text, as recognized
+        by str.splitlines. The text has mixed end of lines if there's more
+        than one kind.
+    """
+    with open(filename, 'rb') as stream:
+        prefix = stream.read(ENCODING_PREFIX_SIZE)
+        for codec, encoding in _get_prefix_codecs(prefix):
+            try:
+                text, text_hash, eol_counts = _decode_stream(
+                    stream, prefix, codec, chunk_size)
+            except (UnicodeError, LookupError):
+                stream.seek(len(prefix))
+            else:
+                return text, encoding, text_hash, eol_counts
+
+
 def readlines(filename, encoding='utf-8'):
     """
     Read lines from file ('filename')
@@ -89,6 +89,67 @@ def fix_indentation(text, indent_chars):
     return text.replace('\t', indent_chars)
 
 
+def position_to_offset(text, position, offset=0, line=0):
+    """
+    Convert an LSP `position` in `text` to an index.
+
+    `offset` is the index where `line` starts, to not scan `text` from the
+    beginning again for positions after it.
+    """
+    for __ in range(position['line'] - line):
+        offset = text.find('\n', offset) + 1
+        if offset == 0:
+            return len(text)
+
+    line_end = text.find('\n', offset)
+    if line_end == -1:
+        line_end = len(text)
+    line_text = text[offset:line_end].rstrip('\r')
+
+    # Characters are counted in UTF-16 code units
+    character = position['character']
+    if len(line_text.encode('utf-16-le')) != 2 * len(line_text):
+        units = 0
+        for index, char in enumerate(line_text):
+            if units >= character:
+                return offset + index
+            units += 2 if ord(char) > 0xFFFF else 1
+        return offset + len(line_text)
+    return offset + min(character, len(line_text))
+
+
+def apply_text_changes(text, changes):
+    """
+    Apply a list of LSP content change events to `text`.
+
+    Parameters
+    ----------
+    text: str
+        Text before the changes.
+    changes: list
+        List of `TextDocumentContentChangeEvent` dicts, applied in order.
+        Changes without a range replace the whole text.
+
+    Returns
+    -------
+    str
+        Text after the changes.
+    """
+    for change in changes:
+        text_range = change.get('range')
+        if text_range is None:
+            text = change['text']
+            continue
+
+        start_position = text_range['start']
+        start = position_to_offset(text, start_position)
+        line_start = text.rfind('\n', 0, start) + 1
+        end = position_to_offset(text, text_range['end'], offset=line_start,
+                                 line=start_position['line'])
+        text = text[:start] + change['text'] + text[end:]
+    return text
+
+
 def is_builtin(text):
     """Test if passed string is the name of a Python builtin object"""
     from spyder.py3compat import builtins
@@ -14,6 +14,7 @@
 import keyword
 import os
 import re
+import time
 import weakref
 
 # Third party imports
@@ -23,7 +24,7 @@
                             Comment, Generic, Token)
 from qtpy.QtCore import Qt, QTimer, Signal
 from qtpy.QtGui import (QColor, QCursor, QFont, QSyntaxHighlighter,
-                        QTextCharFormat, QTextOption)
+                        QTextCharFormat, QTextCursor, QTextOption)
 from qtpy.QtWidgets import QApplication
 
 # Local imports
@@ -97,6 +98,18 @@
 
 COLOR_SCHEME_NAMES = CONF.get('appearance', 'names')
 
+# Documents with at least this number of blocks are highlighted incrementally:
+# only the blocks that can be processed in HIGHLIGHT_TIME_BUDGET are
+# highlighted right away and the rest are done in chunks when idle.
+INCREMENTAL_MIN_BLOCKS = 2000
+
+# Maximum time (in seconds) spent highlighting blocks before giving control
+# back to the event loop.
+HIGHLIGHT_TIME_BUDGET = 0.03
+
+# Time (in ms) to wait between chunks of pending blocks.
+HIGHLIGHT_CHUNK_INTERVAL = 10
+
 # Mapping for file extensions that use Pygments highlighting but should use
 # different lexers than Pygments' autodetection suggests.  Keys are file
 # extensions or tuples of extensions, values are Pygments lexer names.
@@ -220,6 +233,31 @@ def __init__(self, parent, font=None, color_scheme='Spyder'):
         # List of cells
         self._cell_list = []
 
+        # Incremental highlighting
+        self.incremental = True
+        self._deferred_blocks = None
+        self._pending_range = None
+        self._frontiers = []
+        self._forced_block = None
+        self._last_highlighted = -1
+        self._last_visible = None
+        self._highlight_deadline = None
+
+        self._burst_timer = QTimer(self)
+        self._burst_timer.setSingleShot(True)
+        self._burst_timer.setInterval(0)
+        self._burst_timer.timeout.connect(self._end_highlight_burst)
+
+        self._chunk_timer = QTimer(self)
+        self._chunk_timer.setSingleShot(True)
+        self._chunk_timer.setInterval(HIGHLIGHT_CHUNK_INTERVAL)
+        self._chunk_timer.timeout.connect(self._highlight_pending_chunk)
+
+        if self.document() is not None:
+            # This is connected after QSyntaxHighlighter does it, so it's
+            # called once the changed blocks were highlighted.
+            self.document().contentsChange.connect(self._on_contents_change)
+
     def get_background_color(self):
         return QColor(self.background_color)
 
@@ -322,8 +360,277 @@ def highlightBlock(self, text):
 
         :param text: text to highlight.
         """
+        if self._defer_current_block():
+            return
         self.highlight_block(text)
 
+    # ---- Incremental highlighting
+    def _defer_current_block(self):
+        """
+        Check if highlighting the current block needs to be deferred.
+
+        This is the case when the document is big and the time budget of the
+        current highlighting burst was used. Deferred blocks keep their
+        previous formats and state, and are highlighted later by
+        `_highlight_pending_chunk`.
+        """
+        block = self.currentBlock()
+        number = block.blockNumber()
+
+        if (not self.incremental or
+                self.document().blockCount() < INCREMENTAL_MIN_BLOCKS):
+            self._last_highlighted = number
+            return False
+
+        now = time.perf_counter()
+        if self._highlight_deadline is None:
+            # A new burst of highlighting started (e.g. because text was
+            # set or typed), so it gets a new time budget.
+            self._highlight_deadline = now + HIGHLIGHT_TIME_BUDGET
+            self._burst_timer.start()
+        elif (now > self._highlight_deadline and
+                number != self._forced_block):
+            # Deferred blocks are always consecutive, so it's enough to
+            # save the first and last ones.
+            if self._deferred_blocks is None:
+                self._deferred_blocks = [block, block]
+            else:
+                self._deferred_blocks[1] = block
+
+            # Keep the current formats to avoid flickering
+            for format_range in block.layout().formats():
+                self.setFormat(format_range.start, format_range.length,
+                               format_range.format)
+            return True
+
+        self._last_highlighted = number
+        return False
+
+    def _end_highlight_burst(self):
+        self._highlight_deadline = None
+        self._add_deferred_blocks()
+
+    def _on_contents_change(self, position, chars_removed, chars_added):
+        """Classify the blocks deferred while highlighting a text change."""
+        if self.document() is not None:
+            self._add_deferred_blocks(change_end=position + chars_added)
+
+    def _add_deferred_blocks(self, change_end=None):
+        """
+        Add the blocks deferred in the last highlighting pass to the pending
+        ones.
+
+        Parameters
+        ----------
+        change_end: int, optional
+            End position of the text that was highlighted in that pass. A
+            block after it was only highlighted because the state of the
+            previous block changed, so it's added as a frontier. If None,
+            all deferred blocks need to be highlighted again.
+        """
+        if self._deferred_blocks is None:
+            return
+
+        first, last = self._deferred_blocks
+        self._deferred_blocks = None
+        if not first.isValid() or not last.isValid():
+            return
+
+        if change_end is not None and last.position() >= change_end:
+            # Frontiers inside the pending range are not needed because
+            # they'll be highlighted in order anyway.
+            if not self._is_block_pending(last):
+                self._frontiers.append(self._get_block_cursor(last))
+            if last.blockNumber() == first.blockNumber():
+                self._start_chunk_timer()
+                return
+            last = last.previous()
+
+        self._add_pending_blocks(first, last)
+
+    def _add_pending_blocks(self, first, last):
+        """Add the blocks from `first` to `last` to the pending range."""
+        start = first.position()
+        end = last.position()
+        if self._pending_range is not None:
+            start = min(start, self._pending_range[0].position())
+            end = max(end, self._pending_range[1].position())
+
+        # Cursors are used to keep track of the pending range because they
+        # are updated when the text changes.
+        start_cursor = self._get_block_cursor(start)
+        start_cursor.setKeepPositionOnInsert(True)
+        self._pending_range = (start_cursor, self._get_block_cursor(end))
+        self._start_chunk_timer()
+
+    def _is_block_pending(self, block):
+        if self._pending_range is None:
+            return False
+        start_cursor, end_cursor = self._pending_range
+        return (start_cursor.position() <= block.position() <=
+                end_cursor.position())
+
+    def _get_block_cursor(self, block_or_position):
+        cursor = QTextCursor(self.document())
+        if isinstance(block_or_position, int):
+            cursor.setPosition(block_or_position)
+        else:
+            cursor.setPosition(block_or_position.position())
+        return cursor
+
+    def _start_chunk_timer(self):
+        if not self._chunk_timer.isActive():
+            self._chunk_timer.start()
+
+    def _get_visible_block_numbers(self):
+        """Get the range of blocks currently shown by the editor."""
+        editor = self.editor
+        if editor is None or not hasattr(editor, 'get_visible_block_numbers'):
+            return None
+        try:
+            return editor.get_visible_block_numbers()
+        except RuntimeError:
+            # The editor was deleted
+            return None
+
+    def _rehighlight_block(self, block):
+        """
+        Rehighlight `block`, even if the time budget was used.
+
+        Returns
+        -------
+        tuple
+            Start and end positions of the highlighted blocks.
+        """
+        self._forced_block = block.blockNumber()
+        self._last_highlighted = -1
+        try:
+            self.rehighlightBlock(block)
+        finally:
+            self._forced_block = None
+
+        # If the state of the block changed, the next ones are highlighted
+        # too until their state doesn't change or the time budget is used.
+        # In the latter case, the first block that was not highlighted
+        # becomes a frontier.
+        self._add_deferred_blocks(change_end=block.position())
+
+        last = self.document().findBlockByNumber(
+            max(self._last_highlighted, block.blockNumber()))
+        return block.position(), last.position() + last.length()
+
+    def _highlight_pending_chunk(self):
+        """
+        Highlight pending blocks until the time budget is used.
+
+        Frontiers are processed first. Their highlighting stops as soon as
+        the state of a block doesn't change, so it's cheap. Then pending
+        blocks are processed in order, so that the state of each block is
+        carried over to the next one, starting with the visible ones.
+        """
+        document = self.document()
+        if document is None:
+            return
+
+        self._burst_timer.stop()
+        self._add_deferred_blocks()
+        self._highlight_deadline = time.perf_counter() + HIGHLIGHT_TIME_BUDGET
+
+        # Don't let the document layout notify the editor after each block
+        # is highlighted. It's notified once per range of blocks below.
+        layout = document.documentLayout()
+        signals_blocked = layout.blockSignals(True)
+        changed = []
+        try:
+            # Frontiers need to be processed in order. Otherwise an old one
+            # could take the state of a block that is going to change again.
+            frontiers = {c.block().blockNumber(): c for c in self._frontiers}
+            self._frontiers = [frontiers[n] for n in sorted(frontiers)]
+            while self._frontiers:
+                block = self._frontiers.pop(0).block()
+                if block.isValid():
+                    changed.append(self._rehighlight_block(block))
+                if time.perf_counter() > self._highlight_deadline:
+                    break
+
+            if (self._pending_range is not None and
+                    time.perf_counter() < self._highlight_deadline):
+                changed.extend(self._highlight_pending_range())
+        finally:
+            layout.blockSignals(signals_blocked)
+
+        # Merge overlapping and contiguous ranges
+        ranges = []
+        for start, end in sorted(changed):
+            if ranges and start <= ranges[-1][1]:
+                ranges[-1][1] = max(ranges[-1][1], end)
+            else:
+                ranges.append([start, end])
+
+        for start, end in ranges:
+            end = min(end, document.characterCount())
+            document.markContentsDirty(start, max(end - start, 0))
+
+        self._highlight_deadline = None
+        if self.has_pending_blocks():
+            self._start_chunk_timer()
+
+    def _highlight_pending_range(self):
+        """Highlight pending blocks until the time budget is used."""
+        changed = []
+        start_cursor, end_cursor = self._pending_range
+        number = start_cursor.block().blockNumber()
+        end = end_cursor.block().blockNumber()
+
+        # Visible blocks first. Their state may depend on blocks that are
+        # still pending, so they are highlighted again in order later.
+        visible = self._get_visible_block_numbers()
+        if visible is not None and visible != self._last_visible:
+            self._last_visible = visible
+            block = start_cursor.document().findBlockByNumber(
+                max(visible[0], number))
+            last = min(visible[1], end)
+            while block.isValid() and block.blockNumber() <= last:
+                changed.append(self._rehighlight_block(block))
+                block = block.next()
+
+        block = start_cursor.block()
+        while block.isValid() and block.blockNumber() <= end:
+            changed.append(self._rehighlight_block(block))
+
+            # Blocks after this one could have been highlighted too if its
+            # state changed.
+            number = max(block.blockNumber(), self._last_highlighted) + 1
+            block = block.document().findBlockByNumber(number)
+            end = max(end, end_cursor.block().blockNumber())
+
+            if time.perf_counter() > self._highlight_deadline:
+                break
+
+        if block.isValid() and block.blockNumber() <= end:
+            start_cursor.setPosition(block.position())
+        else:
+            self._pending_range = None
+            self._last_visible = None
+
+        return changed
+
+    def has_pending_blocks(self):
+        """Check if there are blocks waiting to be highlighted."""
+        return bool(self._pending_range is not None or self._frontiers or
+                    self._deferred_blocks is not None)
+
+    def highlight_pending_blocks(self):
+        """Highlight all pending blocks right away."""
+        incremental = self.incremental
+        self.incremental = False
+        try:
+            while self.has_pending_blocks():
+                self._highlight_pending_chunk()
+        finally:
+            self.incremental = incremental
+        self._chunk_timer.stop()
+
     def highlight_block(self, text):
         """
         Abstract method. Override this to apply syntax highlighting.
@@ -385,6 +692,7 @@ def highlight_extras(self, text, offset=0):
     def rehighlight(self):
         QApplication.setOverrideCursor(QCursor(Qt.WaitCursor))
         QSyntaxHighlighter.rehighlight(self)
+        self._add_deferred_blocks()
         QApplication.restoreOverrideCursor()
 
 
@@ -651,7 +959,13 @@ def highlight_block(self, text):
                         text, match, key, value, offset,
                         state, import_stmt, oedata)
 
-        tbh.set_state(self.currentBlock(), state)
+        # Only the states that affect the next block are saved, so that the
+        # highlighting of following blocks stops as soon as possible when
+        # this one changes.
+        if state == self.INSIDE_NON_MULTILINE_STRING:
+            tbh.set_state(self.currentBlock(), self.NORMAL)
+        else:
+            tbh.set_state(self.currentBlock(), state)
 
         # Use normal format for indentation and trailing spaces
         # Unless we are in a string
@@ -1250,13 +1564,55 @@ def setup_formats(self, font=None):
 # current native PythonSH syntax highlighter.
 
 class PygmentsSH(BaseSH):
-    """Generic Pygments syntax highlighter."""
+    """
+    Generic Pygments syntax highlighter.
+
+    Notes
+    -----
+    * The tokens found by the lexer are stored per line, as runs of
+      `(start, length, format name)`. Lines that start in the middle of a
+      multiline token are flagged as continued.
+    * The full text is only lexed in a worker thread (see `make_charlist`).
+      After that, text changes are lexed incrementally: lexing restarts from
+      a line before the change that is not continued and stops as soon as
+      the tokens of the lines after it match the stored ones. Only the lines
+      whose tokens changed are highlighted again.
+    """
     # Store the language name and a ref to the lexer
     _lang_name = None
     _lexer = None
 
     # Syntax highlighting states (from one text block to another):
     NORMAL = 0
+
+    # Number of lines before a change that are lexed again to check that the
+    # lexer is in the same state as before when it reaches the change.
+    RELEX_CONTEXT_LINES = 2
+
+    # Number of consecutive lines after a change whose tokens need to match
+    # the stored ones to stop lexing.
+    RELEX_SYNC_LINES = 2
+
+    # Number of lines after a change lexed in the first incremental pass.
+    # It's multiplied by four in each new pass.
+    RELEX_CHUNK_LINES = 50
+
+    # Maximum number of lines lexed incrementally, in the main thread, for a
+    # change. If the change is bigger or the tokens don't match the stored
+    # ones before that, the full text is lexed again in a worker thread.
+    RELEX_MAX_LINES = 800
+
+    # Maximum number of changed lines that are highlighted again right away.
+    # The rest are highlighted in chunks when idle.
+    REHIGHLIGHT_MAX_LINES = 100
+
+    # Time (in ms) without text changes after which the full text is lexed
+    # again in a worker thread. That fixes the tokens of lexers whose state
+    # at the start of a line depends on more than the lines before it (e.g.
+    # YAML flow collections), which the incremental updates can get wrong.
+    # Only the lines whose tokens differ are highlighted again.
+    FULL_RELEX_DELAY = 2000
+
     def __init__(self, parent, font=None, color_scheme=None):
         # Map Pygments tokens to Spyder tokens
         self._tokmap = {Text: "normal",
@@ -1269,6 +1625,10 @@ def __init__(self, parent, font=None, color_scheme=None):
                         Comment: "comment",
                         String: "string",
                         Number: "number"}
+
+        # Cache of the Spyder format name of each Pygments token type
+        self._fmt_cache = {}
+
         # Load Pygments' Lexer
         if self._lang_name is not None:
             self._lexer = get_lexer_by_name(self._lang_name)
@@ -1279,86 +1639,280 @@ def __init__(self, parent, font=None, color_scheme=None):
         # parsing
         self._worker_manager = WorkerManager()
 
-        # Store the format for all the tokens after Pygments parsing
-        self._charlist = []
+        # Tokens of each line, as `(continued, runs)` tuples, or None if the
+        # full text was not lexed yet.
+        self._lines = None
+
+        # Document revision lexed by the running worker, if any
+        self._lexed_revision = None
 
-        # Flag variable to avoid unnecessary highlights if the worker has not
-        # yet finished processing
-        self._allow_highlight = True
+        self._relex_timer = QTimer(self)
+        self._relex_timer.setSingleShot(True)
+        self._relex_timer.setInterval(self.FULL_RELEX_DELAY)
+        self._relex_timer.timeout.connect(self.make_charlist)
+
+        if self.document() is not None:
+            self.document().contentsChange.connect(self._update_lines)
 
     def stop(self):
+        self._relex_timer.stop()
         self._worker_manager.terminate_all()
 
+    # ---- Lexing
+    # ------------------------------------------------------------------------
+    def _get_fmt(self, typ):
+        """Get the Spyder format name for the given Pygments token type."""
+        fmt = self._fmt_cache.get(typ)
+        if fmt is None:
+            # Exact matches first
+            fmt = self._tokmap.get(typ)
+            if fmt is None:
+                # Partial (parent-> child) matches
+                fmt = 'normal'
+                for key, val in self._tokmap.items():
+                    if typ in key:  # Checks if typ is a subtype of key.
+                        fmt = val
+                        break
+            self._fmt_cache[typ] = fmt
+        return fmt
+
+    def _iter_lines(self, lexer, text):
+        """
+        Lex `text` and yield the `(continued, runs)` tokens of its lines.
+
+        `runs` is a tuple of `(start, length, format name)` tuples, in
+        UTF-16 code units as used by Qt. Normal text is not included in it.
+        """
+        # Only compute lengths in UTF-16 code units if it makes a difference
+        if qstring_length(text) == len(text):
+            length = len
+        else:
+            length = qstring_length
+
+        runs = []
+        col = 0
+        continued = False
+        for __, typ, value in lexer.get_tokens_unprocessed(text):
+            if not value:
+                continue
+            fmt = self._get_fmt(typ)
+            pieces = value.split('\n')
+            last = len(pieces) - 1
+            for i, piece in enumerate(pieces):
+                if i > 0:
+                    yield (continued, tuple(runs))
+                    runs = []
+                    col = 0
+                    # The new line is continued if this token doesn't end
+                    # right before it.
+                    continued = fmt != 'normal' and (i < last or bool(piece))
+                if piece:
+                    n = length(piece)
+                    if fmt != 'normal':
+                        if (runs and runs[-1][2] == fmt and
+                                runs[-1][0] + runs[-1][1] == col):
+                            runs[-1] = (runs[-1][0], runs[-1][1] + n, fmt)
+                        else:
+                            runs.append((col, n, fmt))
+                    col += n
+        yield (continued, tuple(runs))
+
+    def _lex_lines(self, lexer, text, num_lines):
+        """Lex the full `text`, which is expected to have `num_lines`."""
+        lines = list(self._iter_lines(lexer, text))
+
+        # Lexers can drop characters in rare cases, so make sure there's
+        # an entry per line.
+        del lines[num_lines:]
+        lines.extend([(False, ())] * (num_lines - len(lines)))
+        return lines
+
     def make_charlist(self):
-        """Parses the complete text and stores format for each character."""
+        """
+        Lex the complete text in a worker thread and highlight it again when
+        done.
+
+        After that, text changes are lexed incrementally.
+        """
 
         def worker_output(worker, output, error):
             """Worker finished callback."""
-            self._charlist = output
-            if error is None and output:
-                self._allow_highlight = True
+            document = self.document()
+            if document is None or error is not None or output is None:
+                return
+            self._lexed_revision = None
+            if document.revision() != revision:
+                # The text changed while it was being lexed.
+                self.make_charlist()
+                return
+            old_lines = self._lines
+            self._lines = output
+            if old_lines is None or len(old_lines) != len(output):
                 self.rehighlight()
-            self._allow_highlight = False
+                return
+
+            # Only highlight again the lines whose tokens changed
+            changed = [n for n, line in enumerate(output)
+                       if line != old_lines[n]]
+            if changed:
+                self._add_pending_blocks(
+                    document.findBlockByNumber(changed[0]),
+                    document.findBlockByNumber(changed[-1]))
 
-        text = to_text_string(self.document().toPlainText())
-        tokens = self._lexer.get_tokens(text)
+        document = self.document()
+        text = to_text_string(document.toPlainText())
+        revision = document.revision()
 
         # Before starting a new worker process make sure to end previous
         # incarnations
+        self._relex_timer.stop()
         self._worker_manager.terminate_all()
+        self._lexed_revision = revision
 
+        # Use a different lexer instance than the one used for incremental
+        # updates in the main thread.
+        lexer = self._lexer.__class__(**self._lexer.options)
         worker = self._worker_manager.create_python_worker(
-            self._make_charlist,
-            tokens,
-            self._tokmap,
-            self.formats,
+            self._lex_lines,
+            lexer,
+            text,
+            document.blockCount(),
         )
         worker.sig_finished.connect(worker_output)
         worker.start()
 
-    def _make_charlist(self, tokens, tokmap, formats):
-        """
-        Parses the complete text and stores format for each character.
-
-        Uses the attached lexer to parse into a list of tokens and Pygments
-        token types.  Then breaks tokens into individual letters, each with a
-        Spyder token type attached.  Stores this list as self._charlist.
+    def _get_lines_text(self, start, end):
+        """Get the text of lines `start` to `end` (not included)."""
+        block = self.document().findBlockByNumber(start)
+        lines = []
+        for __ in range(end - start):
+            lines.append(block.text())
+            block = block.next()
+        return '\n'.join(lines)
 
-        It's attached to the contentsChange signal of the parent QTextDocument
-        so that the charlist is updated whenever the document changes.
+    def _relex_lines(self, start, end, first, last, delta):
         """
+        Lex lines from `start` to `end` (not included) after a change in
+        lines `first` to `last`.
+
+        Returns
+        -------
+        tuple or None
+            `(new_lines, synced, last_changed)`, where `synced` is True if
+            lexing stopped because the tokens matched the stored ones, or
+            None if the lexer was not in the same state as before when it
+            reached the change.
+        """
+        old_lines = self._lines
+        complete = end == self.document().blockCount()
+        text = self._get_lines_text(start, end)
+
+        new_lines = []
+        synced = 0
+        last_changed = last
+        number = start
+        for line in self._iter_lines(self._lexer, text):
+            if number >= end or (number == end - 1 and not complete):
+                # The last line can be lexed differently because the text
+                # after it is missing.
+                break
+            new_lines.append(line)
+            if number < first:
+                if line != old_lines[number]:
+                    return None
+            elif number > last:
+                # The lines after the change only need to be highlighted
+                # again if their tokens changed.
+                old_number = number - delta
+                if (old_number < len(old_lines) and
+                        line == old_lines[old_number]):
+                    synced += 1
+                    if synced == self.RELEX_SYNC_LINES:
+                        break
+                else:
+                    synced = 0
+                    last_changed = number
+            number += 1
+
+        return new_lines, synced == self.RELEX_SYNC_LINES, last_changed
+
+    def _update_lines(self, position, chars_removed, chars_added):
+        """Lex the lines affected by a text change."""
+        document = self.document()
+        if (document is None or self._lines is None or
+                self._lexed_revision is not None):
+            # Lines are updated when the worker finishes
+            return
+
+        num_blocks = document.blockCount()
+        first = document.findBlock(position).blockNumber()
+        last = document.findBlock(position + chars_added).blockNumber()
+        if last < 0:
+            last = num_blocks - 1
+        delta = num_blocks - len(self._lines)
+
+        # Restart from a line that is not in the middle of a token, a few
+        # lines before the change to check that the lexer is in the same
+        # state there.
+        start = max(first - self.RELEX_CONTEXT_LINES, 0)
+        while start > 0 and self._lines[start][0]:
+            start -= 1
+
+        # Lex increasingly bigger chunks of lines after the change until the
+        # tokens match the stored ones, up to RELEX_MAX_LINES so that the
+        # main thread is not blocked.
+        max_lines = self.RELEX_MAX_LINES
+        if last - start >= max_lines:
+            self.make_charlist()
+            return
+
+        num_lines = min(last - start + self.RELEX_CHUNK_LINES, max_lines)
+        while True:
+            end = min(start + num_lines, num_blocks)
+            result = self._relex_lines(start, end, first, last, delta)
+            if result is not None and (result[1] or end == num_blocks):
+                break
+            if result is None or num_lines >= max_lines:
+                self.make_charlist()
+                return
+            num_lines = min(num_lines * 4, max_lines)
+
+        new_lines, synced, last_changed = result
+        old_end = start + len(new_lines) - delta
+        if not synced:
+            # The end of the text was reached
+            old_end = len(self._lines)
+        self._lines[start:old_end] = new_lines
+        if len(self._lines) != num_blocks:
+            self._lines = None
+            self.make_charlist()
+            return
+
+        self._relex_timer.start()
+        if last_changed - first < self.REHIGHLIGHT_MAX_LINES:
+            block = document.findBlockByNumber(first)
+            while block.isValid() and block.blockNumber() <= last_changed:
+                self._rehighlight_block(block)
+                block = block.next()
+        else:
+            self._add_pending_blocks(
+                document.findBlockByNumber(first),
+                document.findBlockByNumber(last_changed))
 
-        def _get_fmt(typ):
-            """Get the Spyder format code for the given Pygments token type."""
-            # Exact matches first
-            if typ in tokmap:
-                return tokmap[typ]
-            # Partial (parent-> child) matches
-            for key, val in tokmap.items():
-                if typ in key: # Checks if typ is a subtype of key.
-                    return val
-
-            return 'normal'
-
-        charlist = []
-        for typ, token in tokens:
-            fmt = formats[_get_fmt(typ)]
-            for letter in token:
-                charlist.append((fmt, letter))
+    # ---- Highlighting
+    # ------------------------------------------------------------------------
+    def highlight_block(self, text):
+        """Implement highlight using Pygments tokens."""
+        self.setFormat(0, qstring_length(text), self.formats["normal"])
 
-        return charlist
+        lines = self._lines
+        number = self.currentBlock().blockNumber()
+        if lines is not None and number < len(lines):
+            formats = self.formats
+            for start, length, fmt in lines[number][1]:
+                self.setFormat(start, length, formats[fmt])
 
-    def highlightBlock(self, text):
-        """ Actually highlight the block"""
-        # Note that an undefined blockstate is equal to -1, so the first block
-        # will have the correct behaviour of starting at 0.
-        if self._allow_highlight:
-            start = self.previousBlockState() + 1
-            end = start + qstring_length(text)
-            for i, (fmt, letter) in enumerate(self._charlist[start:end]):
-                self.setFormat(i, 1, fmt)
-            self.setCurrentBlockState(end)
-            self.highlight_extras(text)
+        self.highlight_extras(text)
 
 
 class PythonLoggingLexer(RegexLexer):
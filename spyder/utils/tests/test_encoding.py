@@ -11,7 +11,9 @@
 from flaky import flaky
 import pytest
 
-from spyder.utils.encoding import is_text_file, get_coding, write
+from spyder.utils import encoding
+from spyder.utils.encoding import (is_text_file, get_coding, write, decode,
+                                   get_text_hash, read_text_file)
 from spyder.py3compat import to_text_string, PY2
 
 if PY2:
@@ -111,5 +113,45 @@ def test_files_encodings(expected_encoding, text_file):
         assert get_coding(text).lower() == expected_encoding.lower()
 
 
+@pytest.mark.parametrize(
+    'data, expected_encoding',
+    [('# -*- coding: utf-8 -*-\nç = 1\n'.encode('utf-8'), 'utf-8'),
+     (b'\xef\xbb\xbfspam\r\neggs\r\n', 'utf-8-bom'),
+     ('spam\nñandú\n'.encode('utf-16'), 'utf-16'),
+     ('spam\nñandú\n'.encode('utf-32'), 'utf-32'),
+     (b'x = 1\n' * 10 + 'y = "\u20ac"\n'.encode('utf-8'), 'utf-8-guessed'),
+     (b'x = 1\n' * 10 + b'y = "\xe9"\n', 'latin-1-guessed'),
+     ])
+@pytest.mark.parametrize('chunk_size', [1, 3, 1024])
+def test_read_text_file(tmpdir, mocker, data, expected_encoding, chunk_size):
+    """
+    Check that read_text_file decodes files in chunks as decode does with
+    the whole file, and computes their hash and line boundaries.
+    """
+    mocker.patch.object(encoding, 'ENCODING_PREFIX_SIZE', 32)
+    p = tmpdir.join('text.txt')
+    p.write_binary(data)
+
+    text, file_encoding, text_hash, eol_counts = read_text_file(
+        str(p), chunk_size=chunk_size)
+    if expected_encoding != 'utf-32':
+        # decode mistakes UTF-32 little endian files for UTF-16 ones
+        assert (text, file_encoding) == decode(data)
+    assert file_encoding == expected_encoding
+    assert text_hash == get_text_hash(text)
+    assert len(eol_counts) == 1
+    assert sum(eol_counts.values()) == len(text.splitlines())
+
+
+def test_read_text_file_eol_counts(tmpdir):
+    """Check the line boundaries found by read_text_file."""
+    p = tmpdir.join('text.txt')
+    p.write_binary(b'a\r\nb\r\nc\nd\re\x0cf\r\n\r')
+
+    for chunk_size in range(1, 12):
+        __, __, __, eol_counts = read_text_file(str(p), chunk_size=chunk_size)
+        assert eol_counts == {'\r\n': 3, '\n': 1, '\r': 2, '\x0c': 1}
+
+
 if __name__ == '__main__':
     pytest.main()
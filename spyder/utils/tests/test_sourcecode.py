@@ -124,6 +124,32 @@ def test_get_eol_chars_no_eol():
         assert eol_chars == "\r"
 
 
+def test_apply_text_changes():
+    text = 'foo\r\nbar 😀 baz\r\nqux'
+
+    def change(start, end, new_text):
+        return {'range': {'start': {'line': start[0], 'character': start[1]},
+                          'end': {'line': end[0], 'character': end[1]}},
+                'text': new_text}
+
+    # Insertion, with positions after a non-BMP character counted in UTF-16
+    # code units
+    assert (sourcecode.apply_text_changes(text, [change((1, 7), (1, 7), 'x')])
+            == 'foo\r\nbar 😀 xbaz\r\nqux')
+
+    # Deletion across lines
+    assert (sourcecode.apply_text_changes(text, [change((0, 1), (2, 1), '')])
+            == 'fux')
+
+    # Changes are applied in order and ranges are clamped to line ends
+    changes = [change((0, 3), (0, 3), '!'), change((2, 0), (2, 100), 'end')]
+    assert (sourcecode.apply_text_changes(text, changes)
+            == 'foo!\r\nbar 😀 baz\r\nend')
+
+    # Full text changes
+    assert sourcecode.apply_text_changes(text, [{'text': 'new'}]) == 'new'
+
+
 if __name__ == '__main__':
     pytest.main()
 
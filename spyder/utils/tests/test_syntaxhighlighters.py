@@ -5,10 +5,13 @@
 
 """Tests for syntaxhighlighters.py"""
 
+import random
+
 import pytest
 from qtpy.QtWidgets import QApplication
-from qtpy.QtGui import QTextDocument
+from qtpy.QtGui import QTextCursor, QTextDocument
 
+import spyder.utils.syntaxhighlighters as sh_module
 from spyder.utils.syntaxhighlighters import HtmlSH, PythonSH, MarkdownSH
 from spyder.py3compat import PY3
 
@@ -127,5 +130,258 @@ def test_python_not_an_outline_explorer_comment(line):
     assert not PythonSH.OECOMMENT.match(line)
 
 
+def get_block_formats(doc):
+    """Get the formats and state of all blocks in doc."""
+    formats = []
+    block = doc.firstBlock()
+    while block.isValid():
+        formats.append(
+            [(r.start, r.length, r.format.foreground().color().name())
+             for r in block.layout().formats()] + [block.userState()])
+        block = block.next()
+    return formats
+
+
+def test_python_incremental_highlighting(qtbot, monkeypatch):
+    """Test that big documents are highlighted incrementally."""
+    monkeypatch.setattr(sh_module, 'INCREMENTAL_MIN_BLOCKS', 100)
+    monkeypatch.setattr(sh_module, 'HIGHLIGHT_TIME_BUDGET', 0)
+    txt = ('def foo(x):\n'
+           '    """Docstring\n'
+           '    in two lines"""\n'
+           '    return x + 1  # comment\n') * 100
+
+    # Reference highlighting
+    doc = QTextDocument()
+    sh = PythonSH(doc, color_scheme='Spyder')
+    sh.incremental = False
+    doc.setPlainText(txt)
+    sh.rehighlight()
+    assert not sh.has_pending_blocks()
+    expected = get_block_formats(doc)
+
+    # Only the first block is highlighted right away
+    doc = QTextDocument()
+    sh = PythonSH(doc, color_scheme='Spyder')
+    doc.setPlainText(txt)
+    sh.rehighlight()
+    assert sh.has_pending_blocks()
+    assert get_block_formats(doc)[1:] != expected[1:]
+
+    # The rest of blocks are highlighted when idle
+    monkeypatch.setattr(sh_module, 'HIGHLIGHT_TIME_BUDGET', 0.01)
+    qtbot.waitUntil(lambda: not sh.has_pending_blocks())
+    assert get_block_formats(doc) == expected
+
+    # Check that highlighting is carried over pending blocks after opening a
+    # triple quoted string.
+    cursor = QTextCursor(doc)
+    cursor.insertText('"""\n')
+    assert sh.has_pending_blocks()
+    sh.highlight_pending_blocks()
+    assert not sh.has_pending_blocks()
+    assert doc.lastBlock().userState() == PythonSH.INSIDE_DQ3STRING
+
+    cursor.movePosition(QTextCursor.Start)
+    for __ in range(4):
+        cursor.deleteChar()
+    sh.highlight_pending_blocks()
+    assert get_block_formats(doc) == expected
+
+
+def test_python_highlighting_stops_when_state_matches(qtbot, monkeypatch):
+    """
+    Test that pending highlighting stops as soon as the state of a block
+    doesn't change.
+    """
+    monkeypatch.setattr(sh_module, 'INCREMENTAL_MIN_BLOCKS', 100)
+    txt = ('def foo(x):\n'
+           '    """Docstring\n'
+           '    in two lines"""\n'
+           '    return x + 1  # comment\n') * 100
+
+    doc = QTextDocument()
+    doc.setPlainText(txt)
+    sh = PythonSH(doc, color_scheme='Spyder')
+
+    # Text changes are only highlighted if the document has a layout
+    doc.documentLayout()
+
+    # Wait for the initial highlighting
+    qtbot.waitUntil(lambda: doc.firstBlock().userState() != -1)
+    qtbot.waitUntil(lambda: not sh.has_pending_blocks())
+    expected = get_block_formats(doc)
+
+    highlighted = []
+    highlight_block = sh.highlight_block
+
+    def count_highlighted(text):
+        highlighted.append(sh.currentBlock().blockNumber())
+        highlight_block(text)
+
+    monkeypatch.setattr(sh, 'highlight_block', count_highlighted)
+
+    # Opening a string only highlights the first block and leaves the next
+    # one as a frontier.
+    monkeypatch.setattr(sh_module, 'HIGHLIGHT_TIME_BUDGET', 0)
+    cursor = QTextCursor(doc)
+    cursor.insertText('"""')
+    assert highlighted == [0]
+    assert sh.has_pending_blocks()
+
+    # Closing it before the frontier is processed makes the next block
+    # recover its previous state, so highlighting stops there.
+    QApplication.processEvents()
+    cursor.insertText('"""')
+    sh.highlight_pending_blocks()
+    assert not sh.has_pending_blocks()
+    assert len(highlighted) < 5
+
+    cursor.movePosition(QTextCursor.Start)
+    for __ in range(6):
+        cursor.deleteChar()
+    sh.highlight_pending_blocks()
+    assert get_block_formats(doc) == expected
+
+
+def test_pygments_incremental_lexing(qtbot):
+    """Test that text changes are lexed incrementally with Pygments."""
+    CSH = sh_module.guess_pygments_highlighter('test.c')
+    txt = ('int foo(int x) {\n'
+           '    /* comment */\n'
+           '    return x + 1;  // comment\n'
+           '}\n') * 100
+
+    doc = QTextDocument()
+    doc.setPlainText(txt)
+    sh = CSH(doc, color_scheme='Spyder')
+    doc.documentLayout()
+
+    # The full text is lexed in a thread
+    sh.make_charlist()
+    qtbot.waitUntil(lambda: sh._lines is not None)
+    sh.highlight_pending_blocks()
+
+    def check_lines():
+        expected = sh._lex_lines(sh._lexer, doc.toPlainText(),
+                                 doc.blockCount())
+        assert sh._lines == expected
+
+    # Opening a comment changes the tokens until the end of the next one
+    lexed = []
+    iter_lines = sh._iter_lines
+
+    def count_lexed(lexer, text):
+        for line in iter_lines(lexer, text):
+            lexed.append(line)
+            yield line
+
+    sh._iter_lines = count_lexed
+    cursor = QTextCursor(doc)
+    cursor.setPosition(doc.findBlockByNumber(40).position())
+    cursor.insertText('/* ')
+    assert sh._lexed_revision is None
+    assert len(lexed) < 10
+    del sh._iter_lines
+    check_lines()
+    assert sh._lines[41][1] == ((0, len('    /* comment */'), 'comment'),)
+
+    # Closing it restores the previous tokens
+    cursor.insertText('*/')
+    check_lines()
+    assert sh._lines[41][1] == ((4, len('/* comment */'), 'comment'),)
+
+    # Inserting and removing lines
+    cursor.insertText('int a;\nint b;\n')
+    check_lines()
+    cursor.movePosition(QTextCursor.Up, QTextCursor.KeepAnchor, 3)
+    cursor.removeSelectedText()
+    check_lines()
+
+    # Only the lines whose tokens changed are highlighted again
+    sh.highlight_pending_blocks()
+    formats = get_block_formats(doc)
+    sh.rehighlight()
+    assert get_block_formats(doc) == formats
+
+
+def test_pygments_bounded_incremental_lexing(qtbot, monkeypatch):
+    """
+    Test that changes whose tokens don't match the stored ones soon enough
+    are lexed in a thread.
+    """
+    CSH = sh_module.guess_pygments_highlighter('test.c')
+    doc = QTextDocument()
+    doc.setPlainText('int a;\n' * 500)
+    sh = CSH(doc, color_scheme='Spyder')
+    doc.documentLayout()
+    sh.make_charlist()
+    qtbot.waitUntil(lambda: sh._lines is not None)
+    sh.highlight_pending_blocks()
+    monkeypatch.setattr(sh, 'RELEX_MAX_LINES', 100)
+
+    # A comment that is never closed changes the tokens until the end
+    lexed = []
+    iter_lines = sh._iter_lines
+
+    def count_lexed(lexer, text):
+        for line in iter_lines(lexer, text):
+            lexed.append(line)
+            yield line
+
+    monkeypatch.setattr(sh, '_iter_lines', count_lexed)
+    cursor = QTextCursor(doc)
+    cursor.setPosition(doc.findBlockByNumber(10).position())
+    cursor.insertText('/* ')
+    assert len(lexed) < 200
+    assert sh._lexed_revision is not None
+    qtbot.waitUntil(lambda: sh._lexed_revision is None)
+    assert sh._lines[400][1] == ((0, len('int a;'), 'comment'),)
+
+    # Big changes are lexed in a thread right away
+    del lexed[:]
+    cursor.movePosition(QTextCursor.End)
+    cursor.insertText('int b;\n' * 200)
+    assert not lexed
+    assert sh._lexed_revision is not None
+    qtbot.waitUntil(lambda: sh._lexed_revision is None)
+    assert len(sh._lines) == doc.blockCount()
+
+
+def test_pygments_full_relex_after_changes(qtbot):
+    """
+    Test that the tokens of lexers whose state depends on more than the
+    previous lines are fixed by lexing the full text after random changes.
+    """
+    YAMLSH = sh_module.guess_pygments_highlighter('test.yaml')
+    doc = QTextDocument()
+    doc.setPlainText('a: [1,\n  2]\nb: {c: 1,\n  d: "x"}\n# end\n' * 10)
+    sh = YAMLSH(doc, color_scheme='Spyder')
+    doc.documentLayout()
+    sh.make_charlist()
+    qtbot.waitUntil(lambda: sh._lines is not None)
+
+    rand = random.Random(17)
+    snippets = ['[', ']', '{', '}', '"', "'", '# ', ', ', ': ', '\n', '  ',
+                'key: [1,\n  2]\n']
+    cursor = QTextCursor(doc)
+    for __ in range(60):
+        cursor.setPosition(rand.randint(0, doc.characterCount() - 1))
+        if rand.random() < 0.7:
+            cursor.insertText(rand.choice(snippets))
+        else:
+            cursor.movePosition(QTextCursor.NextCharacter,
+                                QTextCursor.KeepAnchor,
+                                rand.randint(1, 5))
+            cursor.removeSelectedText()
+        qtbot.waitUntil(lambda: sh._lexed_revision is None)
+
+    sh._relex_timer.setInterval(50)
+    qtbot.waitUntil(lambda: not sh._relex_timer.isActive() and
+                    sh._lexed_revision is None)
+    assert sh._lines == sh._lex_lines(sh._lexer, doc.toPlainText(),
+                                      doc.blockCount())
+
+
 if __name__ == '__main__':
     pytest.main()